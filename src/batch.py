@@ -0,0 +1,154 @@
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.util import Finalize
+from maze import Maze
+from engine.registry import get_solver
+
+# Maze of the current worker process, attached to the shared block by `init_worker`, and the views of
+# the block it uses, released by `close_worker`
+worker_memory = None
+worker_maze = None
+worker_views = []
+
+def shared_layout(cols: int, rows: int, target_count: int, has_costs: bool):
+    """
+    Computes where the parts of a maze are placed in the shared memory block: the adjacency offsets and
+    targets first, as unsigned 32-bit integers, then the packed walls, then the costs if there are some.
+
+    Args:
+    - cols (int): Number of columns of the maze.
+    - rows (int): Number of rows of the maze.
+    - target_count (int): Number of neighbor indices in the adjacency index.
+    - has_costs (bool): Whether the traversal costs of the cells are shared too.
+
+    Returns:
+    - bounds (Tuple[int, int, int, int]): The ends of the offsets, targets, walls and costs in bytes.
+    """
+    size = cols * rows
+    offsets_end = 4 * (size + 1)
+    targets_end = offsets_end + 4 * target_count
+    walls_end = targets_end + ((size + 1) >> 1)
+    costs_end = walls_end + (size if has_costs else 0)
+    return offsets_end, targets_end, walls_end, costs_end
+
+def init_worker(name: str, cols: int, rows: int, target_count: int, has_costs: bool = False):
+    """
+    Attach a worker process to the shared maze.
+
+    Nothing is copied or built: the worker's Maze reads its walls, costs and adjacency index straight
+    from the shared memory block. The views of the block are released when the worker exits.
+
+    Args:
+    - name (str): The name of the shared memory block, laid out as in `shared_layout`.
+    - cols (int): Number of columns of the maze.
+    - rows (int): Number of rows of the maze.
+    - target_count (int): Number of neighbor indices in the adjacency index.
+    - has_costs (bool): Whether the traversal costs of the cells follow the walls in the block.
+    """
+
+    global worker_memory, worker_maze
+    worker_memory = SharedMemory(name = name)
+    # The block may be rounded up to a whole number of pages, only use the parts of the maze
+    offsets_end, targets_end, walls_end, costs_end = shared_layout(cols, rows, target_count, has_costs)
+    buffer = worker_memory.buf
+    offsets = buffer[:offsets_end].cast("I")
+    targets = buffer[offsets_end:targets_end].cast("I")
+    walls = buffer[targets_end:walls_end]
+    worker_views.extend((offsets, targets, walls))
+    worker_maze = Maze(cols, rows, walls)
+    if has_costs:
+        costs = buffer[walls_end:costs_end]
+        worker_views.append(costs)
+        worker_maze.costs = costs
+    worker_maze.attach_adjacency(offsets, targets)
+
+    # Run by the worker when it leaves, before the shared memory object is collected
+    Finalize(None, close_worker, exitpriority = 10)
+
+def close_worker():
+    """
+    Release the views of the shared block held by the worker and close it, so that the block is not
+    collected while views of it are still exported.
+    """
+
+    global worker_memory, worker_maze
+    worker_maze = None
+    for view in worker_views:
+        view.release()
+    worker_views.clear()
+    if worker_memory is not None:
+        worker_memory.close()
+        worker_memory = None
+
+def solve_batch(task):
+    """
+    Solve a batch of queries in a worker process.
+
+    Every search keeps its own visited state, so the workers never write to the shared maze.
+
+    Args:
+    - task (Tuple[str, List[Tuple[int, int]]]): The name of the algorithm and the (start, goal) queries.
+
+    Returns:
+    - results (List[Tuple[List[int], SearchStats]]): The path (else None) and the stats of every query.
+    """
+
+    algorithm, queries = task
+    solver = get_solver(algorithm)
+    return [solver(worker_maze, start = start, destination = goal) for start, goal in queries]
+
+def solve_queries(maze: Maze, queries, algorithm: str = "BFS", processes: int = None, batch_size: int = 256):
+    """
+    Solve many (start, goal) queries on the same maze with a pool of worker processes.
+
+    The adjacency index is built once here, and placed with the packed walls (and the costs, if any)
+    in a shared memory block that all the workers read. The index is the largest of these structures
+    (over 8 bytes per cell, against half a byte for the walls), so no worker builds or copies its own.
+    The queries are sent to the workers in batches of `batch_size` to keep the communication overhead low.
+
+    Args:
+    - maze (Maze): The maze to search. Its walls must not change while the queries run.
+    - queries (Iterable[Tuple[int, int]]): The (start, goal) cell indices of every query.
+    - algorithm (str): The name of the headless solver, one of the keys of SOLVERS.
+    - processes (int, optional): Number of worker processes, the number of CPUs by default.
+    - batch_size (int): Number of queries sent to a worker at once.
+
+    Returns:
+    - results (List[Tuple[List[int], SearchStats]]): The path (else None) and the stats of every
+      query, in the order of the queries.
+    """
+
+    # Fail early on an unknown algorithm instead of in every worker
+    get_solver(algorithm)
+    queries = list(queries)
+    batches = [(algorithm, queries[i:i + batch_size]) for i in range(0, len(queries), batch_size)]
+
+    adjacency = maze.adjacency()
+    target_count = len(adjacency.targets)
+    offsets_end, targets_end, walls_end, costs_end = shared_layout(maze.cols, maze.rows, target_count, maze.has_costs)
+    memory = SharedMemory(create = True, size = costs_end)
+    try:
+        buffer = memory.buf
+        buffer[:offsets_end] = memoryview(adjacency.offsets).cast("B")
+        buffer[offsets_end:targets_end] = memoryview(adjacency.targets).cast("B")
+        buffer[targets_end:walls_end] = maze.walls
+        if maze.has_costs:
+            buffer[walls_end:costs_end] = maze.costs
+        del buffer
+        initargs = (memory.name, maze.cols, maze.rows, target_count, maze.has_costs)
+        pool = Pool(processes, initializer = init_worker, initargs = initargs)
+        try:
+            results = []
+            for batch in pool.imap(solve_batch, batches):
+                results.extend(batch)
+            # Let the workers exit on their own, so that they release the block
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    finally:
+        memory.close()
+        memory.unlink()
+    return results
@@ -0,0 +1,290 @@
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+import tracemalloc
+from maze import Maze
+from generation.backtracker import generate_maze_bulk
+from engine.registry import SOLVERS
+from engine.instrument import SearchProfile
+
+# Columns of the benchmark report
+FIELDS = ["maze", "generator", "seed", "algorithm", "wall_time", "index_time", "nodes_expanded", "peak_memory", "path_length"]
+# Extra columns of the instrumented runs
+PROFILE_FIELDS = ["nodes_enqueued", "duplicate_pushes", "peak_frontier", "neighbor_time", "queue_time"]
+
+# Solvers that accept a SearchProfile; Corridor A* expands the nodes of the contracted graph, not cells
+PROFILED_SOLVERS = ["BFS", "DFS", "Bidirectional BFS", "A*", "GBFS", "Bidirectional A*", "Dijkstra", "Weighted A*"]
+
+def parse_size(text: str):
+    """
+    Parse a maze size written as COLSxROWS, e.g. "24x18".
+
+    Args:
+    - text (str): The size to parse.
+
+    Returns:
+    - (cols, rows) (Tuple[int, int]): The number of columns and rows.
+    """
+
+    cols, _, rows = text.lower().partition("x")
+    if not cols.isdigit() or not rows.isdigit() or int(cols) < 1 or int(rows) < 1:
+        raise argparse.ArgumentTypeError(f"invalid maze size {text!r}, expected COLSxROWS")
+    return int(cols), int(rows)
+
+# Maze generators that can be benchmarked, the row generators need NumPy
+GENERATORS = ["backtracker", "eller", "sidewinder", "binary_tree"]
+
+def generate_benchmark_maze(cols: int, rows: int, seed: int, generator: str = "backtracker", max_cost: int = 1):
+    """
+    Generate a seeded maze for the benchmark.
+
+    Args:
+    - cols (int): Number of columns of the maze.
+    - rows (int): Number of rows of the maze.
+    - seed (int): Seed of the random generator.
+    - generator (str): The generation algorithm, one of GENERATORS.
+    - max_cost (int): Give every cell a random traversal cost from 1 to max_cost; all the cells
+      cost 1 when it is 1.
+
+    Returns:
+    - maze (Maze): The generated maze.
+    """
+
+    if generator == "backtracker":
+        maze = generate_maze_bulk(Maze(cols, rows), seed)
+    else:
+        from generation.rows import generate_maze_rows
+        maze = generate_maze_rows(Maze(cols, rows), generator, seed)
+
+    if max_cost > 1:
+        rng = random.Random(seed)
+        maze.costs = bytearray(rng.randint(1, max_cost) for _ in range(maze.size))
+    return maze
+
+def run_benchmark(sizes, mazes: int, seed: int, algorithms, measure_memory: bool = True, generator: str = "backtracker",
+                  max_cost: int = 1, instrument: bool = False, backend: str = "python"):
+    """
+    Generate `mazes` seeded mazes of every size and run every algorithm on each of them headless.
+
+    Args:
+    - sizes (List[Tuple[int, int]]): The (cols, rows) sizes of the mazes.
+    - mazes (int): Number of mazes per size.
+    - seed (int): Seed of the first maze, the following mazes use seed + 1, seed + 2...
+    - algorithms (List[str]): Names of the algorithms to run, keys of SOLVERS.
+    - measure_memory (bool): Run every solver a second time under tracemalloc to record its peak memory.
+    - generator (str): The maze generation algorithm, one of GENERATORS.
+    - max_cost (int): The largest random traversal cost of the cells, 1 for uniform mazes.
+    - instrument (bool): Run the solvers that support it (PROFILED_SOLVERS) once more with a SearchProfile
+      and add the PROFILE_FIELDS columns, which are None for the other solvers.
+    - backend (str): "python", or "numba" for the compiled kernels (the Python solvers are used for
+      the algorithms without a kernel, or when Numba is not installed).
+
+    Returns:
+    - results (List[dict]): One row per (maze, seed, algorithm) with the FIELDS columns.
+    """
+
+    solvers = dict(SOLVERS)
+    if backend == "numba":
+        from engine.compiled import get_backend_solver
+        solvers.update((algorithm, get_backend_solver(algorithm, backend)) for algorithm in algorithms)
+
+    results = []
+    for cols, rows in sizes:
+        for maze_seed in range(seed, seed + mazes):
+            maze = generate_benchmark_maze(cols, rows, maze_seed, generator, max_cost)
+
+            # The adjacency index is shared by all the solvers, so it is timed on its own
+            started = time.perf_counter()
+            maze.adjacency()
+            index_time = time.perf_counter() - started
+
+            for algorithm in algorithms:
+                path, stats = solvers[algorithm](maze)
+
+                peak_memory = None
+                if measure_memory:
+                    tracemalloc.start()
+                    solvers[algorithm](maze)
+                    peak_memory = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                row = {
+                    "maze": f"{cols}x{rows}" + (f"w{max_cost}" if max_cost > 1 else ""),
+                    "generator": generator,
+                    "seed": maze_seed,
+                    "algorithm": algorithm,
+                    "wall_time": stats.elapsed_time,
+                    "index_time": index_time,
+                    "nodes_expanded": stats.visited_cells_count,
+                    "peak_memory": peak_memory,
+                    "path_length": len(path) if path else 0,
+                }
+
+                # The instrumented run is separate, so the wrappers do not inflate wall_time
+                if instrument:
+                    profile = None
+                    if algorithm in PROFILED_SOLVERS:
+                        profile = SearchProfile()
+                        SOLVERS[algorithm](maze, profile = profile)
+                    row.update((field, getattr(profile, field) if profile else None) for field in PROFILE_FIELDS)
+                results.append(row)
+    return results
+
+def write_results(results, out, output_format: str):
+    """
+    Write the benchmark rows as CSV or JSON.
+
+    Args:
+    - results (List[dict]): The benchmark rows.
+    - out (TextIO): The file to write to.
+    - output_format (str): "csv" or "json".
+    """
+
+    if output_format == "json":
+        json.dump(results, out, indent = 2)
+        out.write("\n")
+    else:
+        writer = csv.DictWriter(out, fieldnames = FIELDS + [field for field in PROFILE_FIELDS if results and field in results[0]])
+        writer.writeheader()
+        writer.writerows(results)
+
+def load_results(path: str):
+    """
+    Load benchmark rows previously written as JSON or CSV (chosen by the file extension).
+
+    Args:
+    - path (str): The path of the saved results.
+
+    Returns:
+    - results (List[dict]): The benchmark rows.
+    """
+
+    with open(path, newline = "") as file:
+        if path.endswith(".json"):
+            return json.load(file)
+        results = []
+        for row in csv.DictReader(file):
+            for field in ("seed", "nodes_expanded", "path_length"):
+                row[field] = int(row[field])
+            for field in ("wall_time", "index_time"):
+                row[field] = float(row[field])
+            row["peak_memory"] = int(row["peak_memory"]) if row["peak_memory"] else None
+            results.append(row)
+        return results
+
+def compare_with_baseline(results, baseline, tolerance: float, min_time: float = 0.001):
+    """
+    Compare benchmark rows with a saved baseline.
+
+    A row regresses when its path length or expanded node count differs from the baseline, or when
+    its wall time or peak memory grew by more than `tolerance` (a fraction, e.g. 0.2 for +20%).
+    Wall time changes smaller than `min_time` seconds are ignored as timer noise.
+
+    Args:
+    - results (List[dict]): The new benchmark rows.
+    - baseline (List[dict]): The baseline rows.
+    - tolerance (float): The allowed relative growth of wall time and peak memory.
+    - min_time (float): The smallest wall time growth, in seconds, reported as a regression.
+
+    Returns:
+    - regressions (List[str]): A description of every regression found.
+    """
+
+    baseline_rows = {(row["maze"], row["generator"], row["seed"], row["algorithm"]): row for row in baseline}
+    regressions = []
+
+    for row in results:
+        key = (row["maze"], row["generator"], row["seed"], row["algorithm"])
+        old = baseline_rows.get(key)
+        if old is None:
+            continue
+        name = "{} {} seed {} {}".format(*key)
+
+        # Search results must be identical, only time and memory may vary
+        for field in ("path_length", "nodes_expanded"):
+            if row[field] != old[field]:
+                regressions.append(f"{name}: {field} changed from {old[field]} to {row[field]}")
+        for field in ("wall_time", "peak_memory"):
+            if field == "wall_time" and row[field] - old[field] < min_time:
+                continue
+            if row[field] is not None and old[field] and row[field] > old[field] * (1 + tolerance):
+                regressions.append(f"{name}: {field} grew from {old[field]} to {row[field]} "
+                                   f"(+{row[field] / old[field] - 1:.0%})")
+    return regressions
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Benchmark the headless maze solvers on seeded mazes.")
+    parser.add_argument("--sizes", type = lambda text: [parse_size(size) for size in text.split(",")],
+                        default = [(24, 18), (128, 128)], help = "comma separated COLSxROWS sizes (default: 24x18,128x128)")
+    parser.add_argument("--mazes", type = int, default = 3, help = "number of mazes per size (default: 3)")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the first maze (default: 0)")
+    parser.add_argument("--generator", choices = GENERATORS, default = "backtracker",
+                        help = "maze generation algorithm (default: backtracker)")
+    parser.add_argument("--max-cost", type = int, default = 1,
+                        help = "give the cells random traversal costs from 1 to MAX_COST (default: 1, uniform)")
+    parser.add_argument("--algorithms", type = lambda text: text.split(","), default = list(SOLVERS),
+                        help = "comma separated algorithms (default: all of {})".format(", ".join(SOLVERS)))
+    parser.add_argument("--format", choices = ("csv", "json"), default = "csv", help = "output format (default: csv)")
+    parser.add_argument("--output", help = "write the results to this file instead of stdout")
+    parser.add_argument("--no-memory", action = "store_true", help = "skip the tracemalloc peak memory run")
+    parser.add_argument("--instrument", action = "store_true",
+                        help = "add enqueued nodes, duplicate pushes, peak frontier and neighbor/queue times")
+    parser.add_argument("--backend", choices = ("python", "numba"), default = "python",
+                        help = "solver implementation (default: python); numba falls back to python when not installed")
+    parser.add_argument("--verify-backend", action = "store_true",
+                        help = "check that the numba kernels find the same paths as the python solvers, then exit")
+    parser.add_argument("--baseline", help = "compare with results saved by a previous run (.json or .csv)")
+    parser.add_argument("--tolerance", type = float, default = 0.25,
+                        help = "allowed relative wall time/memory growth against the baseline (default: 0.25)")
+    parser.add_argument("--min-time", type = float, default = 0.001,
+                        help = "ignore wall time growth below this many seconds (default: 0.001)")
+    args = parser.parse_args(argv)
+
+    unknown = [algorithm for algorithm in args.algorithms if algorithm not in SOLVERS]
+    if unknown:
+        parser.error(f"unknown algorithm(s): {', '.join(unknown)}")
+    if not 1 <= args.max_cost <= 255:
+        parser.error("--max-cost must be between 1 and 255")
+    unprofiled = [algorithm for algorithm in args.algorithms if algorithm not in PROFILED_SOLVERS]
+    if args.instrument and unprofiled:
+        print(f"--instrument is not supported by {', '.join(unprofiled)}, their profile columns are left empty",
+              file = sys.stderr)
+
+    if args.backend == "numba" or args.verify_backend:
+        from engine.compiled import NUMBA_AVAILABLE, check_equivalence
+        if not NUMBA_AVAILABLE:
+            print("Numba is not installed, the python solvers are used" if not args.verify_backend else
+                  "Numba is not installed, the kernels are checked as plain python", file = sys.stderr)
+        if args.verify_backend:
+            mazes = [generate_benchmark_maze(cols, rows, maze_seed, args.generator)
+                     for cols, rows in args.sizes for maze_seed in range(args.seed, args.seed + args.mazes)]
+            # Without Numba the kernels still run as plain python, so their logic is checked either way
+            mismatches = check_equivalence(mazes, seed = args.seed, force = True)
+            for mismatch in mismatches:
+                print("MISMATCH: " + mismatch, file = sys.stderr)
+            return 1 if mismatches else 0
+
+    results = run_benchmark(args.sizes, args.mazes, args.seed, args.algorithms, measure_memory = not args.no_memory,
+                            generator = args.generator, max_cost = args.max_cost, instrument = args.instrument,
+                            backend = args.backend)
+
+    if args.output:
+        with open(args.output, "w", newline = "") as out:
+            write_results(results, out, args.format)
+    else:
+        write_results(results, sys.stdout, args.format)
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, load_results(args.baseline), args.tolerance, args.min_time)
+        for regression in regressions:
+            print("REGRESSION: " + regression, file = sys.stderr)
+        if regressions:
+            return 1
+        print("No regression against " + args.baseline, file = sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
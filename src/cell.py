@@ -1,9 +1,7 @@
 import pygame
+from collections.abc import Sequence
 from config import *
-
-pygame.init()
-sc = pygame.display.set_mode(RESOLUTION)
-clock = pygame.time.Clock()
+from maze import Maze, WallsView, WALL_BITS
 
 class Cell:
     """
@@ -40,9 +38,12 @@ class Cell:
         self.visited = False
         self.is_solution = False
 
-    def draw_current_cell(self):
+    def draw_current_cell(self, sc: pygame.Surface):
         """
         Highlights the current cell by drawing a rectangle on the screen with a distinct color.
+
+        Args:
+        - sc (pygame.Surface): The Pygame surface on which the cell is drawn.
         """
 
         # Calculate the position of the cell in the display based on grid coordinates
@@ -179,4 +180,124 @@ class Cell:
         if len(neighbors) > 0:
             return neighbors
         else:
-            return []
\ No newline at end of file
+            return []
+
+class MazeCell(Cell):
+    """
+    A Cell backed by a packed Maze: its walls and flags are read from and written to the maze,
+    so `draw_maze`, `generate_maze` and the solvers can run on top of the compact representation.
+
+    Attributes:
+    - maze (Maze): The maze the cell belongs to.
+    - index (int): The index of the cell in the maze.
+    """
+
+    def __init__(self, maze: Maze, x, y):
+        """
+        Initializes a view of the cell at x, y of the maze. The state of the maze is left untouched.
+
+        Args:
+        - maze (Maze): The maze the cell belongs to.
+        - x (int): The x-coordinate of the cell in the maze grid.
+        - y (int): The y-coordinate of the cell in the maze grid.
+        """
+
+        self.maze = maze
+        self.x, self.y = x, y
+        self.index = maze.index(x, y)
+        self._walls = WallsView(maze, self.index)
+
+    def __eq__(self, other):
+        # The views are created on access, two views of the same cell are the same cell
+        if not isinstance(other, MazeCell):
+            return NotImplemented
+        return self.maze is other.maze and self.index == other.index
+
+    def __hash__(self):
+        return hash((id(self.maze), self.index))
+
+    @property
+    def walls(self):
+        return self._walls
+
+    @walls.setter
+    def walls(self, walls):
+        self.maze.set_walls(self.index, sum(bit for name, bit in WALL_BITS.items() if walls[name]))
+
+    @property
+    def generated(self):
+        return self.index in self.maze.generated
+
+    @generated.setter
+    def generated(self, value):
+        if value:
+            self.maze.generated.add(self.index)
+        else:
+            self.maze.generated.discard(self.index)
+
+    @property
+    def visited(self):
+        return self.index in self.maze.visited
+
+    @visited.setter
+    def visited(self, value):
+        if value:
+            self.maze.visited.add(self.index)
+        else:
+            self.maze.visited.discard(self.index)
+
+    @property
+    def is_solution(self):
+        return self.index in self.maze.solution
+
+    @is_solution.setter
+    def is_solution(self, value):
+        if value:
+            self.maze.solution.add(self.index)
+        else:
+            self.maze.solution.discard(self.index)
+
+    def check_cell(self, grid_cells, x, y):
+        """
+        Same as `Cell.check_cell`, but bounded by the dimensions of the maze instead of the config.
+        """
+        if x < 0 or x > self.maze.cols - 1 or y < 0 or y > self.maze.rows - 1:
+            return False
+        return grid_cells[self.maze.index(x, y)]
+
+def maze_cells(maze: Maze):
+    """
+    Creates the list of MazeCell views of a maze, in the same order as a grid_cells list.
+
+    Args:
+    - maze (Maze): The packed maze.
+
+    Returns:
+    - grid_cells (List[MazeCell]): One view per cell of the maze.
+    """
+    return [MazeCell(maze, col, row) for row in range(maze.rows) for col in range(maze.cols)]
+
+class MazeCells(Sequence):
+    """
+    The MazeCell views of a maze, like the list returned by `maze_cells`, but every view is created
+    when it is accessed. Large mazes would need millions of Python objects otherwise.
+
+    Attributes:
+    - maze (Maze): The packed maze.
+    """
+
+    def __init__(self, maze: Maze):
+        self.maze = maze
+
+    def __len__(self):
+        return self.maze.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.maze.size))]
+        if index < 0:
+            index += self.maze.size
+        if not 0 <= index < self.maze.size:
+            raise IndexError("cell index out of range")
+        x, y = self.maze.coords(index)
+        return MazeCell(self.maze, x, y)
@@ -6,6 +6,8 @@ TILE_SIZE = 40
 cols, rows = 24, 18
 # Starting position of the maze (top left)
 MAZE_OFFSET = 240
+# Smallest cell size (pixel) at which the viewport of large mazes draws the walls as lines
+DETAIL_TILE_SIZE = 10
 
 # Colors
 BACKGROUND_COLOR = "#1e1e1e"
@@ -18,3 +20,13 @@ CELL_SOLUTION_COLOR = "#00FF00"
 
 # Font
 FONT = "Cambria"
+
+# File the visualizer saves the maze to and loads it from
+MAZE_FILE = "saved.maze"
+# Search trace replayed by the visualizer, recorded with record_trace.py
+TRACE_FILE = "last.trace"
+
+# Number of cells expanded by a running search that the visualizer shows per second, more on
+# large mazes so that showing a search never takes longer than SEARCH_PLAYBACK_SECONDS
+SEARCH_STEPS_PER_SECOND = 60
+SEARCH_PLAYBACK_SECONDS = 20
@@ -0,0 +1,87 @@
+import time
+import heapq
+from maze import Maze, as_maze
+from engine.instrument import SearchProfile
+from engine.common import SearchStats, reconstruct_path, manhattan_distance
+
+def find_path_A_star(maze: Maze, on_step=None, start: int = 0, destination: int = None,
+                     profile: SearchProfile = None):
+    """
+    Find a path through the maze using the A* algorithm with the Manhattan distance heuristic,
+    without any rendering.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run.
+    """
+    stats = SearchStats("A*")
+    started = time.perf_counter()
+    maze = as_maze(maze)
+    neighbors_of = maze.adjacency().neighbors
+
+    # The search goes from the first to the last cell unless other cells are given
+    if destination is None:
+        destination = maze.size - 1
+
+    cols = maze.cols
+    goal_x, goal_y = maze.coords(destination)
+
+    # Priority queue for the open set (holds tuples of (f_cost, h_cost, index)). Instead of a
+    # decrease-key, an improved cell is pushed again and its stale entries are skipped when popped.
+    open_set = []
+    push, pop = heapq.heappush, heapq.heappop
+    if profile is not None:
+        # Route the hot primitives through the profile's timed wrappers
+        neighbors_of, push, pop = profile.neighbors(neighbors_of), profile.push(push), profile.pop(pop)
+        on_step = profile.step(on_step)
+    push(open_set, (manhattan_distance(cols, start, destination), 0, start))
+
+    # G cost: actual distance from start, only stored for the cells reached so far
+    g_cost = {start: 0}
+    # Closed set, one byte per cell; parent dictionary for path reconstruction
+    closed = bytearray(maze.size)
+    parent = {start: None}
+
+    # Main loop for A* search
+    path = None
+    while open_set:
+        # Pop the cell with the lowest f_cost from the priority queue, skipping stale entries
+        _, _, current = pop(open_set)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        stats.visited_cells_count += 1
+        if on_step is not None:
+            on_step(current)
+
+        # If we reached the destination, reconstruct the path
+        if current == destination:
+            path = reconstruct_path(parent, destination)
+            break
+
+        # Distance between adjacent cells is 1
+        tentative_g_cost = g_cost[current] + 1
+
+        # Explore neighbors of the current cell
+        for neighbor in neighbors_of(current):
+            if closed[neighbor]:
+                continue
+
+            # If a shorter path is found, (re)insert the neighbor with its new f_cost
+            if tentative_g_cost < g_cost.get(neighbor, tentative_g_cost + 1):
+                parent[neighbor] = current
+                g_cost[neighbor] = tentative_g_cost
+                y, x = divmod(neighbor, cols)
+                h_cost = abs(x - goal_x) + abs(y - goal_y)
+                push(open_set, (tentative_g_cost + h_cost, h_cost, neighbor))
+
+    stats.solution_length = len(path) if path else 0
+    stats.elapsed_time = time.perf_counter() - started
+    return path, stats
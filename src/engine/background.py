@@ -0,0 +1,128 @@
+import queue
+import threading
+from collections import deque
+from maze import Maze, as_maze
+
+# Messages from the worker thread: a batch of expanded cells, the result, or an error
+STEPS, DONE, ERROR = 0, 1, 2
+
+class SearchCancelled(Exception):
+    """
+    Raised in the worker thread by the step callback to stop a cancelled search.
+    """
+
+class BackgroundSearch:
+    """
+    Runs a headless solver from the `engine` package on a worker thread.
+
+    The expanded cells are streamed to the thread that started the search through a queue, in
+    batches to keep the locking overhead low, so a render loop can show them at its own pace
+    while the search runs at full speed. The solvers keep their own search state and only read
+    the walls, which must not change until the search is finished or cancelled.
+
+    Attributes:
+    - path (List[int]): Indices of the cells from the start to the destination, None until the search
+      is finished or if there is no path.
+    - stats (SearchStats): Statistics of the search run, None until the search is finished.
+    """
+
+    def __init__(self, solver, maze: Maze, start: int = 0, destination: int = None, batch_size: int = 64):
+        """
+        Starts the search.
+
+        Args:
+        - solver (Callable): The headless solver, called as solver(maze, on_step, start=start, destination=destination).
+        - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+        - start (int): Index of the start cell, the first cell by default.
+        - destination (int, optional): Index of the destination cell, the last cell by default.
+        - batch_size (int): Number of expanded cells sent at once.
+        """
+
+        self.path = None
+        self.stats = None
+        self.events = queue.SimpleQueue()
+        self.cancelled = threading.Event()
+        # Expanded cells received but not returned by poll yet
+        self.pending = deque()
+        self.result_received = False
+
+        self.thread = threading.Thread(target = self.run, args = (solver, as_maze(maze), start, destination, batch_size),
+                                       daemon = True)
+        self.thread.start()
+
+    def run(self, solver, maze: Maze, start: int, destination: int, batch_size: int):
+        """
+        Body of the worker thread.
+        """
+        events, cancelled = self.events, self.cancelled
+        batch = []
+
+        def on_step(index: int):
+            nonlocal batch
+            if cancelled.is_set():
+                raise SearchCancelled
+            batch.append(index)
+            if len(batch) >= batch_size:
+                events.put((STEPS, batch))
+                batch = []
+
+        try:
+            result = solver(maze, on_step, start = start, destination = destination)
+        except SearchCancelled:
+            return
+        except Exception as error:
+            events.put((ERROR, error))
+            return
+        events.put((STEPS, batch))
+        events.put((DONE, result))
+
+    def poll(self, max_steps: int = None):
+        """
+        Returns the next cells expanded by the search, without waiting for the worker.
+
+        Args:
+        - max_steps (int, optional): Return at most this many cells, the others are kept for the next
+          calls. All the cells received so far by default.
+
+        Returns:
+        - steps (List[int]): The expanded cells, in order.
+        """
+        if self.cancelled.is_set():
+            return []
+
+        pending = self.pending
+        while max_steps is None or len(pending) < max_steps:
+            try:
+                kind, value = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == STEPS:
+                pending.extend(value)
+            elif kind == DONE:
+                self.path, self.stats = value
+                self.result_received = True
+            else:
+                raise value
+
+        count = len(pending) if max_steps is None else min(max_steps, len(pending))
+        return [pending.popleft() for _ in range(count)]
+
+    @property
+    def finished(self):
+        """
+        Whether the search was cancelled, or is over and all its expanded cells were polled.
+        """
+        return self.cancelled.is_set() or (self.result_received and not self.pending)
+
+    def cancel(self):
+        """
+        Stops the search: the worker thread stops at its next expanded cell and nothing more is polled.
+        """
+        self.cancelled.set()
+        self.pending.clear()
+
+    def wait(self, timeout: float = None):
+        """
+        Waits for the worker thread to stop.
+        """
+        self.thread.join(timeout)
@@ -0,0 +1,127 @@
+import time
+from collections import deque
+from maze import Maze, as_maze
+from engine.instrument import SearchProfile
+from engine.common import SearchStats, reconstruct_path
+
+def find_path_BFS(maze: Maze, on_step=None, start: int = 0, destination: int = None,
+                  profile: SearchProfile = None):
+    """
+    Find a path through the maze using Breadth-First Search (BFS) without any rendering.
+
+    The search runs from the start cell to the destination one, one level (distance from the
+    start) at a time. Cells are marked as discovered when they are enqueued, so each cell is
+    enqueued and expanded at most once. The search keeps its own visited state, so the flags
+    stored on the cells are neither read nor modified.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell,
+      e.g. to visualize the search. Nothing is called when omitted.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run.
+    """
+    stats = SearchStats("BFS")
+    started = time.perf_counter()
+    maze = as_maze(maze)
+    neighbors_of = maze.adjacency().neighbors
+
+    # The search goes from the first to the last cell unless other cells are given
+    if destination is None:
+        destination = maze.size - 1
+
+    # Initialize needed structures for BFS and path reconstucting. The parent dictionary
+    # doubles as the set of discovered cells.
+    queue = deque()
+    push, pop = queue.append, queue.popleft
+    if profile is not None:
+        # Route the hot primitives through the profile's timed wrappers
+        neighbors_of, push, pop = profile.neighbors(neighbors_of), profile.push(push), profile.pop(pop)
+        on_step = profile.step(on_step)
+    push(start)
+    parent = {start: None}
+
+    # Main BFS loop, expanding the whole frontier of the current level before the next one
+    path = None
+    while queue and path is None:
+        for _ in range(len(queue)):
+            # Dequeue the first cell
+            current = pop()
+            stats.visited_cells_count += 1
+            if on_step is not None:
+                on_step(current)
+
+            # Check if the current cell is the destination
+            if current == destination:
+                path = reconstruct_path(parent, destination)
+                break
+
+            # Check neighbors and enqueue the ones that have not been discovered yet
+            for neighbor in neighbors_of(current):
+                if neighbor not in parent:
+                    parent[neighbor] = current
+                    push(neighbor)
+
+    stats.solution_length = len(path) if path else 0
+    stats.elapsed_time = time.perf_counter() - started
+    return path, stats
+
+def find_paths_BFS(maze: Maze, goals, on_step=None, start: int = 0):
+    """
+    Find the paths from one start cell to many destination cells with a single Breadth-First Search.
+
+    Every cell is expanded at most once whatever the number of goals, and the search stops as soon
+    as the last goal is reached, so it is much cheaper than one `find_path_BFS` call per goal.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - goals (Iterable[int]): Indices of the destination cells.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell.
+    - start (int): Index of the start cell, the first cell by default.
+
+    Returns:
+    - paths (Dict[int, List[int]]): The shortest path from the start to every goal, None for the
+      goals that can not be reached.
+    - stats (SearchStats): Statistics of the search run; solution_length is the length of the longest path.
+    """
+    stats = SearchStats("BFS")
+    started = time.perf_counter()
+    maze = as_maze(maze)
+    neighbors_of = maze.adjacency().neighbors
+
+    paths = dict.fromkeys(goals)
+    remaining = set(paths)
+
+    queue = deque([start])
+    parent = {start: None}
+
+    # Same level by level search as find_path_BFS, until every goal has been expanded
+    while queue and remaining:
+        for _ in range(len(queue)):
+            current = queue.popleft()
+            stats.visited_cells_count += 1
+            if on_step is not None:
+                on_step(current)
+
+            if current in remaining:
+                remaining.discard(current)
+                if not remaining:
+                    break
+
+            for neighbor in neighbors_of(current):
+                if neighbor not in parent:
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+
+    for goal in paths:
+        if goal in parent:
+            paths[goal] = reconstruct_path(parent, goal)
+
+    stats.solution_length = max((len(path) for path in paths.values() if path), default = 0)
+    stats.elapsed_time = time.perf_counter() - started
+    return paths, stats
@@ -0,0 +1,131 @@
+import time
+import heapq
+from maze import Maze, as_maze
+from engine.instrument import SearchProfile
+from engine.common import SearchStats, reconstruct_path, manhattan_distance
+
+def find_path_bidirectional_A_star(maze: Maze, on_step=None, start: int = 0, destination: int = None,
+                                   profile: SearchProfile = None, use_heuristic: bool = True):
+    """
+    Find a shortest path through the maze with bidirectional A*, searching from the start and from
+    the destination until the two searches provably can not improve the best connection found,
+    without any rendering.
+
+    Both searches use the average potential p(v) = (h_destination(v) - h_start(v)) / 2 (the reverse
+    search uses -p), with the Manhattan distances h. Unlike running plain A* from both ends, these
+    potentials are consistent with each other, so the search can stop as soon as the smallest keys
+    of both open sets add up to the length of the best connection found, and that connection is a
+    shortest path. The keys are doubled to stay integers.
+
+    Every step expands a cell of the side with the smaller open set, so the work is balanced when
+    one end of the maze is more open than the other.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell, once
+      even if both sides expand it.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given,
+      for both sides together.
+    - use_heuristic (bool): Use the Manhattan potentials; without them the search is a bidirectional
+      Dijkstra, i.e. a bidirectional BFS with the same stopping criterion.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run, with the cells expanded by each side in
+      forward_cells_count and backward_cells_count.
+    """
+    stats = SearchStats("Bidirectional A*" if use_heuristic else "Bidirectional Dijkstra")
+    started = time.perf_counter()
+    maze = as_maze(maze)
+    neighbors_of = maze.adjacency().neighbors
+
+    # The search goes from the first to the last cell unless other cells are given
+    if destination is None:
+        destination = maze.size - 1
+
+    cols = maze.cols
+
+    def potential(cell: int):
+        # Twice the potential of the forward search
+        if not use_heuristic:
+            return 0
+        return manhattan_distance(cols, cell, destination) - manhattan_distance(cols, cell, start)
+
+    forward_push = backward_push = heapq.heappush
+    pop = heapq.heappop
+    if profile is not None:
+        # Route the hot primitives through the profile's timed wrappers, one push per side so that
+        # the duplicate pushes are counted per side
+        neighbors_of, pop = profile.neighbors(neighbors_of), profile.pop(pop)
+        forward_push, backward_push = profile.push(heapq.heappush), profile.push(heapq.heappush)
+        on_step = profile.step(on_step)
+
+    # Open sets of (doubled key, index) tuples, G costs, parents and closed sets of both sides.
+    # An improved cell is pushed again and its stale entries are skipped.
+    forward_open, backward_open = [], []
+    forward_g, backward_g = {start: 0}, {destination: 0}
+    forward_parent, backward_parent = {start: None}, {destination: None}
+    forward_closed, backward_closed = bytearray(maze.size), bytearray(maze.size)
+    forward_push(forward_open, (potential(start), start))
+    backward_push(backward_open, (-potential(destination), destination))
+    # (open set, push, G costs, parents, closed set, G costs of the other side, sign of the potential)
+    sides = ((forward_open, forward_push, forward_g, forward_parent, forward_closed, backward_g, 1),
+             (backward_open, backward_push, backward_g, backward_parent, backward_closed, forward_g, -1))
+    side_counts = [0, 0]
+    # Cells expanded by either side, so that every cell is counted and shown once
+    expanded = bytearray(maze.size)
+
+    # Best connection found so far: (path length - 1, meeting cell)
+    best = (0, start) if start == destination else None
+
+    while True:
+        for open_set, _, _, _, closed, _, _ in sides:
+            while open_set and closed[open_set[0][1]]:
+                pop(open_set)
+        if not forward_open or not backward_open:
+            break
+        # No path through the cells left in the open sets can be shorter than the best connection
+        if best is not None and forward_open[0][0] + backward_open[0][0] >= 2 * best[0]:
+            break
+
+        side = 0 if len(forward_open) <= len(backward_open) else 1
+        open_set, push, g_cost, parent, closed, other_g_cost, sign = sides[side]
+        _, current = pop(open_set)
+        closed[current] = 1
+        side_counts[side] += 1
+        if not expanded[current]:
+            expanded[current] = 1
+            stats.visited_cells_count += 1
+            if on_step is not None:
+                on_step(current)
+
+        tentative_g_cost = g_cost[current] + 1
+        for neighbor in neighbors_of(current):
+            if closed[neighbor]:
+                continue
+            if tentative_g_cost < g_cost.get(neighbor, tentative_g_cost + 1):
+                g_cost[neighbor] = tentative_g_cost
+                parent[neighbor] = current
+                push(open_set, (2 * tentative_g_cost + sign * potential(neighbor), neighbor))
+
+                # A cell reached by both sides connects the start and the destination
+                if neighbor in other_g_cost:
+                    length = tentative_g_cost + other_g_cost[neighbor]
+                    if best is None or length < best[0]:
+                        best = (length, neighbor)
+
+    path = None
+    if best is not None:
+        # Start to the meeting cell + meeting cell to destination
+        path = reconstruct_path(forward_parent, best[1])
+        current = backward_parent[best[1]]
+        while current is not None:
+            path.append(current)
+            current = backward_parent[current]
+
+    stats.forward_cells_count, stats.backward_cells_count = side_counts
+    stats.solution_length = len(path) if path else 0
+    stats.elapsed_time = time.perf_counter() - started
+    return path, stats
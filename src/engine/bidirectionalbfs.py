@@ -0,0 +1,104 @@
+import time
+from collections import deque
+from maze import Maze, as_maze
+from engine.instrument import SearchProfile
+from engine.common import SearchStats, reconstruct_path
+
+def find_path_bidirectional_BFS(maze: Maze, on_step=None, start: int = 0, destination: int = None,
+                                profile: SearchProfile = None):
+    """
+    Find a path through the maze using bidirectional BFS, which searches simultaneously from the
+    start and the destination cells until the two searches meet, without any rendering.
+
+    The two sides take turns expanding a whole level of their frontier. Once a level connects the
+    two searches, the shortest of the connections found during that level is kept, so the path is
+    as short as the one found by BFS.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell,
+      from either side.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given,
+      for both sides together.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run, with the cells expanded by each side in
+      forward_cells_count and backward_cells_count.
+    """
+    stats = SearchStats("Bidirectional BFS")
+    started = time.perf_counter()
+    maze = as_maze(maze)
+    neighbors_of = maze.adjacency().neighbors
+
+    # The search goes from the first to the last cell unless other cells are given
+    if destination is None:
+        destination = maze.size - 1
+
+    # Two queues, two parent dicts (which double as discovered sets) and two depth dicts for both ends
+    start_queue = deque()
+    end_queue = deque()
+    start_push, start_pop = start_queue.append, start_queue.popleft
+    end_push, end_pop = end_queue.append, end_queue.popleft
+    if profile is not None:
+        # Route the hot primitives through the profile's timed wrappers
+        neighbors_of, on_step = profile.neighbors(neighbors_of), profile.step(on_step)
+        start_push, start_pop = profile.push(start_push), profile.pop(start_pop)
+        end_push, end_pop = profile.push(end_push), profile.pop(end_pop)
+    start_push(start)
+    end_push(destination)
+    start_parent = {start: None}
+    end_parent = {destination: None}
+    start_depth = {start: 0}
+    end_depth = {destination: 0}
+    sides = ((start_queue, start_push, start_pop, start_parent, start_depth, end_depth),
+             (end_queue, end_push, end_pop, end_parent, end_depth, start_depth))
+
+    # Best connection found so far: (path length, cell on the start side, cell on the end side)
+    meeting = (1, start, None) if start == destination else None
+    turn = 0
+    side_counts = [0, 0]
+
+    # Main Bidirectional Search loop
+    while meeting is None and start_queue and end_queue:
+        queue, push, pop, parent, depth, other_depth = sides[turn]
+
+        # Expand the whole current level of this side
+        for _ in range(len(queue)):
+            current = pop()
+            stats.visited_cells_count += 1
+            side_counts[turn] += 1
+            if on_step is not None:
+                on_step(current)
+
+            next_depth = depth[current] + 1
+            for neighbor in neighbors_of(current):
+                if neighbor not in parent:
+                    parent[neighbor] = current
+                    depth[neighbor] = next_depth
+                    push(neighbor)
+
+                # Check if the search meets the other side and keep the shortest connection
+                if neighbor in other_depth:
+                    length = next_depth + other_depth[neighbor] + 1
+                    if meeting is None or length < meeting[0]:
+                        meeting = (length, current, neighbor) if turn == 0 else (length, neighbor, current)
+
+        turn ^= 1
+
+    path = None
+    if meeting is not None:
+        # Start to the start side of the connection + end side of the connection to destination
+        _, start_side, end_side = meeting
+        path = reconstruct_path(start_parent, start_side)
+        current = end_side
+        while current is not None:
+            path.append(current)
+            current = end_parent[current]
+
+    stats.forward_cells_count, stats.backward_cells_count = side_counts
+    stats.solution_length = len(path) if path else 0
+    stats.elapsed_time = time.perf_counter() - started
+    return path, stats
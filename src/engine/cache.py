@@ -0,0 +1,176 @@
+import sys
+import hashlib
+import weakref
+from collections import OrderedDict, namedtuple
+from maze import Maze, as_maze
+
+# A cached search: the path (else None), its stats, and the expanded cells in order if they were recorded
+CachedSolution = namedtuple("CachedSolution", ["path", "stats", "expanded"])
+
+# Fingerprints of the mazes seen so far, as ((version, costs_version), fingerprint), recomputed when
+# either version changes
+fingerprints = weakref.WeakKeyDictionary()
+
+def maze_fingerprint(maze: Maze):
+    """
+    Returns a hash of the walls and costs of a maze: a 128-bit BLAKE2b digest, so two different mazes
+    of the same size never share cached paths in practice (a 32-bit checksum would collide after tens of
+    thousands of mazes).
+
+    Computing it reads the whole maze, so it is cached and only computed again when the version or the
+    costs_version of the maze changed, i.e. after a wall or a cost changed (`reset_maze`, `remove_walls`,
+    `set_cost`...).
+    Two mazes with the same walls and costs have the same fingerprint, so a maze loaded again from
+    a file still hits the cache.
+
+    Args:
+    - maze (Maze): The maze.
+
+    Returns:
+    - fingerprint (Tuple[int, int, bytes]): The dimensions and the digest of the walls, followed by the
+      costs if the maze has some.
+    """
+    cached = fingerprints.get(maze)
+    if cached is not None and cached[0] == (maze.version, maze.costs_version):
+        return cached[1]
+    digest = hashlib.blake2b(maze.walls, digest_size = 16)
+    if maze.has_costs:
+        # The walls of a maze of these dimensions have a fixed length, so the costs simply follow them
+        digest.update(maze.costs)
+    fingerprint = (maze.cols, maze.rows, digest.digest())
+    fingerprints[maze] = ((maze.version, maze.costs_version), fingerprint)
+    return fingerprint
+
+def solution_nbytes(path, expanded):
+    """
+    Estimates the memory used by a cached solution: the path list and its int objects, the expanded
+    cells and a fixed amount for the key, the stats and the bookkeeping.
+    """
+    nbytes = 256
+    if path is not None:
+        nbytes += sys.getsizeof(path) + 28 * len(path)
+    if expanded is not None:
+        nbytes += sys.getsizeof(expanded)
+    return nbytes
+
+class SolutionCache:
+    """
+    LRU cache of search results keyed by (maze fingerprint, algorithm, start, destination).
+
+    The total size of the cached solutions is bounded by `max_bytes`: the least recently used ones
+    are evicted to make room for new ones. Changing a wall or a cost of a maze changes its fingerprint,
+    so the solutions of the old walls are never returned again and age out of the cache.
+
+    The cached paths and stats are shared between all the hits and must not be modified.
+
+    Attributes:
+    - max_bytes (int): The bound of the estimated size of the cached solutions.
+    - nbytes (int): The estimated size of the cached solutions.
+    - hits (int): Number of lookups that found a solution.
+    - misses (int): Number of lookups that did not.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20):
+        """
+        Initializes an empty cache.
+
+        Args:
+        - max_bytes (int): The bound of the estimated size of the cached solutions, 64 MiB by default.
+        """
+
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        # key -> (CachedSolution, size), from the least to the most recently used
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def key(self, maze: Maze, algorithm: str, start: int, destination: int):
+        if destination is None:
+            destination = maze.size - 1
+        return maze_fingerprint(maze), algorithm.upper(), start, destination
+
+    def get(self, maze, algorithm: str, start: int = 0, destination: int = None):
+        """
+        Look up the solution of a query.
+
+        Args:
+        - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+        - algorithm (str): The name of the algorithm, case-insensitive.
+        - start (int): Index of the start cell.
+        - destination (int, optional): Index of the destination cell, the last cell by default.
+
+        Returns:
+        - solution (CachedSolution): The cached solution, else None.
+        """
+        key = self.key(as_maze(maze), algorithm, start, destination)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, maze, algorithm: str, start: int, destination: int, path, stats, expanded=None):
+        """
+        Add the solution of a query, evicting the least recently used solutions if the cache is full.
+        A solution larger than the whole cache is not added.
+
+        Args:
+        - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+        - algorithm (str): The name of the algorithm, case-insensitive.
+        - start (int): Index of the start cell.
+        - destination (int): Index of the destination cell, None for the last cell.
+        - path (List[int]): The path found, else None.
+        - stats (SearchStats): The stats of the search.
+        - expanded (array, optional): The expanded cells in order, to show the search again.
+
+        Returns:
+        - solution (CachedSolution): The solution.
+        """
+        solution = CachedSolution(path, stats, expanded)
+        key = self.key(as_maze(maze), algorithm, start, destination)
+        size = solution_nbytes(path, expanded)
+
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        if size > self.max_bytes:
+            return solution
+
+        while self.entries and self.nbytes + size > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last = False)
+            self.nbytes -= evicted_size
+        self.entries[key] = (solution, size)
+        self.nbytes += size
+        return solution
+
+    def solve(self, solver, algorithm: str, maze, start: int = 0, destination: int = None):
+        """
+        Returns the cached solution of a query, or runs the solver and caches its result.
+
+        Args:
+        - solver (Callable): The headless solver, called as solver(maze, start=start, destination=destination).
+        - algorithm (str): The name of the algorithm, part of the key.
+        - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+        - start (int): Index of the start cell.
+        - destination (int, optional): Index of the destination cell, the last cell by default.
+
+        Returns:
+        - path (List[int]): Indices of the cells from the start to the destination, else None
+        - stats (SearchStats): Statistics of the search run that found the path.
+        """
+        maze = as_maze(maze)
+        solution = self.get(maze, algorithm, start, destination)
+        if solution is None:
+            path, stats = solver(maze, start = start, destination = destination)
+            solution = self.put(maze, algorithm, start, destination, path, stats)
+        return solution.path, solution.stats
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
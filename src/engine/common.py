@@ -0,0 +1,72 @@
+class SearchStats:
+    """
+    Statistics collected by a headless search run.
+
+    Attributes:
+    - algorithm (str): Name of the search algorithm that produced the stats.
+    - visited_cells_count (int): The total number of cells expanded during the search.
+    - solution_length (int): Number of cells in the solution path (0 if no path was found).
+    - elapsed_time (float): Wall time of the search in seconds.
+    - path_cost (int): Sum of the costs of the cells entered along the path, only set by the
+      weighted solvers (None otherwise).
+    - forward_cells_count, backward_cells_count (int): Cells expanded by the search from the start and
+      by the search from the destination, only set by the bidirectional solvers (None otherwise).
+    """
+
+    def __init__(self, algorithm: str):
+        """
+        Initializes empty statistics for a search run.
+
+        Args:
+        - algorithm (str): Name of the search algorithm.
+        """
+
+        self.algorithm = algorithm
+        self.visited_cells_count = 0
+        self.solution_length = 0
+        self.elapsed_time = 0.0
+        self.path_cost = None
+        self.forward_cells_count = None
+        self.backward_cells_count = None
+
+    def __repr__(self):
+        return (f"SearchStats(algorithm={self.algorithm!r}, visited_cells_count={self.visited_cells_count}, "
+                f"solution_length={self.solution_length}, elapsed_time={self.elapsed_time:.6f})")
+
+def manhattan_distance(cols: int, index1: int, index2: int):
+    """
+    Heuristic function to calculate the Manhattan distance between two cells given by their indices.
+
+    Args:
+    - cols (int): Number of columns of the maze.
+    - index1 (int): Index of the first cell.
+    - index2 (int): Index of the second cell.
+
+    Returns:
+    - int: The Manhattan distance between the two cells.
+    """
+    return abs(index1 % cols - index2 % cols) + abs(index1 // cols - index2 // cols)
+
+def reconstruct_path(parent: dict, destination: int):
+    """
+    Reconstruct the path from the start cell to the destination cell using the parent dictionary.
+
+    Args:
+    - parent (Dict[int, int]): Maps each reached cell index to the index it was reached from (None for the start).
+    - destination (int): Index of the destination cell.
+
+    Returns:
+    - path (List[int]): Cell indices from the start to the destination.
+    """
+
+    path = []
+    current = destination
+
+    # Backtrack from destination to start using the parent dictionary
+    while current is not None:
+        path.append(current)
+        current = parent[current]
+
+    # Reverse the path since we built it from the destination to start
+    path.reverse()
+    return path
@@ -0,0 +1,393 @@
+import time
+import numpy as np
+from maze import Maze, as_maze
+from engine.common import SearchStats
+from engine.registry import SOLVERS
+
+# Numba is optional: without it the Python solvers are used instead of the kernels below
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # Used as @njit(cache = True): leave the kernels as plain Python functions
+        return lambda function: function
+
+# The kernels read the packed walls directly: cell i uses the low nibble of byte i // 2 if i is
+# even, the high nibble otherwise, with the TOP, RIGHT, BOTTOM and LEFT bits of maze.py.
+
+@njit(cache = True)
+def cell_walls(walls, index):
+    return (walls[index >> 1] >> ((index & 1) << 2)) & 15
+
+@njit(cache = True)
+def open_neighbors(walls, cols, size, index, out):
+    """
+    Writes the reachable neighbors of a cell to `out`, in the order top, right, bottom, left like
+    `Maze.open_neighbors`, and returns how many there are.
+    """
+    count = 0
+    bits = cell_walls(walls, index)
+    x = index % cols
+    if not bits & 1 and index >= cols and not cell_walls(walls, index - cols) & 4:
+        out[count] = index - cols
+        count += 1
+    if not bits & 2 and x < cols - 1 and not cell_walls(walls, index + 1) & 8:
+        out[count] = index + 1
+        count += 1
+    if not bits & 4 and index + cols < size and not cell_walls(walls, index + cols) & 1:
+        out[count] = index + cols
+        count += 1
+    if not bits & 8 and x > 0 and not cell_walls(walls, index - 1) & 2:
+        out[count] = index - 1
+        count += 1
+    return count
+
+@njit(cache = True)
+def bfs_kernel(walls, cols, size, start, destination, parent, order):
+    """
+    Level-order BFS, cells are marked as discovered when enqueued. Every cell is enqueued at most once,
+    so the queue is a plain array with a read and a write position.
+
+    Returns the number of expanded cells (written in order to `order`), and whether the destination was reached.
+    """
+    queue = np.empty(size, np.int64)
+    neighbors = np.empty(4, np.int64)
+    queue[0] = start
+    parent[start] = start
+    head, tail, expanded = 0, 1, 0
+    while head < tail:
+        current = queue[head]
+        head += 1
+        order[expanded] = current
+        expanded += 1
+        if current == destination:
+            return expanded, True
+        for k in range(open_neighbors(walls, cols, size, current, neighbors)):
+            neighbor = neighbors[k]
+            if parent[neighbor] < 0:
+                parent[neighbor] = current
+                queue[tail] = neighbor
+                tail += 1
+    return expanded, False
+
+@njit(cache = True)
+def dfs_kernel(walls, cols, size, start, destination, parent, order):
+    """
+    DFS with an explicit stack, cells are marked as discovered when pushed, like `find_path_DFS`.
+    """
+    stack = np.empty(size, np.int64)
+    neighbors = np.empty(4, np.int64)
+    stack[0] = start
+    parent[start] = start
+    top, expanded = 1, 0
+    while top > 0:
+        top -= 1
+        current = stack[top]
+        order[expanded] = current
+        expanded += 1
+        if current == destination:
+            return expanded, True
+        for k in range(open_neighbors(walls, cols, size, current, neighbors)):
+            neighbor = neighbors[k]
+            if parent[neighbor] < 0:
+                parent[neighbor] = current
+                stack[top] = neighbor
+                top += 1
+    return expanded, False
+
+@njit(cache = True)
+def heap_push(keys, cells, length, key, cell):
+    """
+    Pushes to a binary min-heap stored in two arrays, ordered by (key, cell) like a heap of tuples.
+    Returns the new length.
+    """
+    position = length
+    while position > 0:
+        up = (position - 1) >> 1
+        if keys[up] < key or (keys[up] == key and cells[up] < cell):
+            break
+        keys[position] = keys[up]
+        cells[position] = cells[up]
+        position = up
+    keys[position] = key
+    cells[position] = cell
+    return length + 1
+
+@njit(cache = True)
+def heap_pop(keys, cells, length):
+    """
+    Removes the smallest entry of the heap, which the caller read from keys[0], cells[0]. Returns the new length.
+    """
+    length -= 1
+    key, cell = keys[length], cells[length]
+    position = 0
+    while True:
+        child = 2 * position + 1
+        if child >= length:
+            break
+        if child + 1 < length and (keys[child + 1] < keys[child] or (keys[child + 1] == keys[child] and cells[child + 1] < cells[child])):
+            child += 1
+        if key < keys[child] or (key == keys[child] and cell < cells[child]):
+            break
+        keys[position] = keys[child]
+        cells[position] = cells[child]
+        position = child
+    keys[position] = key
+    cells[position] = cell
+    return length
+
+@njit(cache = True)
+def astar_kernel(walls, cols, size, start, destination, parent, order):
+    """
+    A* with the Manhattan distance, ordered by (f, h, cell) like `find_path_A_star`. Improved cells are
+    pushed again and their stale entries skipped, so the heap can hold more entries than cells.
+    """
+    rows = size // cols
+    # f * span + h orders by f then h, since h < span
+    span = cols + rows
+    capacity = 4 * size + 1
+    keys = np.empty(capacity, np.int64)
+    cells = np.empty(capacity, np.int64)
+    g_cost = np.full(size, -1, np.int64)
+    closed = np.zeros(size, np.bool_)
+    neighbors = np.empty(4, np.int64)
+    goal_x, goal_y = destination % cols, destination // cols
+
+    h = abs(start % cols - goal_x) + abs(start // cols - goal_y)
+    length = heap_push(keys, cells, 0, h * span, start)
+    g_cost[start] = 0
+    parent[start] = start
+    expanded = 0
+    while length > 0:
+        current = cells[0]
+        length = heap_pop(keys, cells, length)
+        if closed[current]:
+            continue
+        closed[current] = True
+        order[expanded] = current
+        expanded += 1
+        if current == destination:
+            return expanded, True
+        tentative = g_cost[current] + 1
+        for k in range(open_neighbors(walls, cols, size, current, neighbors)):
+            neighbor = neighbors[k]
+            if closed[neighbor]:
+                continue
+            if g_cost[neighbor] < 0 or tentative < g_cost[neighbor]:
+                g_cost[neighbor] = tentative
+                parent[neighbor] = current
+                h = abs(neighbor % cols - goal_x) + abs(neighbor // cols - goal_y)
+                length = heap_push(keys, cells, length, (tentative + h) * span + h, neighbor)
+    return expanded, False
+
+@njit(cache = True)
+def gbfs_kernel(walls, cols, size, start, destination, parent, order):
+    """
+    Greedy best-first search ordered by (h, cell) like `find_path_greedy_bfs`; every cell is pushed once.
+    """
+    keys = np.empty(size, np.int64)
+    cells = np.empty(size, np.int64)
+    closed = np.zeros(size, np.bool_)
+    neighbors = np.empty(4, np.int64)
+    goal_x, goal_y = destination % cols, destination // cols
+
+    length = heap_push(keys, cells, 0, 0, start)
+    parent[start] = start
+    expanded = 0
+    while length > 0:
+        current = cells[0]
+        length = heap_pop(keys, cells, length)
+        closed[current] = True
+        order[expanded] = current
+        expanded += 1
+        if current == destination:
+            return expanded, True
+        for k in range(open_neighbors(walls, cols, size, current, neighbors)):
+            neighbor = neighbors[k]
+            if not closed[neighbor] and parent[neighbor] < 0:
+                parent[neighbor] = current
+                h = abs(neighbor % cols - goal_x) + abs(neighbor // cols - goal_y)
+                length = heap_push(keys, cells, length, h, neighbor)
+    return expanded, False
+
+@njit(cache = True)
+def trace_back(parent, destination):
+    """
+    Returns the path from the start (its own parent) to the destination as an array.
+    """
+    length = 1
+    current = destination
+    while parent[current] != current:
+        current = parent[current]
+        length += 1
+    path = np.empty(length, np.int64)
+    current = destination
+    for position in range(length - 1, -1, -1):
+        path[position] = current
+        current = parent[current]
+    return path
+
+def run_kernel(kernel, algorithm: str, maze: Maze, on_step, start: int, destination: int):
+    """
+    Run a search kernel on the packed walls of a maze and convert its result to the Python solvers' API.
+
+    The kernels can not call back into Python, so `on_step` is called for every expanded cell, in
+    order, once the search is over.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run.
+    """
+    stats = SearchStats(algorithm)
+    started = time.perf_counter()
+    maze = as_maze(maze)
+    if destination is None:
+        destination = maze.size - 1
+
+    walls = np.frombuffer(maze.walls, dtype = np.uint8)
+    parent = np.full(maze.size, -1, np.int64)
+    order = np.empty(maze.size, np.int64)
+    expanded, found = kernel(walls, maze.cols, maze.size, start, destination, parent, order)
+
+    path = trace_back(parent, destination).tolist() if found else None
+    stats.visited_cells_count = int(expanded)
+    stats.solution_length = len(path) if path else 0
+    stats.elapsed_time = time.perf_counter() - started
+
+    if on_step is not None:
+        for index in order[:expanded].tolist():
+            on_step(index)
+    return path, stats
+
+def find_path_BFS_compiled(maze: Maze, on_step=None, start: int = 0, destination: int = None):
+    """
+    Find a path through the maze with BFS, like `find_path_BFS`, with the Numba kernel `bfs_kernel`
+    (plain Python when Numba is not installed). The expanded cells are passed to `on_step` once the
+    search is over.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell, in order.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run.
+    """
+    return run_kernel(bfs_kernel, "BFS", maze, on_step, start, destination)
+
+def find_path_DFS_compiled(maze: Maze, on_step=None, start: int = 0, destination: int = None):
+    """
+    Find a path through the maze with DFS, like `find_path_DFS`, with the Numba kernel `dfs_kernel`
+    (plain Python when Numba is not installed). The expanded cells are passed to `on_step` once the
+    search is over.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell, in order.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run.
+    """
+    return run_kernel(dfs_kernel, "DFS", maze, on_step, start, destination)
+
+def find_path_A_star_compiled(maze: Maze, on_step=None, start: int = 0, destination: int = None):
+    """
+    Find a path through the maze with A*, like `find_path_A_star`, with the Numba kernel `astar_kernel`
+    (plain Python when Numba is not installed). The expanded cells are passed to `on_step` once the
+    search is over.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell, in order.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run.
+    """
+    return run_kernel(astar_kernel, "A*", maze, on_step, start, destination)
+
+def find_path_greedy_bfs_compiled(maze: Maze, on_step=None, start: int = 0, destination: int = None):
+    """
+    Find a path through the maze with greedy best-first search, like `find_path_greedy_bfs`, with the Numba kernel `gbfs_kernel`
+    (plain Python when Numba is not installed). The expanded cells are passed to `on_step` once the
+    search is over.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell, in order.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run.
+    """
+    return run_kernel(gbfs_kernel, "GBFS", maze, on_step, start, destination)
+
+# Compiled solvers by name, with the same names as SOLVERS
+COMPILED_SOLVERS = {
+    "BFS": find_path_BFS_compiled,
+    "DFS": find_path_DFS_compiled,
+    "A*": find_path_A_star_compiled,
+    "GBFS": find_path_greedy_bfs_compiled,
+}
+
+def get_backend_solver(name: str, backend: str = "numba"):
+    """
+    Look up a solver of the given backend, falling back to the Python solver when Numba is not
+    installed or the algorithm has no compiled kernel.
+
+    Args:
+    - name (str): The name of the algorithm, one of the keys of SOLVERS.
+    - backend (str): "numba" or "python".
+
+    Returns:
+    - solver (Callable): The solver function, called as solver(maze, on_step=None, start=0, destination=None).
+    """
+    if backend == "numba" and NUMBA_AVAILABLE and name in COMPILED_SOLVERS:
+        return COMPILED_SOLVERS[name]
+    return SOLVERS[name]
+
+def check_equivalence(mazes, queries_per_maze: int = 20, seed: int = 0, force: bool = False):
+    """
+    Check that the compiled solvers find paths of the same length as the Python solvers (and the
+    very same paths, since both explore the cells in the same order).
+
+    Args:
+    - mazes (Iterable[Maze]): The mazes to check.
+    - queries_per_maze (int): Number of random (start, destination) queries per maze, on top of
+      the first cell to the last one.
+    - seed (int): Seed of the random queries.
+    - force (bool): Run the kernels as plain Python when Numba is not installed, to check their logic.
+      Nothing is checked without Numba otherwise.
+
+    Returns:
+    - mismatches (List[str]): A description of every difference found, empty if there is none.
+    """
+    import random
+
+    if not NUMBA_AVAILABLE and not force:
+        return []
+    rng = random.Random(seed)
+    mismatches = []
+    for maze in mazes:
+        queries = [(0, maze.size - 1)] + [(rng.randrange(maze.size), rng.randrange(maze.size)) for _ in range(queries_per_maze)]
+        for name, compiled in COMPILED_SOLVERS.items():
+            for start, destination in queries:
+                expected, expected_stats = SOLVERS[name](maze, start = start, destination = destination)
+                path, stats = compiled(maze, start = start, destination = destination)
+                if path != expected or stats.visited_cells_count != expected_stats.visited_cells_count:
+                    mismatches.append(f"{maze.cols}x{maze.rows} {name} {start}->{destination}: "
+                                      f"path length {stats.solution_length} vs {expected_stats.solution_length}, "
+                                      f"expanded {stats.visited_cells_count} vs {expected_stats.visited_cells_count}")
+    return mismatches
@@ -0,0 +1,271 @@
+import time
+import heapq
+import weakref
+from array import array
+from maze import Maze, as_maze
+from engine.common import SearchStats
+
+# Marks cells that are not inside a corridor
+NONE = 0xFFFFFFFF
+
+class CorridorGraph:
+    """
+    The maze with its corridors contracted: the nodes are the junctions and dead ends (cells without
+    exactly two open sides) and every corridor of two-sided cells between two nodes is a single edge
+    weighted by its length.
+
+    Edge e goes from cell `edge_a[e]` to cell `edge_b[e]` through the corridor cells
+    `cells[edge_start[e]:edge_start[e + 1]]`, in that order; its length is the number of corridor
+    cells + 1. The graph is a snapshot of the walls when it was built, like `AdjacencyIndex`.
+
+    Attributes:
+    - version (int): The version of the maze the graph was built from.
+    - is_node (bytearray): 1 for the cells that are nodes of the graph.
+    - edges_of (Dict[int, List[int]]): The edges at every node.
+    - edge_a, edge_b (array): The end cells of every edge.
+    - edge_start (array): Offsets of the corridor cells of every edge in `cells`.
+    - cells (array): The corridor cells of all edges, one edge after another.
+    - edge_of (array): The edge of every corridor cell, NONE for the nodes.
+    - position (array): The position of every corridor cell along its edge, from 1 next to edge_a.
+    """
+
+    def __init__(self, maze: Maze):
+        """
+        Contracts the corridors of a maze.
+
+        Args:
+        - maze (Maze): The maze to contract.
+        """
+
+        adjacency = maze.adjacency()
+        offsets, targets = adjacency.offsets, adjacency.targets
+        self.version = maze.version
+        self.is_node = bytearray(offsets[index + 1] - offsets[index] != 2 for index in range(maze.size))
+        self.edges_of = {}
+        self.edge_a, self.edge_b = array("I"), array("I")
+        self.edge_start = array("I", [0])
+        self.cells = array("I")
+        self.edge_of = array("I", [NONE]) * maze.size
+        self.position = array("I", [0]) * maze.size
+
+        for node in range(maze.size):
+            if self.is_node[node]:
+                self.walk_corridors(node, offsets, targets)
+
+        # Closed loops without any junction: make one of their cells a node
+        for index in range(maze.size):
+            if not self.is_node[index] and self.edge_of[index] == NONE:
+                self.is_node[index] = 1
+                self.walk_corridors(index, offsets, targets)
+
+    def walk_corridors(self, node: int, offsets, targets):
+        """
+        Adds the edges of the corridors leaving a node that have not been walked from their other end yet.
+        """
+        is_node, edge_of, position, cells = self.is_node, self.edge_of, self.position, self.cells
+
+        for first in targets[offsets[node]:offsets[node + 1]]:
+            if is_node[first]:
+                # Two adjacent nodes: an edge without corridor cells, added once from the lowest cell
+                if first < node:
+                    continue
+            elif edge_of[first] != NONE:
+                continue
+
+            edge = len(self.edge_a)
+            previous, current = node, first
+            while not is_node[current]:
+                cells.append(current)
+                edge_of[current] = edge
+                position[current] = len(cells) - self.edge_start[-1]
+                # A corridor cell has exactly two neighbors: go on through the one we did not come from
+                a, b = targets[offsets[current]], targets[offsets[current] + 1]
+                previous, current = current, b if a == previous else a
+
+            self.edge_a.append(node)
+            self.edge_b.append(current)
+            self.edge_start.append(len(cells))
+            self.edges_of.setdefault(node, []).append(edge)
+            if current != node:
+                self.edges_of.setdefault(current, []).append(edge)
+
+    def length(self, edge: int):
+        return self.edge_start[edge + 1] - self.edge_start[edge] + 1
+
+    def edge_cells(self, edge: int, from_cell: int):
+        """
+        Unpacks an edge: returns its cells from one end to the other, both ends included.
+        """
+        corridor = self.cells[self.edge_start[edge]:self.edge_start[edge + 1]].tolist()
+        if from_cell == self.edge_a[edge]:
+            return [from_cell] + corridor + [self.edge_b[edge]]
+        corridor.reverse()
+        return [from_cell] + corridor + [self.edge_a[edge]]
+
+    def entries(self, cell: int):
+        """
+        Returns the nodes a cell is attached to, as (node, distance, edge) tuples: the cell itself if it
+        is a node, else both ends of its corridor (edge None for the cell itself).
+        """
+        if self.is_node[cell]:
+            return [(cell, 0, None)]
+        edge = self.edge_of[cell]
+        position = self.position[cell]
+        return [(self.edge_a[edge], position, edge), (self.edge_b[edge], self.length(edge) - position, edge)]
+
+# Contracted graphs of the mazes searched so far, rebuilt when the walls change
+graphs = weakref.WeakKeyDictionary()
+
+def corridor_graph(maze: Maze):
+    """
+    Returns the contracted graph of a maze, building it only if the walls changed since the last call.
+    """
+    graph = graphs.get(maze)
+    if graph is None or graph.version != maze.version:
+        graph = graphs[maze] = CorridorGraph(maze)
+    return graph
+
+def find_path_corridor_A_star(maze: Maze, on_step=None, start: int = 0, destination: int = None):
+    """
+    Find a shortest path with A* on the contracted corridor graph of the maze, without any rendering.
+
+    Only the junctions and dead ends are expanded, a whole corridor is crossed in a single step, and
+    the cells of the corridors on the path are unpacked at the end. The Manhattan distance to the
+    destination stays a lower bound of the remaining length, so the path is as short as the one of A*.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded node cell.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run, visited_cells_count counts the expanded nodes.
+    """
+    stats = SearchStats("Corridor A*")
+    started = time.perf_counter()
+    maze = as_maze(maze)
+    graph = corridor_graph(maze)
+
+    if destination is None:
+        destination = maze.size - 1
+
+    cols = maze.cols
+    goal_y, goal_x = divmod(destination, cols)
+
+    def heuristic(cell: int):
+        y, x = divmod(cell, cols)
+        return abs(x - goal_x) + abs(y - goal_y)
+
+    # The start and the destination are attached to the ends of their corridors
+    g_cost = {}
+    parent = {}
+    open_set = []
+    for node, distance, edge in graph.entries(start):
+        if distance < g_cost.get(node, distance + 1):
+            g_cost[node] = distance
+            parent[node] = (None, edge)
+            heapq.heappush(open_set, (distance + heuristic(node), node))
+    exits = {}
+    for node, distance, edge in graph.entries(destination):
+        if distance < exits.get(node, (distance + 1,))[0]:
+            exits[node] = (distance, edge)
+
+    # Best complete path so far: (length, last node or None if it does not go through a node)
+    best = None
+    if not graph.is_node[start] and graph.edge_of[start] == graph.edge_of[destination]:
+        best = (abs(graph.position[start] - graph.position[destination]), None)
+
+    closed = set()
+    while open_set:
+        f_cost, current = heapq.heappop(open_set)
+        # Nothing left in the open set can beat the best path found
+        if best is not None and f_cost >= best[0]:
+            break
+        if current in closed:
+            continue
+        closed.add(current)
+        stats.visited_cells_count += 1
+        if on_step is not None:
+            on_step(current)
+
+        if current in exits:
+            length = g_cost[current] + exits[current][0]
+            if best is None or length < best[0]:
+                best = (length, current)
+
+        for edge in graph.edges_of.get(current, ()):
+            neighbor = graph.edge_b[edge] if graph.edge_a[edge] == current else graph.edge_a[edge]
+            if neighbor in closed:
+                continue
+            tentative_g_cost = g_cost[current] + graph.length(edge)
+            if tentative_g_cost < g_cost.get(neighbor, tentative_g_cost + 1):
+                g_cost[neighbor] = tentative_g_cost
+                parent[neighbor] = (current, edge)
+                heapq.heappush(open_set, (tentative_g_cost + heuristic(neighbor), neighbor))
+
+    path = None
+    if best is not None:
+        path = unpack_path(graph, parent, g_cost, start, destination, best[1], exits)
+
+    stats.solution_length = len(path) if path else 0
+    stats.elapsed_time = time.perf_counter() - started
+    return path, stats
+
+def unpack_path(graph: CorridorGraph, parent: dict, g_cost: dict, start: int, destination: int, last_node, exits: dict):
+    """
+    Unpacks the cells of a path found on the contracted graph.
+
+    Args:
+    - graph (CorridorGraph): The contracted graph.
+    - parent (Dict[int, Tuple[int, int]]): The previous node and the edge every node was reached through,
+      (None, edge) for the nodes reached from the start.
+    - g_cost (Dict[int, int]): The distance from the start to every reached node.
+    - start (int): Index of the start cell.
+    - destination (int): Index of the destination cell.
+    - last_node (int): The last node of the path, None if the path stays in the corridor of the start.
+    - exits (Dict[int, Tuple[int, int]]): The distance and edge from the nodes attached to the destination.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination.
+    """
+
+    if last_node is None:
+        # Start and destination in the same corridor
+        edge = graph.edge_of[start]
+        cells = graph.edge_cells(edge, graph.edge_a[edge])
+        first, last = graph.position[start], graph.position[destination]
+        return cells[first:last + 1] if first <= last else cells[last:first + 1][::-1]
+
+    # From the last node back to the start, one edge at a time
+    path = []
+    node = last_node
+    while True:
+        previous, edge = parent[node]
+        if previous is None:
+            break
+        path.extend(graph.edge_cells(edge, node)[:-1])
+        node = previous
+    if edge is None:
+        path.append(node)
+    else:
+        # The start is inside the corridor of this edge
+        path.extend(corridor_part(graph, edge, node, start, g_cost[node]))
+    path.reverse()
+
+    # From the last node to the destination
+    _, edge = exits[last_node]
+    if edge is not None:
+        path.extend(corridor_part(graph, edge, last_node, destination, exits[last_node][0])[1:])
+    return path
+
+def corridor_part(graph: CorridorGraph, edge: int, node: int, cell: int, distance: int):
+    """
+    Returns the cells from an end node of an edge to one of its corridor cells, `distance` steps away.
+    A corridor looping back to the same node can be walked both ways, the distance tells which one.
+    """
+    cells = graph.edge_cells(edge, node)
+    if cells.index(cell) != distance:
+        cells.reverse()
+    return cells[:distance + 1]
@@ -0,0 +1,66 @@
+import time
+from maze import Maze, as_maze
+from engine.instrument import SearchProfile
+from engine.common import SearchStats, reconstruct_path
+
+def find_path_DFS(maze: Maze, on_step=None, start: int = 0, destination: int = None,
+                  profile: SearchProfile = None):
+    """
+    Find a path through the maze using Depth-First Search (DFS) without any rendering.
+
+    The search runs from the start cell to the destination one. It keeps its own visited
+    state, so the flags stored on the cells are neither read nor modified.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run.
+    """
+    stats = SearchStats("DFS")
+    started = time.perf_counter()
+    maze = as_maze(maze)
+    neighbors_of = maze.adjacency().neighbors
+
+    # The search goes from the first to the last cell unless other cells are given
+    if destination is None:
+        destination = maze.size - 1
+
+    # The parent dictionary doubles as the set of discovered cells
+    stack = []
+    push, pop = stack.append, stack.pop
+    if profile is not None:
+        # Route the hot primitives through the profile's timed wrappers
+        neighbors_of, push, pop = profile.neighbors(neighbors_of), profile.push(push), profile.pop(pop)
+        on_step = profile.step(on_step)
+    push(start)
+    parent = {start: None}
+
+    # Main DFS loop
+    path = None
+    while stack:
+        # Pop the top cell from the stack
+        current = pop()
+        stats.visited_cells_count += 1
+        if on_step is not None:
+            on_step(current)
+
+        # Check if the current cell is the destination
+        if current == destination:
+            path = reconstruct_path(parent, destination)
+            break
+
+        # Check neighbors and explore deeper
+        for neighbor in neighbors_of(current):
+            if neighbor not in parent:
+                push(neighbor)
+                parent[neighbor] = current
+
+    stats.solution_length = len(path) if path else 0
+    stats.elapsed_time = time.perf_counter() - started
+    return path, stats
@@ -0,0 +1,149 @@
+import time
+from maze import Maze, as_maze
+from engine.instrument import SearchProfile
+from engine.common import SearchStats, reconstruct_path
+
+def search_weighted(maze: Maze, stats: SearchStats, on_step, start: int, destination: int, use_heuristic: bool,
+                    profile: SearchProfile = None):
+    """
+    Shortest path search on a maze with per-cell traversal costs, with a bucket queue (Dial's algorithm).
+
+    The cost of a move is the cost of the cell it enters. Since the costs are small integers, the
+    priority queue is a ring of buckets, one per key: the key of a cell pushed while expanding a cell
+    of key k is at most k + max_cost (+ min_cost with the heuristic), so a ring of that many buckets
+    never mixes two keys and every push and pop takes constant time.
+
+    Args:
+    - maze (Maze): The maze to search.
+    - stats (SearchStats): The statistics to fill.
+    - on_step (Callable[[int], None]): Called with the index of every expanded cell, or None.
+    - start (int): Index of the start cell.
+    - destination (int): Index of the destination cell.
+    - use_heuristic (bool): Order the cells by cost + min_cost * Manhattan distance (A*) instead of
+      by cost only (Dijkstra).
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    """
+
+    neighbors_of = maze.adjacency().neighbors
+    # A uniform maze has no cost array, every move costs 1
+    costs = maze.costs if maze.has_costs else None
+    min_cost, max_cost = maze.cost_range()
+    # Every move costs at least min_cost, so min_cost times the Manhattan distance is a lower bound
+    h_weight = min_cost if use_heuristic else 0
+
+    cols = maze.cols
+    goal_y, goal_x = divmod(destination, cols)
+
+    def heuristic(cell: int):
+        y, x = divmod(cell, cols)
+        return h_weight * (abs(x - goal_x) + abs(y - goal_y))
+
+    push, pop = list.append, list.pop
+    if profile is not None:
+        # Route the hot primitives through the profile's timed wrappers
+        neighbors_of, push, pop = profile.neighbors(neighbors_of), profile.push(push), profile.pop(pop)
+        on_step = profile.step(on_step)
+
+    # Ring of buckets, the bucket of key k is buckets[k % ring_size]
+    ring_size = max_cost + h_weight + 1
+    buckets = [[] for _ in range(ring_size)]
+    key = heuristic(start)
+    push(buckets[key % ring_size], start)
+    queued = 1
+
+    g_cost = {start: 0}
+    closed = bytearray(maze.size)
+    parent = {start: None}
+
+    while queued:
+        bucket = buckets[key % ring_size]
+        if not bucket:
+            key += 1
+            continue
+        current = pop(bucket)
+        queued -= 1
+        # Cells improved after being queued are queued again, their stale entries are skipped
+        if closed[current]:
+            continue
+        closed[current] = 1
+        stats.visited_cells_count += 1
+        if on_step is not None:
+            on_step(current)
+
+        if current == destination:
+            stats.path_cost = g_cost[destination]
+            return reconstruct_path(parent, destination)
+
+        current_cost = g_cost[current]
+        for neighbor in neighbors_of(current):
+            if closed[neighbor]:
+                continue
+            tentative_g_cost = current_cost + (costs[neighbor] if costs is not None else 1)
+            if tentative_g_cost < g_cost.get(neighbor, tentative_g_cost + 1):
+                g_cost[neighbor] = tentative_g_cost
+                parent[neighbor] = current
+                push(buckets[(tentative_g_cost + heuristic(neighbor)) % ring_size], neighbor)
+                queued += 1
+    return None
+
+def find_path_dijkstra(maze: Maze, on_step=None, start: int = 0, destination: int = None,
+                       profile: SearchProfile = None):
+    """
+    Find the cheapest path through a maze with per-cell traversal costs (`Maze.costs`) using
+    Dijkstra's algorithm with a bucket queue, without any rendering.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run, with the cost of the path in path_cost.
+    """
+    stats = SearchStats("Dijkstra")
+    started = time.perf_counter()
+    maze = as_maze(maze)
+    if destination is None:
+        destination = maze.size - 1
+
+    path = search_weighted(maze, stats, on_step, start, destination, use_heuristic = False, profile = profile)
+
+    stats.solution_length = len(path) if path else 0
+    stats.elapsed_time = time.perf_counter() - started
+    return path, stats
+
+def find_path_weighted_A_star(maze: Maze, on_step=None, start: int = 0, destination: int = None,
+                              profile: SearchProfile = None):
+    """
+    Find the cheapest path through a maze with per-cell traversal costs (`Maze.costs`) using A*
+    with a bucket queue, without any rendering. The heuristic is the Manhattan distance times the
+    smallest cell cost, so the path is as cheap as the one of Dijkstra.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run, with the cost of the path in path_cost.
+    """
+    stats = SearchStats("Weighted A*")
+    started = time.perf_counter()
+    maze = as_maze(maze)
+    if destination is None:
+        destination = maze.size - 1
+
+    path = search_weighted(maze, stats, on_step, start, destination, use_heuristic = True, profile = profile)
+
+    stats.solution_length = len(path) if path else 0
+    stats.elapsed_time = time.perf_counter() - started
+    return path, stats
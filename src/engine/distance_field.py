@@ -0,0 +1,155 @@
+import time
+import numpy as np
+from maze import Maze, as_maze, TOP, RIGHT, BOTTOM, LEFT
+from engine.common import SearchStats
+
+# Frontiers of at least this many cells are expanded with NumPy, smaller ones in plain Python
+VECTOR_FRONTIER = 64
+
+def open_directions(maze: Maze):
+    """
+    Computes the open sides of every cell at once: a side is open when neither of the two cells it
+    separates has a wall there, like in `Maze.open_neighbors`.
+
+    Args:
+    - maze (Maze): The maze.
+
+    Returns:
+    - open_sides (np.ndarray): uint8 array with one byte per cell in index order, with the TOP, RIGHT,
+      BOTTOM and LEFT bits set for the open sides.
+    """
+    walls = maze.wall_grid()
+
+    top = (walls & TOP) == 0
+    top[0, :] = False
+    top[1:] &= (walls[:-1] & BOTTOM) == 0
+    right = (walls & RIGHT) == 0
+    right[:, -1] = False
+    right[:, :-1] &= (walls[:, 1:] & LEFT) == 0
+    bottom = (walls & BOTTOM) == 0
+    bottom[-1, :] = False
+    bottom[:-1] &= (walls[1:] & TOP) == 0
+    left = (walls & LEFT) == 0
+    left[:, 0] = False
+    left[:, 1:] &= (walls[:, :-1] & RIGHT) == 0
+
+    open_sides = top * np.uint8(TOP) | right * np.uint8(RIGHT) | bottom * np.uint8(BOTTOM) | left * np.uint8(LEFT)
+    return open_sides.ravel()
+
+class DistanceField:
+    """
+    The distance from a start cell to every cell of a maze, computed by a level-synchronous BFS:
+    every iteration expands the whole frontier at once with NumPy, filtering it with masks of the
+    open sides of the cells, instead of popping the cells one by one.
+
+    Every iteration only touches the cells of the frontier. An open maze (few levels, large frontiers)
+    is expanded in large vectorized steps; the small frontiers of mazes with long corridors (many
+    levels) are expanded in plain Python, where a NumPy call per level would cost more than the work.
+
+    Attributes:
+    - maze (Maze): The maze.
+    - start (int): Index of the start cell.
+    - distance (np.ndarray): int32 distance of every cell from the start in index order, -1 where unreachable.
+    - predecessor (np.ndarray): int32 index of the previous cell on a shortest path from the start,
+      -1 for the start and the unreachable cells.
+    - reachable (np.ndarray): Boolean mask of the cells reachable from the start.
+    - stats (SearchStats): Statistics of the computation, visited_cells_count is the number of reachable cells.
+    """
+
+    def __init__(self, maze, start: int = 0):
+        """
+        Computes the distance field.
+
+        Args:
+        - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+        - start (int): Index of the start cell, the first cell by default.
+        """
+
+        self.stats = SearchStats("Distance field")
+        started = time.perf_counter()
+        self.maze = maze = as_maze(maze)
+        self.start = start
+
+        open_sides = open_directions(maze)
+        distance = np.full(maze.size, -1, dtype = np.int32)
+        predecessor = np.full(maze.size, -1, dtype = np.int32)
+        steps = ((TOP, -maze.cols), (RIGHT, 1), (BOTTOM, maze.cols), (LEFT, -1))
+
+        distance[start] = 0
+        # Small frontiers are expanded cell by cell through memoryviews of the arrays, the per-call
+        # overhead of NumPy would dominate in the long corridors of perfect mazes
+        distance_view, predecessor_view, sides_view = memoryview(distance), memoryview(predecessor), memoryview(open_sides)
+        frontier = [start]
+        level = 0
+        while len(frontier):
+            level += 1
+            if len(frontier) < VECTOR_FRONTIER:
+                reached = []
+                for cell in (frontier.tolist() if isinstance(frontier, np.ndarray) else frontier):
+                    sides = sides_view[cell]
+                    for side, step in steps:
+                        if sides & side and distance_view[cell + step] < 0:
+                            distance_view[cell + step] = level
+                            predecessor_view[cell + step] = cell
+                            reached.append(cell + step)
+                frontier = reached
+                continue
+
+            frontier = np.asarray(frontier, dtype = np.int64)
+            sides = open_sides[frontier]
+            reached = []
+            for side, step in steps:
+                cells = frontier[(sides & side) != 0]
+                neighbors = cells + step
+                # A cell reached from two sides in the same level keeps the first one
+                new = distance[neighbors] < 0
+                neighbors = neighbors[new]
+                distance[neighbors] = level
+                predecessor[neighbors] = cells[new]
+                reached.append(neighbors)
+            frontier = np.concatenate(reached)
+
+        self.distance = distance
+        self.predecessor = predecessor
+        self.reachable = distance >= 0
+        self.stats.visited_cells_count = int(np.count_nonzero(self.reachable))
+        self.stats.elapsed_time = time.perf_counter() - started
+
+    @property
+    def eccentricity(self):
+        """
+        The largest distance from the start to a reachable cell.
+        """
+        return int(self.distance.max())
+
+    @property
+    def farthest(self):
+        """
+        The index of a reachable cell at the largest distance from the start.
+        """
+        return int(self.distance.argmax())
+
+    def as_grid(self):
+        """
+        Returns the distances as a (rows, cols) array, e.g. to draw a heatmap.
+        """
+        return self.distance.reshape(self.maze.rows, self.maze.cols)
+
+    def path_to(self, destination: int):
+        """
+        Follows the predecessors back from a cell to the start.
+
+        Args:
+        - destination (int): Index of the destination cell.
+
+        Returns:
+        - path (List[int]): Indices of the cells of a shortest path from the start to the destination, else None
+        """
+        if not self.reachable[destination]:
+            return None
+        path = [destination]
+        predecessor = self.predecessor
+        while path[-1] != self.start:
+            path.append(int(predecessor[path[-1]]))
+        path.reverse()
+        return path
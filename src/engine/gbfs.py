@@ -0,0 +1,74 @@
+import time
+import heapq
+from maze import Maze, as_maze
+from engine.instrument import SearchProfile
+from engine.common import SearchStats, reconstruct_path, manhattan_distance
+
+def find_path_greedy_bfs(maze: Maze, on_step=None, start: int = 0, destination: int = None,
+                         profile: SearchProfile = None):
+    """
+    Find a path through the maze using Greedy Best-First Search (GBFS), which always expands the
+    cell with the lowest Manhattan distance to the destination, without any rendering.
+
+    Args:
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - on_step (Callable[[int], None], optional): Called with the index of every expanded cell.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given.
+
+    Returns:
+    - path (List[int]): Indices of the cells from the start to the destination, else None
+    - stats (SearchStats): Statistics of the search run.
+    """
+    stats = SearchStats("GBFS")
+    started = time.perf_counter()
+    maze = as_maze(maze)
+    neighbors_of = maze.adjacency().neighbors
+
+    # The search goes from the first to the last cell unless other cells are given
+    if destination is None:
+        destination = maze.size - 1
+
+    # Priority queue ordered by heuristic cost (holds tuples of (h_cost, index))
+    open_set = []
+    push, pop = heapq.heappush, heapq.heappop
+    if profile is not None:
+        # Route the hot primitives through the profile's timed wrappers
+        neighbors_of, push, pop = profile.neighbors(neighbors_of), profile.push(push), profile.pop(pop)
+        on_step = profile.step(on_step)
+    push(open_set, (0, start))
+
+    # Visited set and parent dictionary for path reconstruction, which also records every cell
+    # that has been pushed to the open set
+    visited = set()
+    parent = {start: None}
+
+    # Main GBFS loop
+    path = None
+    while open_set:
+        # Get the cell with the lowest heuristic
+        _, current = pop(open_set)
+        visited.add(current)
+        stats.visited_cells_count += 1
+        if on_step is not None:
+            on_step(current)
+
+        # If we reached the destination, reconstruct the path
+        if current == destination:
+            path = reconstruct_path(parent, destination)
+            break
+
+        for neighbor in neighbors_of(current):
+            if neighbor in visited:
+                continue
+
+            if neighbor not in parent:
+                # This is where Greedy BFS differs from A*: we only use the heuristic (h_cost)
+                h_cost = manhattan_distance(maze.cols, neighbor, destination)
+                parent[neighbor] = current
+                push(open_set, (h_cost, neighbor))
+
+    stats.solution_length = len(path) if path else 0
+    stats.elapsed_time = time.perf_counter() - started
+    return path, stats
@@ -0,0 +1,154 @@
+import io
+import time
+
+class SearchProfile:
+    """
+    Opt-in instrumentation of a search run.
+
+    The solvers call their hot primitives (neighbor lookups, queue pushes and pops, the step
+    callback) through local names. When a profile is passed to a solver, those names are bound to
+    the timed and counting wrappers below instead of the plain functions, so a search without a
+    profile runs exactly the same code as before and pays nothing for it.
+
+    Attributes:
+    - nodes_expanded (int): Cells popped from the frontier and expanded.
+    - nodes_enqueued (int): Pushes to the frontier.
+    - duplicate_pushes (int): Pushes of a cell that had already been pushed to the same frontier before.
+    - peak_frontier (int): Largest number of entries in the frontier at once, stale entries included.
+    - neighbor_time (float): Seconds spent looking up the open neighbors of the cells.
+    - queue_time (float): Seconds spent pushing to and popping from the frontier.
+    - step_time (float): Seconds spent in the step callback, i.e. rendering in the visualizer.
+    """
+
+    def __init__(self):
+        """
+        Initializes empty counters.
+        """
+
+        self.nodes_expanded = 0
+        self.nodes_enqueued = 0
+        self.duplicate_pushes = 0
+        self.peak_frontier = 0
+        self.neighbor_time = 0.0
+        self.queue_time = 0.0
+        self.step_time = 0.0
+
+        # Current number of entries in the frontier(s)
+        self.frontier = 0
+
+    def as_dict(self):
+        """
+        Returns the counters as a dict, e.g. to write them as CSV or JSON.
+        """
+        return {name: value for name, value in vars(self).items() if name != "frontier"}
+
+    def __repr__(self):
+        return "SearchProfile({})".format(", ".join(
+            f"{name}={value:.6f}" if isinstance(value, float) else f"{name}={value}" for name, value in self.as_dict().items()))
+
+    def neighbors(self, neighbors_of):
+        """
+        Wraps a neighbor lookup function to time it.
+        """
+        clock = time.perf_counter
+
+        def timed_neighbors(index: int):
+            started = clock()
+            neighbors = neighbors_of(index)
+            self.neighbor_time += clock() - started
+            return neighbors
+
+        return timed_neighbors
+
+    def push(self, push):
+        """
+        Wraps a frontier push (`deque.append`, `list.append` or `heapq.heappush`) to time and count it.
+        The pushed cell is the last argument, or the last item of a heap entry tuple.
+
+        Every wrapper keeps its own record of the pushed cells, so a bidirectional search wraps the
+        push of each side separately and a cell reached once from each side is not a duplicate.
+        """
+        clock = time.perf_counter
+        pushed = set()
+
+        def timed_push(*args):
+            started = clock()
+            push(*args)
+            self.queue_time += clock() - started
+
+            cell = args[-1][-1] if isinstance(args[-1], tuple) else args[-1]
+            if cell in pushed:
+                self.duplicate_pushes += 1
+            else:
+                pushed.add(cell)
+            self.nodes_enqueued += 1
+            self.frontier += 1
+            if self.frontier > self.peak_frontier:
+                self.peak_frontier = self.frontier
+
+        return timed_push
+
+    def pop(self, pop):
+        """
+        Wraps a frontier pop (`deque.popleft`, `list.pop` or `heapq.heappop`) to time and count it.
+        """
+        clock = time.perf_counter
+
+        def timed_pop(*args):
+            started = clock()
+            item = pop(*args)
+            self.queue_time += clock() - started
+            self.frontier -= 1
+            return item
+
+        return timed_pop
+
+    def step(self, on_step):
+        """
+        Wraps the step callback, called once per expanded cell, to time it and count the expansions.
+        """
+        clock = time.perf_counter
+
+        def timed_step(index: int):
+            self.nodes_expanded += 1
+            if on_step is not None:
+                started = clock()
+                on_step(index)
+                self.step_time += clock() - started
+
+        return timed_step
+
+def run_profiled(function, *args, profiler: str = "cprofile", **kwargs):
+    """
+    Run a function, e.g. a solver, under a sampling or deterministic profiler.
+
+    Args:
+    - function (Callable): The function to profile.
+    - *args, **kwargs: Its arguments.
+    - profiler (str): "cprofile" (standard library) or "pyinstrument" (needs the pyinstrument package).
+
+    Returns:
+    - result: What the function returned.
+    - report (str): The text report of the profiler.
+    """
+
+    if profiler == "pyinstrument":
+        from pyinstrument import Profiler
+        profile = Profiler()
+        profile.start()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            profile.stop()
+        return result, profile.output_text()
+
+    if profiler != "cprofile":
+        raise ValueError(f"unknown profiler {profiler!r}, expected 'cprofile' or 'pyinstrument'")
+
+    import cProfile
+    import pstats
+    profile = cProfile.Profile()
+    result = profile.runcall(function, *args, **kwargs)
+    report = io.StringIO()
+    pstats.Stats(profile, stream = report).sort_stats("cumulative").print_stats(25)
+    return result, report.getvalue()
@@ -0,0 +1,375 @@
+import heapq
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from collections import deque
+from maze import Maze, as_maze
+from engine.common import reconstruct_path
+
+# Marks cells without a parent, or not reachable, in the unsigned arrays
+NONE = 0xFFFFFFFF
+
+# Kinds of index stored in an oracle
+TREE, LANDMARKS = 0, 1
+
+# File header: magic, format version, kind, cols, rows, CRC-32 of the packed walls, number of arrays
+FILE_MAGIC = b"MZDO"
+FILE_HEADER = struct.Struct("<4sHHIIII")
+# Header of every stored array: typecode, number of items
+ARRAY_HEADER = struct.Struct("<cxxxQ")
+FILE_VERSION = 2
+
+# Length of the blocks of the Euler tour in the range minimum index
+RMQ_BLOCK = 32
+
+def euler_tour(maze: Maze, root: int = 0):
+    """
+    Walk the maze depth first from a root cell, recording the Euler tour of the tree it forms.
+
+    Args:
+    - maze (Maze): The maze to walk.
+    - root (int): Index of the root cell.
+
+    Returns:
+    - (parent, depth, first, euler) (Tuple[array, array, array, array]): The parent and depth of every
+      cell, the position of the first visit of every cell in the tour, and the tour itself as the
+      indices of the visited cells. None if the maze has a loop or cells not reachable from the root.
+    """
+
+    adjacency = maze.adjacency()
+    offsets, targets = adjacency.offsets, adjacency.targets
+    parent = array("I", [NONE]) * maze.size
+    depth = array("I", [NONE]) * maze.size
+    first = array("I", [0]) * maze.size
+    # Position of the next neighbor to visit, for every cell
+    cursor = array("I", offsets)
+
+    depth[root] = 0
+    euler = array("I", [root])
+    stack = [root]
+    while stack:
+        current = stack[-1]
+        position = cursor[current]
+        if position == offsets[current + 1]:
+            # Every neighbor has been visited: go back to the parent
+            stack.pop()
+            if stack:
+                euler.append(stack[-1])
+            continue
+        cursor[current] = position + 1
+
+        neighbor = targets[position]
+        if neighbor == parent[current]:
+            continue
+        if depth[neighbor] != NONE:
+            # Reached a second time: the maze has a loop
+            return None
+        parent[neighbor] = current
+        depth[neighbor] = depth[current] + 1
+        first[neighbor] = len(euler)
+        euler.append(neighbor)
+        stack.append(neighbor)
+
+    if len(euler) != 2 * maze.size - 1:
+        return None
+    return parent, depth, first, euler
+
+def bfs_distances(maze: Maze, source: int):
+    """
+    Compute the distance from a cell to every other cell with a Breadth-First Search.
+
+    Args:
+    - maze (Maze): The maze to search.
+    - source (int): Index of the source cell.
+
+    Returns:
+    - distances (array): The distance of every cell from the source, NONE if it can not be reached.
+    """
+
+    neighbors_of = maze.adjacency().neighbors
+    distances = array("I", [NONE]) * maze.size
+    distances[source] = 0
+    queue = deque([source])
+    while queue:
+        current = queue.popleft()
+        next_distance = distances[current] + 1
+        for neighbor in neighbors_of(current):
+            if distances[neighbor] == NONE:
+                distances[neighbor] = next_distance
+                queue.append(neighbor)
+    return distances
+
+class DistanceOracle:
+    """
+    Precomputed index answering distance and path queries between any two cells of a maze.
+
+    A perfect maze (every cell reachable, no loop) is a spanning tree, so the index roots it at the
+    first cell and answers queries with the lowest common ancestor (LCA) of both cells, the shallowest
+    cell of the Euler tour of the tree between their first visits:
+    distance(a, b) = depth[a] + depth[b] - 2 * depth[lca(a, b)].
+
+    The range minimums are found with a block decomposition of the tour that takes linear memory: the
+    minimum of every prefix and suffix of the blocks of RMQ_BLOCK positions, and a sparse table over
+    the minimums of the blocks only. Two cells in different blocks are answered in constant time,
+    two cells in the same block by scanning at most RMQ_BLOCK positions.
+
+    Other mazes fall back to landmarks (ALT): the distances from a few far apart cells are stored,
+    and queries run an A* search guided by the triangle inequality bound they give.
+
+    The index is a snapshot of the walls when it was built; build a new one after the walls change.
+
+    Attributes:
+    - cols (int): Number of columns of the maze.
+    - rows (int): Number of rows of the maze.
+    - version (int): The version of the maze the index was built from.
+    - checksum (int): CRC-32 of the packed walls, to check that a saved index matches a maze.
+    - kind (int): TREE or LANDMARKS.
+    - maze (Maze): The indexed maze, only used by the landmark searches.
+    """
+
+    def __init__(self, maze: Maze, landmarks: int = 8):
+        """
+        Builds the index of a maze.
+
+        Args:
+        - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+        - landmarks (int): Number of landmarks used when the maze is not a tree.
+        """
+
+        maze = as_maze(maze)
+        self.maze = maze
+        self.cols, self.rows = maze.cols, maze.rows
+        self.version = maze.version
+        self.checksum = zlib.crc32(maze.walls)
+
+        tour = euler_tour(maze)
+        if tour is not None:
+            self.kind = TREE
+            self.parent, self.depth, self.first, self.euler = tour
+            self.build_range_minimums()
+        else:
+            self.kind = LANDMARKS
+            self.landmarks, self.distances = self.choose_landmarks(maze, landmarks)
+
+    def build_range_minimums(self):
+        """
+        Builds the range minimum index of the Euler tour (see the class docstring). It is derived from
+        the tour and the depths, so it is not saved but built again when an index is loaded.
+        """
+        depth = self.depth
+        # Shallowest first: depth << 32 | index orders the cells by depth, and masking it gives the cell back
+        keys = array("Q", [depth[cell] << 32 | cell for cell in self.euler])
+        prefix, suffix, block_minimums = array("I"), array("I"), array("Q")
+        mask = NONE.__and__
+        for start in range(0, len(keys), RMQ_BLOCK):
+            block = keys[start:start + RMQ_BLOCK]
+            prefix.extend(map(mask, accumulate(block, min)))
+            block_suffix = array("Q", accumulate(reversed(block), min))
+            block_suffix.reverse()
+            suffix.extend(map(mask, block_suffix))
+            block_minimums.append(block_suffix[0])
+
+        self.prefix_minimums, self.suffix_minimums = prefix, suffix
+        # Level k of the sparse table holds the minimum of every run of 2^k consecutive blocks
+        self.block_table = [block_minimums]
+        half = 1
+        while 2 * half <= len(block_minimums):
+            previous = self.block_table[-1]
+            self.block_table.append(array("Q", map(min, previous[:len(previous) - half], previous[half:])))
+            half *= 2
+
+    @staticmethod
+    def choose_landmarks(maze: Maze, count: int):
+        """
+        Picks landmarks far apart from each other: every new landmark is the cell farthest from the
+        landmarks already chosen, starting with the cell farthest from the first cell.
+
+        Returns:
+        - landmarks (array): Indices of the landmarks.
+        - distances (List[array]): The distances from every landmark to every cell.
+        """
+
+        landmarks = array("I")
+        distances = []
+        # Distance from every cell to the closest landmark so far
+        closest = bfs_distances(maze, 0)
+
+        for _ in range(min(count, maze.size)):
+            candidates = [distance for distance in closest if distance != NONE]
+            landmark = closest.index(max(candidates))
+            if closest[landmark] == 0 and landmarks:
+                break
+            landmarks.append(landmark)
+            distances.append(bfs_distances(maze, landmark))
+            closest = array("I", map(min, closest, distances[-1]))
+        return landmarks, distances
+
+    def lca(self, a: int, b: int):
+        """
+        Returns the lowest common ancestor of two cells of a tree index.
+        """
+        left, right = self.first[a], self.first[b]
+        if left > right:
+            left, right = right, left
+        by_depth = self.depth.__getitem__
+        left_block, right_block = left // RMQ_BLOCK, right // RMQ_BLOCK
+        if left_block == right_block:
+            return min(self.euler[left:right + 1], key = by_depth)
+
+        # The end of the left block, the start of the right block, and the whole blocks in between
+        ancestor = min(self.suffix_minimums[left], self.prefix_minimums[right], key = by_depth)
+        if right_block - left_block > 1:
+            level = (right_block - left_block - 1).bit_length() - 1
+            row = self.block_table[level]
+            between = min(row[left_block + 1], row[right_block - (1 << level)]) & NONE
+            ancestor = min(ancestor, between, key = by_depth)
+        return ancestor
+
+    def distance(self, a: int, b: int):
+        """
+        Returns the number of steps of the shortest path between two cells, None if there is no path.
+        """
+        if self.kind == TREE:
+            depth = self.depth
+            return depth[a] + depth[b] - 2 * depth[self.lca(a, b)]
+        path = self.search(a, b)
+        return len(path) - 1 if path is not None else None
+
+    def path(self, a: int, b: int):
+        """
+        Returns the cell indices of the shortest path from a to b, None if there is no path.
+        """
+        if self.kind != TREE:
+            return self.search(a, b)
+
+        # Climb from both cells to their common ancestor
+        ancestor = self.lca(a, b)
+        parent = self.parent
+        up, down = [], []
+        while a != ancestor:
+            up.append(a)
+            a = parent[a]
+        while b != ancestor:
+            down.append(b)
+            b = parent[b]
+        up.append(ancestor)
+        down.reverse()
+        return up + down
+
+    def search(self, start: int, destination: int):
+        """
+        A* search between two cells guided by the landmark lower bound
+        max over the landmarks L of |d(L, cell) - d(L, destination)|.
+
+        Returns:
+        - path (List[int]): Indices of the cells from the start to the destination, else None
+        """
+
+        # Landmarks reaching only one of the two cells prove that they are not connected
+        bounds = []
+        for distances in self.distances:
+            start_distance, goal_distance = distances[start], distances[destination]
+            if (start_distance == NONE) != (goal_distance == NONE):
+                return None
+            if goal_distance != NONE:
+                bounds.append((distances, goal_distance))
+
+        def heuristic(index: int):
+            return max((abs(distances[index] - goal_distance) for distances, goal_distance in bounds), default = 0)
+
+        neighbors_of = self.maze.adjacency().neighbors
+        open_set = [(heuristic(start), start)]
+        g_cost = {start: 0}
+        parent = {start: None}
+        closed = bytearray(self.maze.size)
+
+        while open_set:
+            _, current = heapq.heappop(open_set)
+            if closed[current]:
+                continue
+            closed[current] = 1
+            if current == destination:
+                return reconstruct_path(parent, destination)
+
+            tentative_g_cost = g_cost[current] + 1
+            for neighbor in neighbors_of(current):
+                if not closed[neighbor] and tentative_g_cost < g_cost.get(neighbor, tentative_g_cost + 1):
+                    g_cost[neighbor] = tentative_g_cost
+                    parent[neighbor] = current
+                    heapq.heappush(open_set, (tentative_g_cost + heuristic(neighbor), neighbor))
+        return None
+
+    def arrays(self):
+        """
+        Returns the arrays of the index, in the order they are saved.
+        """
+        if self.kind == TREE:
+            return [self.parent, self.depth, self.first, self.euler]
+        return [self.landmarks] + self.distances
+
+    def save(self, path: str):
+        """
+        Saves the index to a file, e.g. next to the saved maze, so it does not have to be built again.
+        A tree index takes 20 bytes per cell (parent, depth, first visit and two tour positions), the
+        range minimum index is built again on load.
+
+        Args:
+        - path (str): The path of the file to write.
+        """
+
+        arrays = self.arrays()
+        with open(path, "wb") as file:
+            file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, self.kind, self.cols, self.rows, self.checksum, len(arrays)))
+            for values in arrays:
+                file.write(ARRAY_HEADER.pack(values.typecode.encode(), len(values)))
+                # The arrays are stored in little endian order
+                if sys.byteorder == "big":
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(file)
+
+    @classmethod
+    def load(cls, path: str, maze: Maze):
+        """
+        Loads an index saved by `save`.
+
+        Args:
+        - path (str): The path of the saved index.
+        - maze (Maze): The maze the index was built from.
+
+        Returns:
+        - oracle (DistanceOracle): The loaded index.
+        """
+
+        with open(path, "rb") as file:
+            magic, file_version, kind, cols, rows, checksum, count = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+            if magic != FILE_MAGIC:
+                raise ValueError(f"{path} is not a distance oracle file")
+            if file_version != FILE_VERSION:
+                raise ValueError(f"{path} uses the unsupported format version {file_version}, build the index again")
+            if (cols, rows, checksum) != (maze.cols, maze.rows, zlib.crc32(maze.walls)):
+                raise ValueError(f"{path} was built for another maze")
+
+            arrays = []
+            for _ in range(count):
+                typecode, length = ARRAY_HEADER.unpack(file.read(ARRAY_HEADER.size))
+                values = array(typecode.decode())
+                values.fromfile(file, length)
+                if sys.byteorder == "big":
+                    values.byteswap()
+                arrays.append(values)
+
+        oracle = cls.__new__(cls)
+        oracle.maze = maze
+        oracle.cols, oracle.rows = cols, rows
+        oracle.version = maze.version
+        oracle.checksum = checksum
+        oracle.kind = kind
+        if kind == TREE:
+            oracle.parent, oracle.depth, oracle.first, oracle.euler = arrays
+            oracle.build_range_minimums()
+        else:
+            oracle.landmarks, oracle.distances = arrays[0], arrays[1:]
+        return oracle
@@ -0,0 +1,37 @@
+from engine.bfs import find_path_BFS
+from engine.dfs import find_path_DFS
+from engine.astar import find_path_A_star
+from engine.gbfs import find_path_greedy_bfs
+from engine.bidirectionalbfs import find_path_bidirectional_BFS
+from engine.bidirectionalastar import find_path_bidirectional_A_star
+from engine.corridors import find_path_corridor_A_star
+from engine.dijkstra import find_path_dijkstra, find_path_weighted_A_star
+
+# Headless solvers by name, in the same order as the buttons of the visualizer, then the headless only ones
+SOLVERS = {
+    "BFS": find_path_BFS,
+    "DFS": find_path_DFS,
+    "Bidirectional BFS": find_path_bidirectional_BFS,
+    "A*": find_path_A_star,
+    "GBFS": find_path_greedy_bfs,
+    "Bidirectional A*": find_path_bidirectional_A_star,
+    "Corridor A*": find_path_corridor_A_star,
+    "Dijkstra": find_path_dijkstra,
+    "Weighted A*": find_path_weighted_A_star,
+}
+
+def get_solver(name: str):
+    """
+    Look up a headless solver by name (case-insensitive).
+
+    Args:
+    - name (str): The name of the algorithm, one of the keys of SOLVERS.
+
+    Returns:
+    - solver (Callable): The solver function, called as solver(maze, on_step=None, start=0, destination=None).
+    """
+
+    for solver_name, solver in SOLVERS.items():
+        if solver_name.lower() == name.lower():
+            return solver
+    raise KeyError(f"unknown algorithm {name!r}, expected one of: {', '.join(SOLVERS)}")
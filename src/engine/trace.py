@@ -0,0 +1,249 @@
+import queue
+import struct
+import threading
+import zlib
+from array import array
+from maze import Maze, as_maze
+from engine.background import STEPS, DONE, ERROR, SearchCancelled
+
+# Types of the trace events
+EXPAND, PATH = 0, 1
+EVENT_NAMES = {EXPAND: "expand", PATH: "path"}
+
+# Header of a trace file: magic, format version, cols, rows, CRC-32 of the packed walls, algorithm name.
+# The (step, cell_index, event_type) records follow the header, 9 bytes each.
+TRACE_MAGIC = b"MZTR"
+TRACE_HEADER = struct.Struct("<4sHxxIII24s")
+RECORD = struct.Struct("<IIB")
+
+# The expanded cells are handed from the solver thread to the reader of the events in chunks of this
+# many cells, with at most TRACE_PENDING_CHUNKS chunks waiting, so a trace is streamed in bounded memory
+TRACE_CHUNK = 4096
+TRACE_PENDING_CHUNKS = 8
+
+def trace_search(solver, maze: Maze, start: int = 0, destination: int = None):
+    """
+    Run a headless solver at full speed and stream what it did as (step, cell_index, event_type) events.
+
+    Every expanded cell gives an EXPAND event, in the order the solver expanded them, then every
+    cell of the solution path (if one was found) gives a PATH event, from the start to the destination.
+
+    The solver runs on a worker thread while the events are read: its expanded cells are passed on in
+    chunks of TRACE_CHUNK cells through a queue of at most TRACE_PENDING_CHUNKS chunks, and the solver
+    waits when the reader falls behind. The memory used does not grow with the number of expanded
+    cells, and the solver is stopped if the reader stops before the end.
+
+    Args:
+    - solver (Callable): A headless solver from the `engine` package, e.g. `find_path_BFS`.
+    - maze (Maze/List[Cell]): The packed maze, or the list of all the cells in the maze.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+
+    Yields:
+    - event (Tuple[int, int, int]): The step number, the index of the cell and the event type.
+    """
+
+    maze = as_maze(maze)
+    chunks = queue.Queue(maxsize = TRACE_PENDING_CHUNKS)
+    stopped = threading.Event()
+
+    def put(message):
+        # Wait for room in the queue, unless the reader is gone
+        while not stopped.is_set():
+            try:
+                chunks.put(message, timeout = 0.1)
+                return
+            except queue.Full:
+                pass
+        raise SearchCancelled
+
+    def run():
+        chunk = array("I")
+
+        def on_step(index: int):
+            nonlocal chunk
+            chunk.append(index)
+            if len(chunk) >= TRACE_CHUNK:
+                put((STEPS, chunk))
+                chunk = array("I")
+
+        try:
+            path, _ = solver(maze, on_step = on_step, start = start, destination = destination)
+            put((STEPS, chunk))
+            put((DONE, path))
+        except SearchCancelled:
+            pass
+        except Exception as error:
+            try:
+                put((ERROR, error))
+            except SearchCancelled:
+                pass
+
+    thread = threading.Thread(target = run, daemon = True)
+    thread.start()
+    step = 0
+    try:
+        while True:
+            kind, value = chunks.get()
+            if kind == STEPS:
+                for index in value:
+                    yield step, index, EXPAND
+                    step += 1
+            elif kind == DONE:
+                for index in value or ():
+                    yield step, index, PATH
+                    step += 1
+                return
+            else:
+                raise value
+    finally:
+        stopped.set()
+        thread.join()
+
+def write_trace(events, path: str, maze: Maze, algorithm: str = ""):
+    """
+    Record a stream of events to a binary trace file.
+
+    Args:
+    - events (Iterable[Tuple[int, int, int]]): The events, e.g. from `trace_search`.
+    - path (str): The path of the file to write.
+    - maze (Maze/List[Cell]): The maze the events come from, so a replay can check it uses the same walls.
+    - algorithm (str): The name of the algorithm, shown when the trace is replayed.
+
+    Returns:
+    - count (int): The number of recorded events.
+    """
+
+    maze = as_maze(maze)
+    name = algorithm.encode("utf-8")[:24]
+    count = 0
+    with open(path, "wb") as file:
+        file.write(TRACE_HEADER.pack(TRACE_MAGIC, 1, maze.cols, maze.rows, zlib.crc32(maze.walls), name))
+        buffer = bytearray()
+        for event in events:
+            buffer += RECORD.pack(*event)
+            count += 1
+            # Write in large blocks rather than one small write per event
+            if len(buffer) >= 1 << 16:
+                file.write(buffer)
+                buffer.clear()
+        file.write(buffer)
+    return count
+
+def read_trace_header(path: str):
+    """
+    Read the header of a trace file.
+
+    Args:
+    - path (str): The path of the trace file.
+
+    Returns:
+    - (cols, rows, checksum, algorithm) (Tuple[int, int, int, str]): The size of the maze, the CRC-32
+      of its packed walls and the name of the algorithm.
+    """
+
+    with open(path, "rb") as file:
+        header = file.read(TRACE_HEADER.size)
+    if len(header) < TRACE_HEADER.size:
+        raise ValueError(f"{path} is not a trace file")
+    magic, version, cols, rows, checksum, name = TRACE_HEADER.unpack(header)
+    if magic != TRACE_MAGIC or version != 1:
+        raise ValueError(f"{path} is not a trace file")
+    return cols, rows, checksum, name.rstrip(b"\0").decode("utf-8", "replace")
+
+def read_trace(path: str, block: int = 4096):
+    """
+    Stream the events of a trace file, reading it block by block.
+
+    Args:
+    - path (str): The path of the trace file.
+    - block (int): Number of records read at once.
+
+    Yields:
+    - event (Tuple[int, int, int]): The step number, the index of the cell and the event type.
+    """
+
+    read_trace_header(path)
+    with open(path, "rb") as file:
+        file.seek(TRACE_HEADER.size)
+        while True:
+            data = file.read(block * RECORD.size)
+            if not data:
+                break
+            if len(data) % RECORD.size:
+                raise ValueError(f"{path} is truncated")
+            yield from RECORD.iter_unpack(data)
+
+def trace_matches(path: str, maze: Maze):
+    """
+    Check that a trace was recorded on a maze with the same size and walls.
+    """
+    maze = as_maze(maze)
+    cols, rows, checksum, _ = read_trace_header(path)
+    return (cols, rows, checksum) == (maze.cols, maze.rows, zlib.crc32(maze.walls))
+
+class TraceReplay:
+    """
+    Replays the events of a trace a few at a time, with the same interface as
+    `engine.background.BackgroundSearch`, so a render loop shows a recorded search at its own pace
+    like a running one.
+
+    Attributes:
+    - path (List[int]): Indices of the cells of the recorded solution path, None until all the events
+      were read or if the trace has no path.
+    - stats (SearchStats): Always None, a trace only records the cells.
+    """
+
+    def __init__(self, events):
+        """
+        Args:
+        - events (Iterable[Tuple[int, int, int]]): The (step, cell_index, event_type) events, e.g. from `read_trace`.
+        """
+
+        self.events = iter(events)
+        self.path = None
+        self.stats = None
+        self.cancelled = threading.Event()
+        self.result_received = False
+        self.path_cells = []
+
+    def poll(self, max_steps: int = None):
+        """
+        Reads the next expanded cells of the trace.
+
+        Args:
+        - max_steps (int, optional): Return at most this many cells. All the remaining cells by default.
+
+        Returns:
+        - steps (List[int]): The expanded cells, in order.
+        """
+        steps = []
+        if self.finished or max_steps == 0:
+            return steps
+        for _, index, event_type in self.events:
+            if event_type == PATH:
+                self.path_cells.append(index)
+                continue
+            steps.append(index)
+            if len(steps) == max_steps:
+                break
+        else:
+            self.path = self.path_cells or None
+            self.result_received = True
+        return steps
+
+    @property
+    def finished(self):
+        """
+        Whether the replay was cancelled, or all its events were read.
+        """
+        return self.cancelled.is_set() or self.result_received
+
+    def cancel(self):
+        """
+        Stops the replay, closing the trace file if the events are read from one.
+        """
+        self.cancelled.set()
+        close = getattr(self.events, "close", None)
+        if close is not None:
+            close()
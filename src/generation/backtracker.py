@@ -0,0 +1,72 @@
+import random
+from maze import Maze, TOP, RIGHT, BOTTOM, LEFT
+
+def generate_maze_bulk(maze: Maze, seed = None):
+    """
+    Carve the whole maze with the recursive backtracking algorithm in one call, without drawing.
+
+    This produces the same kind of perfect maze as `generate_maze` in utils.py, but the whole
+    maze is carved at once on a plain bytearray and packed into the maze at the end. The random
+    generator is seeded with `seed`, so the same seed always gives the same maze.
+
+    Args:
+    - maze (Maze): The maze to carve. Its walls are replaced.
+    - seed (int, optional): Seed of the random generator; a random maze is carved when omitted.
+
+    Returns:
+    - maze (Maze): The carved maze.
+    """
+
+    rand = random.Random(seed).random
+    cols, size = maze.cols, maze.size
+
+    # One byte of wall bits per cell while carving, every wall in place
+    walls = bytearray(b"\x0f") * size
+    generated = bytearray(size)
+
+    # Start the generation from the first cell
+    generated[0] = 1
+    stack = [0]
+    neighbors = []
+
+    while stack:
+        current = stack[-1]
+        x = current % cols
+
+        # Collect the neighbors (top, right, bottom, left) that have not been generated yet
+        neighbors.clear()
+        if current >= cols and not generated[current - cols]:
+            neighbors.append(current - cols)
+        if x < cols - 1 and not generated[current + 1]:
+            neighbors.append(current + 1)
+        if current + cols < size and not generated[current + cols]:
+            neighbors.append(current + cols)
+        if x > 0 and not generated[current - 1]:
+            neighbors.append(current - 1)
+
+        if not neighbors:
+            # Dead end: backtrack
+            stack.pop()
+            continue
+
+        # Randomly select a neighbor, remove the wall between both cells and move to it
+        next_cell = neighbors[int(rand() * len(neighbors))]
+        step = next_cell - current
+        if step == -cols:
+            walls[current] &= ~TOP
+            walls[next_cell] &= ~BOTTOM
+        elif step == cols:
+            walls[current] &= ~BOTTOM
+            walls[next_cell] &= ~TOP
+        elif step == 1:
+            walls[current] &= ~RIGHT
+            walls[next_cell] &= ~LEFT
+        else:
+            walls[current] &= ~LEFT
+            walls[next_cell] &= ~RIGHT
+        generated[next_cell] = 1
+        stack.append(next_cell)
+
+    maze.set_unpacked_walls(walls)
+    maze.seed, maze.generator = seed, "backtracker"
+    return maze
@@ -0,0 +1,220 @@
+import numpy as np
+from maze import Maze, ALL_WALLS, TOP, RIGHT, BOTTOM, LEFT
+
+def build_row(east, down, up):
+    """
+    Build the wall bits of a row of cells from the passages carved in it.
+
+    Args:
+    - east (np.ndarray): Boolean mask, True where the cell is open to its right neighbor.
+    - down (np.ndarray): Boolean mask, True where the cell is open to the cell below.
+    - up (np.ndarray): Boolean mask, True where the cell is open to the cell above
+      (the `down` mask of the previous row).
+
+    Returns:
+    - row (np.ndarray): uint8 wall bits of every cell of the row.
+    """
+
+    row = np.full(len(east), ALL_WALLS, dtype = np.uint8)
+    row[east] &= ~RIGHT & ALL_WALLS
+    row[1:][east[:-1]] &= ~LEFT & ALL_WALLS
+    row[down] &= ~BOTTOM & ALL_WALLS
+    row[up] &= ~TOP & ALL_WALLS
+    return row
+
+def binary_tree_rows(cols: int, rows: int, seed = None):
+    """
+    Generate a perfect maze with the binary tree algorithm, one row at a time.
+
+    Every cell carves a passage either to the right or down, chosen at random for the whole row
+    at once. The last column can only go down and the last row is a single corridor.
+
+    Args:
+    - cols (int): Number of columns of the maze.
+    - rows (int): Number of rows of the maze.
+    - seed (int, optional): Seed of the random generator.
+
+    Yields:
+    - row (np.ndarray): uint8 wall bits of the cells of each row, from top to bottom.
+    """
+
+    rng = np.random.default_rng(seed)
+    up = np.zeros(cols, dtype = bool)
+
+    for y in range(rows):
+        if y == rows - 1:
+            # The last row can only go right
+            east = np.ones(cols, dtype = bool)
+            down = np.zeros(cols, dtype = bool)
+        else:
+            east = rng.random(cols) < 0.5
+            down = ~east
+            down[-1] = True
+        east[-1] = False
+
+        yield build_row(east, down, up)
+        up = down
+
+def sidewinder_rows(cols: int, rows: int, seed = None):
+    """
+    Generate a perfect maze with the sidewinder algorithm, one row at a time.
+
+    Each row is split at random into runs of cells joined left to right, and every run carves
+    one passage down from a random cell of the run. The last row is a single corridor.
+
+    Args:
+    - cols (int): Number of columns of the maze.
+    - rows (int): Number of rows of the maze.
+    - seed (int, optional): Seed of the random generator.
+
+    Yields:
+    - row (np.ndarray): uint8 wall bits of the cells of each row, from top to bottom.
+    """
+
+    rng = np.random.default_rng(seed)
+    up = np.zeros(cols, dtype = bool)
+
+    for y in range(rows):
+        down = np.zeros(cols, dtype = bool)
+        if y == rows - 1:
+            east = np.ones(cols, dtype = bool)
+            east[-1] = False
+        else:
+            east = rng.random(cols) < 0.5
+            east[-1] = False
+
+            # A run ends at every cell that does not go right; pick one random cell per run to go down
+            ends = np.flatnonzero(~east)
+            starts = np.concatenate(([0], ends[:-1] + 1))
+            offsets = (rng.random(len(starts)) * (ends - starts + 1)).astype(np.int64)
+            down[starts + offsets] = True
+
+        yield build_row(east, down, up)
+        up = down
+
+def find_set(parent, label: int):
+    """
+    Find the representative of a set in a union-find parent list, compressing the path on the way.
+
+    Args:
+    - parent (List[int]): The parent of every label, roots are their own parent.
+    - label (int): The label to look up.
+
+    Returns:
+    - root (int): The representative label of the set.
+    """
+
+    while parent[label] != label:
+        parent[label] = parent[parent[label]]
+        label = parent[label]
+    return label
+
+def eller_rows(cols: int, rows: int, seed = None):
+    """
+    Generate a perfect maze with Eller's algorithm, one row at a time.
+
+    Every cell of a row belongs to a set of cells already connected through the rows above.
+    Adjacent cells of different sets are joined at random, then every set carves at least one
+    passage down. The last row joins all the remaining sets. Only the set labels of the current
+    row are kept, so memory does not grow with the number of rows.
+
+    The vertical passages and the label bookkeeping are done with NumPy; joining adjacent sets
+    is a small union-find loop over the candidate edges of the row.
+
+    Args:
+    - cols (int): Number of columns of the maze.
+    - rows (int): Number of rows of the maze.
+    - seed (int, optional): Seed of the random generator.
+
+    Yields:
+    - row (np.ndarray): uint8 wall bits of the cells of each row, from top to bottom.
+    """
+
+    rng = np.random.default_rng(seed)
+    up = np.zeros(cols, dtype = bool)
+    labels = np.arange(cols)
+
+    for y in range(rows):
+        last_row = y == rows - 1
+
+        # Cells that were not reached from above start a new set, then relabel the sets 0..k-1
+        labels = np.where(up, labels, np.arange(cols) + cols)
+        _, labels = np.unique(labels, return_inverse = True)
+        parent = list(range(labels.max() + 1))
+
+        # Join adjacent cells of different sets, at random or always on the last row
+        east = np.zeros(cols, dtype = bool)
+        join = np.ones(cols - 1, dtype = bool) if last_row else rng.random(cols - 1) < 0.5
+        join &= labels[:-1] != labels[1:]
+        candidates = np.flatnonzero(join)
+        left_labels, right_labels = labels[candidates].tolist(), labels[candidates + 1].tolist()
+        for x, left, right in zip(candidates.tolist(), left_labels, right_labels):
+            left, right = find_set(parent, left), find_set(parent, right)
+            if left != right:
+                parent[right] = left
+                east[x] = True
+        labels = np.array([find_set(parent, label) for label in range(len(parent))])[labels]
+
+        down = np.zeros(cols, dtype = bool)
+        if not last_row:
+            # Go down at random, plus from one random cell of every set so that no set is cut off
+            down = rng.random(cols) < 0.5
+            order = rng.permutation(cols)
+            _, first = np.unique(labels[order], return_index = True)
+            down[order[first]] = True
+
+        yield build_row(east, down, up)
+        up = down
+
+# Row generators by name
+ROW_GENERATORS = {
+    "binary_tree": binary_tree_rows,
+    "sidewinder": sidewinder_rows,
+    "eller": eller_rows,
+}
+
+def write_row(maze: Maze, y: int, row):
+    """
+    Store the wall bits of one row in the packed walls of a maze.
+
+    Args:
+    - maze (Maze): The maze to write to.
+    - y (int): The index of the row.
+    - row (np.ndarray): uint8 wall bits of the cells of the row.
+    """
+
+    walls = maze.as_array()
+    start = y * maze.cols
+
+    # A row starting on an odd cell shares its first byte with the previous row
+    if start & 1:
+        walls[start >> 1] = walls[start >> 1] & 0x0F | row[0] << 4
+        row = row[1:]
+        start += 1
+
+    pairs = len(row) >> 1
+    first = start >> 1
+    walls[first:first + pairs] = row[0:2 * pairs:2] | row[1:2 * pairs:2] << 4
+
+    # An odd number of cells leaves the last one alone in the low nibble of a byte
+    if len(row) & 1:
+        walls[first + pairs] = walls[first + pairs] & 0xF0 | row[-1]
+
+def generate_maze_rows(maze: Maze, algorithm: str = "eller", seed = None):
+    """
+    Carve a whole maze with one of the row generators.
+
+    Args:
+    - maze (Maze): The maze to carve. Its walls are replaced.
+    - algorithm (str): The name of the generator, one of the keys of ROW_GENERATORS.
+    - seed (int, optional): Seed of the random generator.
+
+    Returns:
+    - maze (Maze): The carved maze.
+    """
+
+    for y, row in enumerate(ROW_GENERATORS[algorithm](maze.cols, maze.rows, seed)):
+        write_row(maze, y, row)
+    maze.seed, maze.generator = seed, algorithm
+    maze.walls_changed()
+    return maze
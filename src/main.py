@@ -1,122 +1,284 @@
+import os
+import time
+import argparse
 import pygame
-from cell import Cell
+from array import array
+from cell import MazeCells
+from maze import Maze
+from renderer import MazeRenderer
+from benchmark import parse_size
+from generation.backtracker import generate_maze_bulk
+from mazefile import save_maze, load_maze
+from engine.cache import SolutionCache
+from engine.background import BackgroundSearch
+from engine.registry import get_solver
+from engine.trace import read_trace, read_trace_header, trace_matches, TraceReplay
 from config import *
-from search.bfs import solve_maze_BFS
-from search.dfs import solve_maze_DFS
-from search.bidirectionalbfs import solve_maze_bidirectional_BFS
-from search.astar import solve_maze_A_star
-from search.gbfs import solve_maze_greedy_bfs
-from utils import reset_cells_visited_state, draw_button, draw_maze, generate_maze, reset_maze, draw_text_of_running_alg
-
-# Initialize Pygame
-pygame.init()
-sc = pygame.display.set_mode(RESOLUTION)
-clock = pygame.time.Clock()  
-
-# Load logo image
-image = pygame.image.load("images/logo.png")
-image = pygame.transform.scale(image, (240, 200))
-
-# Create a grid of Cell objects, define the starting cell, destination cell and flags
-grid_cells = [Cell(col, row) for row in range(rows) for col in range(cols)]
-current_cell = grid_cells[0]
-destination_cell = grid_cells[-1]
-stack = []
-maze_generating = False
-maze_complete = False
-searching_completed = False
-running_txt = ""
-cells_cnt = 0
-path = None
-
-# Main game loop
-while True:
-    sc.fill(pygame.Color(BACKGROUND_COLOR))
-
-    # Display the logo
-    sc.blit(image, (3, 0))
-
-    # Check for user events
-    for event in pygame.event.get():
-        # If the user clicks the window close button, exit.
-        if event.type == pygame.QUIT:
-            exit()
-        # Check if the mouse was clicked.
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            # Get the position of the mouse click.
-            mouse_pos = pygame.mouse.get_pos()
-
-            # Only respond to mouse clicks if the maze isn't being generated.
-            if not maze_generating:
-
-                # Check which button was clicked.
-                if maze_gen_btn.collidepoint(mouse_pos):
-                    stack, maze_complete, maze_generating = reset_maze(grid_cells)
-                    searching_completed = False
+from utils import reset_cells_visited_state, draw_button, generate_maze, reset_maze, draw_text_of_running_alg, \
+    mark_solution_path
 
-                elif bfs_btn.collidepoint(mouse_pos):
-                    running_txt = "RUNNING: BFS"
-                    searching_completed = False
-                    reset_cells_visited_state(grid_cells)
-                    searching_completed = True
-                    path, cells_cnt = solve_maze_BFS(grid_cells, sc)
+# Arrow keys scrolling the viewport: (dx, dy) in quarters of the view
+SCROLL_KEYS = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0), pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
 
-                elif dfs_btn.collidepoint(mouse_pos):
-                    running_txt = "RUNNING: DFS"
-                    searching_completed = False
-                    reset_cells_visited_state(grid_cells)
-                    path, cells_cnt = solve_maze_DFS(grid_cells, sc)
-                    searching_completed = True
+def main():
+    """
+    Entry point of the visualizer: creates the window, then runs the main loop until it is closed.
+    Pygame and the display are only initialized here, so the other modules can be imported without them.
+    """
 
-                elif bidirectional_btn.collidepoint(mouse_pos):
-                    running_txt = "RUNNING: Bidirectional BFS"
-                    searching_completed = False
-                    reset_cells_visited_state(grid_cells)
-                    path, cells_cnt = solve_maze_bidirectional_BFS(grid_cells, sc)
-                    searching_completed = True
+    # The size of the maze can be chosen on the command line, e.g. --size 2000x2000
+    parser = argparse.ArgumentParser(description = "Visualize the generation and the search of a maze.")
+    parser.add_argument("--size", type = parse_size, default = (cols, rows), help = "maze size as COLSxROWS")
+    args = parser.parse_args()
 
-                elif astar_btn.collidepoint(mouse_pos):
-                    running_txt = "RUNNING: A Star"
-                    searching_completed = False
-                    reset_cells_visited_state(grid_cells)
-                    path, cells_cnt = solve_maze_A_star(grid_cells, sc)
-                    searching_completed = True
+    # Mazes that do not fit at TILE_SIZE are shown through the zoomable viewport, which draws with NumPy.
+    # It is only imported then, so the mazes that fit can be shown with pygame alone.
+    zoomable = args.size[0] * TILE_SIZE > WIDTH - MAZE_OFFSET - 3 or args.size[1] * TILE_SIZE > HEIGHT - 4
+    if zoomable:
+        try:
+            from viewport import ViewportRenderer
+        except ImportError:
+            parser.error("mazes larger than the window are shown through a viewport that needs NumPy (pip install numpy)")
 
-                elif gbfs_btn.collidepoint(mouse_pos):
-                    running_txt = "RUNNING: GBFS"
-                    searching_completed = False
+    # Initialize Pygame
+    pygame.init()
+    sc = pygame.display.set_mode(RESOLUTION)
+    clock = pygame.time.Clock()
+
+    # Load logo image
+    image = pygame.image.load("images/logo.png")
+    image = pygame.transform.scale(image, (240, 200))
+
+    # Create the packed maze and its grid of Cell views, define the starting cell, destination cell and flags.
+    # The start and destination cells can be moved by clicking on the maze once it is generated.
+    maze = Maze(*args.size)
+    grid_cells = MazeCells(maze)
+    start_cell = grid_cells[0]
+    current_cell = start_cell
+    destination_cell = grid_cells[-1]
+    stack = []
+    maze_generating = False
+    maze_complete = False
+    searching_completed = False
+    running_txt = ""
+    cells_cnt = 0
+    path = None
+
+    # The renderer only redraws the cells that changed since the previous frame; the whole window
+    # is redrawn after a click, when the texts on the left panel change. Mazes that do not fit at
+    # TILE_SIZE are shown through a viewport instead: the mouse wheel zooms, the arrow keys scroll
+    # and Home shows the whole maze again.
+    renderer = ViewportRenderer(maze) if zoomable else MazeRenderer(maze)
+    full_redraw = True
+
+    # Solutions of the previous clicks: clicking a solver again on the same walls shows its result at once
+    solution_cache = SolutionCache()
+
+    # The running search: it runs on a worker thread and its expanded cells are shown
+    # SEARCH_STEPS_PER_SECOND at a time, so the window stays responsive and Escape can cancel it.
+    # A replayed trace is shown the same way, its search_algorithm is None so it is not cached.
+    search = None
+    search_algorithm = None
+    search_started = 0.0
+    search_rate = max(SEARCH_STEPS_PER_SECOND, maze.size / SEARCH_PLAYBACK_SECONDS)
+    expanded = array("I")
+
+    # Main game loop
+    while True:
+        dirty_rects = []
+        if full_redraw:
+            sc.fill(pygame.Color(BACKGROUND_COLOR))
+
+            # Display the logo
+            sc.blit(image, (3, 0))
+
+            # Draw the buttons for generating the maze and running different algorithms.
+            maze_gen_btn = draw_button(sc, "GENERATE MAZE", 20, 300, BUTTON_COLOR)
+            bfs_btn = draw_button(sc, "BFS", 20, 400, BUTTON_COLOR)
+            dfs_btn = draw_button(sc, "DFS", 20, 350, BUTTON_COLOR)
+            bidirectional_btn = draw_button(sc, "BIDIRECTIONAL BFS", 20, 450, BUTTON_COLOR)
+            astar_btn = draw_button(sc, "A STAR", 20, 500, BUTTON_COLOR)
+            gbfs_btn = draw_button(sc, "GBFS", 20, 550, BUTTON_COLOR)
+            bidirectional_astar_btn = draw_button(sc, "BIDIRECTIONAL A STAR", 20, 600, BUTTON_COLOR)
+
+            renderer.render(sc, full = True)
+            dirty_rects.append(sc.get_rect())
+            full_redraw = False
+
+        # Check for user events
+        for event in pygame.event.get():
+            # If the user clicks the window close button, exit.
+            if event.type == pygame.QUIT:
+                exit()
+            # Zoom and scroll the viewport of large mazes, also while generating or searching
+            if zoomable and event.type == pygame.MOUSEWHEEL:
+                renderer.zoom(1.25 ** event.y, pygame.mouse.get_pos())
+            if zoomable and event.type == pygame.KEYDOWN:
+                if event.key in SCROLL_KEYS:
+                    dx, dy = SCROLL_KEYS[event.key]
+                    renderer.scroll(dx * renderer.area.width / 4, dy * renderer.area.height / 4)
+                elif event.key == pygame.K_HOME:
+                    renderer.fit()
+            # S saves the generated maze to MAZE_FILE, L loads it back
+            if event.type == pygame.KEYDOWN and not maze_generating:
+                # Escape cancels the running search, the other keys wait until it is over
+                if search is not None:
+                    if event.key == pygame.K_ESCAPE:
+                        search.cancel()
+                    continue
+                if event.key == pygame.K_s and maze_complete:
+                    save_maze(maze, MAZE_FILE)
+                elif event.key == pygame.K_l and os.path.exists(MAZE_FILE):
+                    saved_maze = load_maze(MAZE_FILE)
+                    if (saved_maze.cols, saved_maze.rows) == (maze.cols, maze.rows):
+                        # The grid cells are views of this maze, so the walls are copied into it
+                        maze.walls[:] = saved_maze.walls
+                        maze.seed, maze.generator = saved_maze.seed, saved_maze.generator
+                        maze.walls_changed()
+                        reset_cells_visited_state(grid_cells)
+                        maze.generated.fill()
+                        stack, maze_complete, searching_completed = [], True, False
+                        full_redraw = True
+                # R replays the search trace recorded on this maze, read from the file as it is shown
+                elif event.key == pygame.K_r and maze_complete and os.path.exists(TRACE_FILE) and trace_matches(TRACE_FILE, maze):
+                    running_txt = "REPLAY: " + read_trace_header(TRACE_FILE)[3]
                     reset_cells_visited_state(grid_cells)
-                    path, cells_cnt = solve_maze_greedy_bfs(grid_cells, sc)
-                    searching_completed = True
-    
-    # Draw the buttons for generating the maze and running different algorithms.
-    maze_gen_btn = draw_button(sc, "GENERATE MAZE", 20, 300, BUTTON_COLOR)
-    bfs_btn = draw_button(sc, "BFS", 20, 400, BUTTON_COLOR)
-    dfs_btn = draw_button(sc, "DFS", 20, 350, BUTTON_COLOR)
-    bidirectional_btn = draw_button(sc, "BIDIRECTIONAL BFS", 20, 450, BUTTON_COLOR)
-    astar_btn = draw_button(sc, "A STAR", 20, 500, BUTTON_COLOR)
-    gbfs_btn = draw_button(sc, "GBFS", 20, 550, BUTTON_COLOR)
-
-    # Draw the maze grid with cells, stack (for maze generation), and the start and destination cells.
-    draw_maze(grid_cells, sc, stack, current_cell, destination_cell)
-
-    # If maze generation is active and not yet complete, continue generating the maze.
-    if maze_generating and not maze_complete:
-        draw_text_of_running_alg(sc, "GENERATING MAZE", FONT, 17, 45, 200, "#FFFFFF")
-        current_cell, stack, maze_complete = generate_maze(grid_cells, sc, current_cell, destination_cell, stack)
-
-    # If maze generation is complete, stop generation
-    if maze_complete:
-        maze_generating = False
-
-    # Display the result of the search algorithm
-    if searching_completed and not maze_generating:
-        draw_text_of_running_alg(sc, running_txt, FONT, 17, 20, 200, "#FFFFFF")
-        draw_text_of_running_alg(sc, "CELLS EXPLORED: " + str(cells_cnt), FONT, 17, 20, 230, "#FFFFFF")
-        draw_text_of_running_alg(sc, "SOLUTION LENGTH: " + str(len(path)), FONT, 17, 20, 260, "#FFFFFF")
-    
-    # Update the display and set the frame rate.
-    pygame.display.flip()
-    clock.tick(500)
-    
-    
+                    search = TraceReplay(read_trace(TRACE_FILE))
+                    search_algorithm = None
+                    search_started = time.perf_counter()
+                    expanded = array("I")
+                    path, cells_cnt = None, 0
+                    searching_completed = False
+                    full_redraw = True
+            # Check if the mouse was clicked. The mouse wheel also sends clicks of buttons 4 and 5, which are ignored.
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button not in (4, 5):
+                # Get the position of the mouse click.
+                mouse_pos = pygame.mouse.get_pos()
+
+                # Only respond to mouse clicks if the maze isn't being generated.
+                if not maze_generating:
+                    full_redraw = True
+                    clicked_cell = renderer.cell_at(mouse_pos)
+                    algorithm = None
+
+                    # Left click on the maze moves the start cell, right click moves the destination cell
+                    if clicked_cell is not None:
+                        if maze_complete and event.button in (1, 3):
+                            if event.button == 1:
+                                start_cell = grid_cells[clicked_cell]
+                            else:
+                                destination_cell = grid_cells[clicked_cell]
+                            if search is not None:
+                                search.cancel()
+                                search = None
+                            searching_completed = False
+                            reset_cells_visited_state(grid_cells)
+
+                    # Check which button was clicked.
+                    elif maze_gen_btn.collidepoint(mouse_pos):
+                        if search is not None:
+                            search.cancel()
+                            search = None
+                        stack, maze_complete, maze_generating = reset_maze(grid_cells)
+                        current_cell = start_cell
+                        searching_completed = False
+                        # Shift + click carves the whole maze at once instead of animating it, as do
+                        # the mazes of the viewport, too large to be carved one cell per frame
+                        if zoomable or pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                            generate_maze_bulk(maze)
+                            maze.generated.fill()
+                            maze_complete = True
+
+                    elif bfs_btn.collidepoint(mouse_pos):
+                        running_txt = "RUNNING: BFS"
+                        algorithm = "BFS"
+
+                    elif dfs_btn.collidepoint(mouse_pos):
+                        running_txt = "RUNNING: DFS"
+                        algorithm = "DFS"
+
+                    elif bidirectional_btn.collidepoint(mouse_pos):
+                        running_txt = "RUNNING: Bidirectional BFS"
+                        algorithm = "Bidirectional BFS"
+
+                    elif astar_btn.collidepoint(mouse_pos):
+                        running_txt = "RUNNING: A Star"
+                        algorithm = "A*"
+
+                    elif gbfs_btn.collidepoint(mouse_pos):
+                        running_txt = "RUNNING: GBFS"
+                        algorithm = "GBFS"
+
+                    elif bidirectional_astar_btn.collidepoint(mouse_pos):
+                        running_txt = "RUNNING: Bidirectional A Star"
+                        algorithm = "Bidirectional A*"
+
+                    # Start the search of the clicked algorithm, unless the same query was already solved
+                    if algorithm is not None:
+                        if search is not None:
+                            search.cancel()
+                        reset_cells_visited_state(grid_cells)
+                        solution = solution_cache.get(maze, algorithm, start_cell.index, destination_cell.index)
+                        if solution is not None:
+                            for index in solution.expanded:
+                                grid_cells[index].visited = True
+                            path = mark_solution_path(grid_cells, solution.path)
+                            cells_cnt = solution.stats.visited_cells_count
+                            search = None
+                            searching_completed = True
+                        else:
+                            search = BackgroundSearch(get_solver(algorithm), maze, start_cell.index, destination_cell.index)
+                            search_algorithm = algorithm
+                            search_started = time.perf_counter()
+                            expanded = array("I")
+                            path, cells_cnt = None, 0
+                            searching_completed = False
+
+        # Show the cells expanded by the running search since the last frame, at a steady pace
+        if search is not None:
+            due = int((time.perf_counter() - search_started) * search_rate) - len(expanded)
+            for index in search.poll(max(due, 0)):
+                grid_cells[index].visited = True
+                expanded.append(index)
+            cells_cnt = len(expanded)
+
+            if search.finished:
+                if not search.cancelled.is_set():
+                    path = mark_solution_path(grid_cells, search.path)
+                    if search_algorithm is not None:
+                        solution_cache.put(maze, search_algorithm, start_cell.index, destination_cell.index, search.path, search.stats, expanded)
+                else:
+                    running_txt = "CANCELLED: " + running_txt.split(": ", 1)[-1]
+                search = None
+                searching_completed = True
+                full_redraw = True
+            else:
+                dirty_rects.append(draw_text_of_running_alg(sc, running_txt, FONT, 17, 20, 200, "#FFFFFF"))
+                dirty_rects.append(draw_text_of_running_alg(sc, "CELLS EXPLORED: " + str(cells_cnt), FONT, 17, 20, 230, "#FFFFFF"))
+
+        # If maze generation is active and not yet complete, continue generating the maze.
+        if maze_generating and not maze_complete:
+            dirty_rects.append(draw_text_of_running_alg(sc, "GENERATING MAZE", FONT, 17, 45, 200, "#FFFFFF"))
+            current_cell, stack, maze_complete = generate_maze(grid_cells, None, current_cell, destination_cell, stack)
+
+        # If maze generation is complete, stop generation and clear the generation text
+        if maze_complete and maze_generating:
+            maze_generating = False
+            full_redraw = True
+
+        # Draw the cells that changed, the start (or current) and destination cells and the stack (for maze generation).
+        marked_cell = current_cell if maze_generating else start_cell
+        dirty_rects += renderer.render(sc, markers = [marked_cell.index, destination_cell.index], stack = [cell.index for cell in stack])
+
+        # Display the result of the search algorithm
+        if searching_completed and not maze_generating:
+            dirty_rects.append(draw_text_of_running_alg(sc, running_txt, FONT, 17, 20, 200, "#FFFFFF"))
+            dirty_rects.append(draw_text_of_running_alg(sc, "CELLS EXPLORED: " + str(cells_cnt), FONT, 17, 20, 230, "#FFFFFF"))
+            dirty_rects.append(draw_text_of_running_alg(sc, "SOLUTION LENGTH: " + str(len(path) if path else 0), FONT, 17, 20, 260, "#FFFFFF"))
+
+        # Update the changed parts of the display and set the frame rate.
+        pygame.display.update(dirty_rects)
+        clock.tick(500)
+
+if __name__ == "__main__":
+    main()
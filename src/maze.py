@@ -0,0 +1,515 @@
+from array import array
+from collections.abc import MutableMapping
+from config import cols as default_cols, rows as default_rows
+
+# Wall bits of a cell, 4 bits per cell
+TOP, RIGHT, BOTTOM, LEFT = 1, 2, 4, 8
+ALL_WALLS = TOP | RIGHT | BOTTOM | LEFT
+WALL_BITS = {"top": TOP, "right": RIGHT, "bottom": BOTTOM, "left": LEFT}
+
+class BitSet:
+    """
+    A fixed-size set of integers in [0, size) stored as one bit per element.
+
+    Attributes:
+    - size (int): Number of elements the set can hold.
+    - bits (bytearray): The packed bits, element i is bit (i % 8) of byte (i // 8).
+    - maze (Maze): The maze whose cell states the set holds, told about every change (see
+      `Maze.track_dirty`), None for a standalone set.
+    """
+
+    def __init__(self, size: int, maze = None):
+        """
+        Initializes an empty bit set.
+
+        Args:
+        - size (int): Number of elements the set can hold.
+        - maze (Maze, optional): The maze whose cell states the set holds.
+        """
+
+        self.size = size
+        self.bits = bytearray((size + 7) >> 3)
+        self.maze = maze
+
+    def __contains__(self, index: int):
+        return self.bits[index >> 3] >> (index & 7) & 1 == 1
+
+    def add(self, index: int):
+        self.bits[index >> 3] |= 1 << (index & 7)
+        if self.maze is not None and self.maze.dirty_states is not None:
+            self.maze.dirty_states.add(index)
+
+    def discard(self, index: int):
+        self.bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        if self.maze is not None and self.maze.dirty_states is not None:
+            self.maze.dirty_states.add(index)
+
+    def clear(self):
+        if self.maze is not None and self.maze.dirty_states is not None:
+            # Only the elements in the set change
+            for position, byte in enumerate(self.bits):
+                if byte:
+                    self.maze.dirty_states.update(8 * position + bit for bit in range(8) if byte >> bit & 1)
+        self.bits[:] = bytes(len(self.bits))
+
+    def fill(self):
+        self.bits[:] = b"\xff" * len(self.bits)
+        if self.maze is not None:
+            self.maze.mark_all_dirty()
+
+    def __len__(self):
+        return sum(bin(byte).count("1") for byte in self.bits)
+
+class Maze:
+    """
+    A compact maze grid: walls are packed 4 bits per cell (two cells per byte) and the visited,
+    solution and generated states are kept in separate bit sets.
+
+    Cells are addressed by their index `x + y * cols`, the same order as the grid_cells list.
+    A 100M-cell maze takes 50 MB for its walls plus 12.5 MB per bit set in use.
+
+    Attributes:
+    - cols (int): Number of columns of the maze.
+    - rows (int): Number of rows of the maze.
+    - size (int): Number of cells of the maze.
+    - walls (bytearray): The packed walls. Cell i uses the low nibble of byte i // 2 if i is even,
+      the high nibble otherwise. Each nibble is a combination of the TOP, RIGHT, BOTTOM and LEFT bits.
+    - version (int): Incremented on every wall change, so derived data (the adjacency index, the corridor
+      graph...) can tell when it is stale.
+    - costs_version (int): Incremented on every cost change. The costs do not invalidate the data derived
+      from the walls only.
+    - dirty_walls, dirty_states (Set[int]): The cells whose walls, or generated, visited or solution states
+      changed since the last `take_dirty`. None until `track_dirty` is called.
+    - all_dirty (bool): Whether every cell may have changed since the last `take_dirty`, e.g. after the
+      walls were replaced at once.
+    - seed (int): Seed the walls were generated with, None if unknown.
+    - generator (str): Name of the algorithm that generated the walls, None if unknown.
+    """
+
+    def __init__(self, cols: int = default_cols, rows: int = default_rows, walls=None):
+        """
+        Initializes a maze with every wall in place, or on top of an existing packed wall buffer.
+
+        Args:
+        - cols (int): Number of columns of the maze.
+        - rows (int): Number of rows of the maze.
+        - walls (bytearray/memoryview, optional): Packed walls to use without copying.
+        """
+
+        self.cols, self.rows = cols, rows
+        self.size = cols * rows
+        if walls is None:
+            walls = bytearray(b"\xff") * ((self.size + 1) >> 1)
+        elif len(walls) != (self.size + 1) >> 1:
+            raise ValueError(f"a {cols}x{rows} maze needs {(self.size + 1) >> 1} bytes of walls, got {len(walls)}")
+        self.walls = walls
+        self.version = 0
+        self.costs_version = 0
+        self._adjacency = None
+        self.dirty_walls = None
+        self.dirty_states = None
+        self.all_dirty = False
+        self.seed = None
+        self.generator = None
+
+        # The traversal costs and the state bit sets are only allocated once they are used
+        self._costs = None
+        self._cost_range = None
+        self._visited = None
+        self._solution = None
+        self._generated = None
+
+    @property
+    def costs(self):
+        """
+        The cost of entering every cell, one byte (0-255) per cell. Until costs are set, reading it
+        returns read-only bytes with 1 for every cell, without allocating the costs of the maze.
+        Use `set_cost` or assign the whole array to change it, or bump `costs_version` after writing
+        to the array directly.
+        """
+        if self._costs is None:
+            return bytes(b"\x01") * self.size
+        return self._costs
+
+    @costs.setter
+    def costs(self, costs):
+        if len(costs) != self.size:
+            raise ValueError(f"a {self.cols}x{self.rows} maze needs {self.size} costs, got {len(costs)}")
+        self._costs = costs
+        self.costs_version += 1
+
+    @property
+    def has_costs(self):
+        """
+        Whether traversal costs were set, the maze is uniform (every cell costs 1) otherwise.
+        """
+        return self._costs is not None
+
+    def cost_range(self):
+        """
+        Returns the smallest and the largest cost of the cells, (1, 1) for a uniform maze. They are
+        only computed again after `costs_version` changed.
+        """
+        if self._costs is None:
+            return 1, 1
+        if self._cost_range is None or self._cost_range[0] != self.costs_version:
+            self._cost_range = (self.costs_version, min(self._costs, default = 1), max(self._costs, default = 1))
+        return self._cost_range[1:]
+
+    def set_cost(self, index: int, cost: int):
+        """
+        Changes the cost of entering a cell, allocating the costs of the maze on the first call.
+        """
+        if self._costs is None:
+            self._costs = bytearray(b"\x01") * self.size
+        self._costs[index] = cost
+        self.costs_version += 1
+
+    @property
+    def visited(self):
+        if self._visited is None:
+            self._visited = BitSet(self.size, self)
+        return self._visited
+
+    @property
+    def solution(self):
+        if self._solution is None:
+            self._solution = BitSet(self.size, self)
+        return self._solution
+
+    @property
+    def generated(self):
+        if self._generated is None:
+            self._generated = BitSet(self.size, self)
+        return self._generated
+
+    @property
+    def nbytes(self):
+        """
+        Number of bytes used by the walls, the costs and the allocated bit sets.
+        """
+        state = [bitset for bitset in (self._visited, self._solution, self._generated) if bitset is not None]
+        costs = len(self._costs) if self._costs is not None else 0
+        return len(self.walls) + costs + sum(len(bitset.bits) for bitset in state)
+
+    def index(self, x: int, y: int):
+        return x + y * self.cols
+
+    def coords(self, index: int):
+        return index % self.cols, index // self.cols
+
+    def get_walls(self, index: int):
+        """
+        Returns the wall bits (a combination of TOP, RIGHT, BOTTOM and LEFT) of a cell.
+        """
+        return self.walls[index >> 1] >> ((index & 1) << 2) & ALL_WALLS
+
+    def set_walls(self, index: int, bits: int):
+        """
+        Replaces the wall bits of a single cell. The walls of the neighbors are left untouched.
+        """
+        shift = (index & 1) << 2
+        byte = self.walls[index >> 1]
+        self.walls[index >> 1] = (byte & ~(ALL_WALLS << shift) & 0xFF) | (bits << shift)
+        self.version += 1
+        if self.dirty_walls is not None:
+            self.dirty_walls.add(index)
+
+    def walls_changed(self):
+        """
+        Records that the walls were written to directly, e.g. a whole maze carved at once: bumps the
+        version and marks every cell dirty.
+        """
+        self.version += 1
+        self.mark_all_dirty()
+
+    def track_dirty(self):
+        """
+        Starts recording the cells that change, so that a renderer only draws them again every frame
+        instead of comparing the whole maze with the previous frame. Every cell is dirty at first.
+        """
+        if self.dirty_walls is None:
+            self.dirty_walls, self.dirty_states = set(), set()
+        self.all_dirty = True
+
+    def mark_all_dirty(self):
+        """
+        Marks every cell as changed, when the walls or states changed all at once.
+        """
+        if self.dirty_walls is not None:
+            self.all_dirty = True
+            self.dirty_walls.clear()
+            self.dirty_states.clear()
+
+    def take_dirty(self):
+        """
+        Returns the changes recorded since the last call, and starts recording again.
+
+        Returns:
+        - (all_dirty, walls, states) (Tuple[bool, Set[int], Set[int]]): Whether every cell may have
+          changed, else the cells whose walls and the cells whose states changed.
+        """
+        if self.dirty_walls is None:
+            raise RuntimeError("the changes of the maze are not tracked, call track_dirty first")
+        changes = (self.all_dirty, set(self.dirty_walls), set(self.dirty_states))
+        self.all_dirty = False
+        self.dirty_walls.clear()
+        self.dirty_states.clear()
+        return changes
+
+    def has_wall(self, index: int, wall: int):
+        return self.get_walls(index) & wall != 0
+
+    def remove_wall_between(self, a: int, b: int):
+        """
+        Removes the wall between two adjacent cells, from both sides.
+
+        Args:
+        - a (int): Index of the first cell.
+        - b (int): Index of the second cell, adjacent to the first one.
+        """
+
+        if b == a + 1:
+            wall_a, wall_b = RIGHT, LEFT
+        elif b == a - 1:
+            wall_a, wall_b = LEFT, RIGHT
+        elif b == a + self.cols:
+            wall_a, wall_b = BOTTOM, TOP
+        elif b == a - self.cols:
+            wall_a, wall_b = TOP, BOTTOM
+        else:
+            raise ValueError(f"cells {a} and {b} are not adjacent")
+        self.set_walls(a, self.get_walls(a) & ~wall_a)
+        self.set_walls(b, self.get_walls(b) & ~wall_b)
+
+    def open_neighbors(self, index: int):
+        """
+        Finds the indices of the neighbors reachable from a cell, i.e. the ones not separated from it
+        by a wall on either side.
+
+        Args:
+        - index (int): Index of the cell.
+
+        Returns:
+        - neighbors (List[int]): Indices of the reachable neighbors in the order top, right, bottom, left.
+        """
+
+        neighbors = []
+        cols = self.cols
+        walls = self.get_walls(index)
+        x = index % cols
+
+        # Check each direction (top, right, bottom, left), making sure the walls are open from both sides
+        if not walls & TOP and index >= cols and not self.get_walls(index - cols) & BOTTOM:
+            neighbors.append(index - cols)
+        if not walls & RIGHT and x < cols - 1 and not self.get_walls(index + 1) & LEFT:
+            neighbors.append(index + 1)
+        if not walls & BOTTOM and index + cols < self.size and not self.get_walls(index + cols) & TOP:
+            neighbors.append(index + cols)
+        if not walls & LEFT and x > 0 and not self.get_walls(index - 1) & RIGHT:
+            neighbors.append(index - 1)
+
+        return neighbors
+
+    def adjacency(self):
+        """
+        Returns the adjacency index of the maze, building it only if the walls changed since the last call.
+
+        Returns:
+        - adjacency (AdjacencyIndex): The index of the open neighbors of every cell.
+        """
+        if self._adjacency is None or self._adjacency.version != self.version:
+            self._adjacency = AdjacencyIndex(self)
+        return self._adjacency
+
+    def attach_adjacency(self, offsets, targets):
+        """
+        Uses an adjacency index built elsewhere for the current walls, e.g. one placed in shared memory
+        by another process, instead of building it again. It is replaced like any index once the walls change.
+
+        Args:
+        - offsets (array/memoryview): size + 1 unsigned 32-bit offsets into targets.
+        - targets (array/memoryview): The unsigned 32-bit neighbor indices of all cells, one after another.
+        """
+        if len(offsets) != self.size + 1:
+            raise ValueError(f"a {self.cols}x{self.rows} maze needs {self.size + 1} offsets, got {len(offsets)}")
+        self._adjacency = AdjacencyIndex.from_buffers(self.version, offsets, targets)
+
+    def reset(self):
+        """
+        Puts every wall back and clears the visited, solution and generated states.
+        """
+        self.walls[:] = b"\xff" * len(self.walls)
+        self.reset_search_state()
+        if self._generated is not None:
+            self._generated.clear()
+        self.seed = self.generator = None
+        self.walls_changed()
+
+    def set_unpacked_walls(self, walls):
+        """
+        Replaces all the walls with one byte of wall bits per cell, packing them two cells per byte.
+
+        Args:
+        - walls (bytes/bytearray): size bytes, the wall bits of every cell in index order.
+        """
+
+        # Every value is below 16, so shifting the odd cells as one big integer by 4 bits moves
+        # each of them to the high nibble of its own byte
+        packed = int.from_bytes(walls[0::2], "little") | int.from_bytes(walls[1::2], "little") << 4
+        self.walls[:] = packed.to_bytes(len(self.walls), "little")
+        self.walls_changed()
+
+    def reset_search_state(self):
+        """
+        Clears the visited and solution states of every cell.
+        """
+        if self._visited is not None:
+            self._visited.clear()
+        if self._solution is not None:
+            self._solution.clear()
+
+    def as_array(self):
+        """
+        Returns the packed walls as a NumPy uint8 array sharing memory with the maze.
+        """
+        import numpy as np
+        return np.frombuffer(self.walls, dtype = np.uint8)
+
+    def wall_grid(self):
+        """
+        Returns the walls unpacked to one byte of wall bits per cell, as a (rows, cols) NumPy uint8 array.
+        """
+        import numpy as np
+        packed = self.as_array()
+        walls = np.empty(2 * len(packed), dtype = np.uint8)
+        walls[0::2] = packed & 15
+        walls[1::2] = packed >> 4
+        return walls[:self.size].reshape(self.rows, self.cols)
+
+    @classmethod
+    def from_cells(cls, grid_cells, cols: int = default_cols, rows: int = default_rows):
+        """
+        Builds a packed maze from a list of Cell objects with `walls` dicts.
+
+        Args:
+        - grid_cells (List[Cell]): List of all cells in the maze grid.
+        - cols (int): Number of columns of the grid.
+        - rows (int): Number of rows of the grid.
+
+        Returns:
+        - maze (Maze): A new maze with the same walls and states as the cells.
+        """
+
+        maze = cls(cols, rows)
+        for index, cell in enumerate(grid_cells):
+            maze.set_walls(index, sum(bit for name, bit in WALL_BITS.items() if cell.walls[name]))
+            if cell.visited:
+                maze.visited.add(index)
+            if cell.is_solution:
+                maze.solution.add(index)
+            if cell.generated:
+                maze.generated.add(index)
+        return maze
+
+class AdjacencyIndex:
+    """
+    The open neighbors of every maze cell in compressed sparse row (CSR) form: the neighbors of
+    cell i are `targets[offsets[i]:offsets[i + 1]]`, in the order top, right, bottom, left.
+
+    The index is a snapshot of the walls when it was built; `Maze.adjacency` rebuilds it after
+    the walls change.
+
+    Attributes:
+    - version (int): The version of the maze the index was built from.
+    - offsets (array/memoryview): size + 1 offsets into targets.
+    - targets (array/memoryview): The neighbor indices of all cells, one after another.
+    """
+
+    def __init__(self, maze: Maze):
+        """
+        Builds the adjacency index of a maze.
+
+        Args:
+        - maze (Maze): The maze to index.
+        """
+
+        self.version = maze.version
+        self.offsets = array("I", [0])
+        self.targets = array("I")
+        for index in range(maze.size):
+            self.targets.extend(maze.open_neighbors(index))
+            self.offsets.append(len(self.targets))
+
+    @classmethod
+    def from_buffers(cls, version: int, offsets, targets):
+        """
+        Wraps existing offsets and targets without copying them.
+
+        Args:
+        - version (int): The version of the maze the index was built from.
+        - offsets (array/memoryview): size + 1 offsets into targets.
+        - targets (array/memoryview): The neighbor indices of all cells, one after another.
+
+        Returns:
+        - adjacency (AdjacencyIndex): The index.
+        """
+        index = cls.__new__(cls)
+        index.version = version
+        index.offsets = offsets
+        index.targets = targets
+        return index
+
+    def neighbors(self, index: int):
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    def degree(self, index: int):
+        return self.offsets[index + 1] - self.offsets[index]
+
+class WallsView(MutableMapping):
+    """
+    A dict-like view of the walls of one maze cell, so code written for `Cell.walls`
+    (e.g. `cell.walls['top'] = False`) reads and writes the packed maze directly.
+    """
+
+    def __init__(self, maze: Maze, index: int):
+        self.maze = maze
+        self.index = index
+
+    def __getitem__(self, name: str):
+        return self.maze.get_walls(self.index) & WALL_BITS[name] != 0
+
+    def __setitem__(self, name: str, value: bool):
+        walls = self.maze.get_walls(self.index)
+        if value:
+            self.maze.set_walls(self.index, walls | WALL_BITS[name])
+        else:
+            self.maze.set_walls(self.index, walls & ~WALL_BITS[name])
+
+    def __delitem__(self, name: str):
+        raise TypeError("maze walls can not be deleted")
+
+    def __iter__(self):
+        return iter(WALL_BITS)
+
+    def __len__(self):
+        return len(WALL_BITS)
+
+def as_maze(grid):
+    """
+    Returns the packed maze behind a grid: the maze itself, the maze a list of MazeCell views
+    belongs to, or a new Maze built from a list of plain Cell objects.
+
+    Args:
+    - grid (Maze/List[Cell]): The maze or its list of cells.
+
+    Returns:
+    - maze (Maze): The packed maze.
+    """
+
+    if isinstance(grid, Maze):
+        return grid
+    maze = getattr(grid[0], "maze", None) if len(grid) > 0 else None
+    if maze is not None and maze.size == len(grid):
+        return maze
+    return Maze.from_cells(grid)
@@ -0,0 +1,100 @@
+import mmap
+import struct
+from maze import Maze
+
+# Header of a maze file: magic, format version, flags, cols, rows, seed (unsigned 64 bits), generator name.
+# The packed walls (two cells per byte, as in Maze.walls) follow the header, then the traversal
+# costs (one byte per cell, as in Maze.costs) if the maze has some.
+MAGIC = b"MAZE"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIIQ16s")
+
+# Flags of the header
+HAS_SEED = 1
+HAS_COSTS = 2
+
+def save_maze(maze: Maze, path: str):
+    """
+    Save a maze to a file: a header with the size, seed and generator of the maze, followed by its packed walls.
+    The seed must be an integer from 0 to 2**64 - 1, it is checked before the file is opened.
+
+    Args:
+    - maze (Maze): The maze to save.
+    - path (str): The path of the file to write.
+    """
+
+    seed = maze.seed
+    if seed is not None and not (isinstance(seed, int) and 0 <= seed < 1 << 64):
+        raise ValueError(f"seed {seed!r} can not be saved, expected an integer from 0 to 2**64 - 1")
+    flags = (HAS_SEED if seed is not None else 0) | (HAS_COSTS if maze.has_costs else 0)
+    generator = (maze.generator or "").encode("ascii")
+    if len(generator) > 16:
+        raise ValueError(f"generator name {maze.generator!r} is longer than 16 characters")
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, maze.cols, maze.rows, seed if seed is not None else 0, generator))
+        file.write(maze.walls)
+        if maze.has_costs:
+            file.write(maze.costs)
+
+def read_header(data, path: str = "maze file"):
+    """
+    Parse and check the header of a maze file.
+
+    Args:
+    - data (bytes/mmap): The content of the file, at least the header.
+    - path (str): The path of the file, for the error messages.
+
+    Returns:
+    - (cols, rows, seed, generator, flags) (Tuple[int, int, int, str, int]): The size of the maze,
+      its seed (None if unknown), the name of its generator (None if unknown) and the header flags.
+    """
+
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a maze file")
+    magic, version, flags, cols, rows, seed, generator = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a maze file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} uses the unsupported format version {version}")
+    costs = cols * rows if flags & HAS_COSTS else 0
+    if len(data) < HEADER.size + ((cols * rows + 1) >> 1) + costs:
+        raise ValueError(f"{path} is truncated")
+
+    generator = generator.rstrip(b"\0").decode("ascii") or None
+    return cols, rows, seed if flags & HAS_SEED else None, generator, flags
+
+def load_maze(path: str, writable: bool = False):
+    """
+    Open a maze file through `mmap`, without reading or copying the walls.
+
+    The walls of the returned maze are a view of the mapped file, so opening even a huge maze is
+    instant, pages are only read from the disk when the solvers touch them, and processes opening
+    the same file share the same physical memory.
+
+    Args:
+    - path (str): The path of the maze file.
+    - writable (bool): Map the file for writing, so wall changes are written back to the file.
+      The walls are read-only otherwise.
+
+    Returns:
+    - maze (Maze): The maze, with its seed, generator and costs set from the file.
+    """
+
+    with open(path, "r+b" if writable else "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+
+    try:
+        cols, rows, seed, generator, flags = read_header(mapped, path)
+    except ValueError:
+        mapped.close()
+        raise
+    # The view keeps the mapping open for as long as the maze uses it
+    walls_end = HEADER.size + ((cols * rows + 1) >> 1)
+    walls = memoryview(mapped)[HEADER.size:walls_end]
+
+    maze = Maze(cols, rows, walls)
+    if flags & HAS_COSTS:
+        maze.costs = memoryview(mapped)[walls_end:walls_end + cols * rows]
+    maze.seed, maze.generator = seed, generator
+    return maze
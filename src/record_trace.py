@@ -0,0 +1,30 @@
+import argparse
+import sys
+from config import MAZE_FILE, TRACE_FILE
+from mazefile import load_maze
+from engine.registry import SOLVERS, get_solver
+from engine.trace import trace_search, write_trace
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Solve a saved maze at full speed and record the search as a trace "
+                                                   "the visualizer can replay (R key).")
+    parser.add_argument("--maze", default = MAZE_FILE, help = f"maze file saved with the S key or save_maze (default: {MAZE_FILE})")
+    parser.add_argument("--algorithm", default = "BFS", help = "one of {} (default: BFS)".format(", ".join(SOLVERS)))
+    parser.add_argument("--start", type = int, default = 0, help = "index of the start cell (default: 0)")
+    parser.add_argument("--destination", type = int, help = "index of the destination cell (default: the last cell)")
+    parser.add_argument("--output", default = TRACE_FILE, help = f"trace file to write (default: {TRACE_FILE})")
+    args = parser.parse_args(argv)
+
+    try:
+        solver = get_solver(args.algorithm)
+    except KeyError as error:
+        parser.error(error.args[0])
+    algorithm = next(name for name, function in SOLVERS.items() if function is solver)
+    maze = load_maze(args.maze)
+
+    count = write_trace(trace_search(solver, maze, args.start, args.destination), args.output, maze, algorithm)
+    print(f"{count} events written to {args.output}", file = sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
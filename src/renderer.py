@@ -0,0 +1,220 @@
+import pygame
+from config import *
+from maze import Maze, TOP, RIGHT, BOTTOM, LEFT
+
+# Wall lines are 5 pixels wide and centered on the cell borders, so they spill over this many
+# pixels into the neighboring cells
+WALL_OVERLAP = 3
+
+# Overlay kinds drawn on top of the cells
+MARKER, STACK = 1, 2
+
+class MazeRenderer:
+    """
+    Incremental renderer of a packed maze. The walls are cached in an offscreen layer and the cell
+    colors in a second one; every frame only the cells whose walls, state or overlay changed since
+    the previous frame are composed again and pushed to the screen with `pygame.display.update`.
+
+    The changed cells are recorded by the maze itself (`Maze.track_dirty`), so the work of a frame
+    only depends on what changed, not on the size of the maze.
+
+    Attributes:
+    - maze (Maze): The maze to draw.
+    - origin (Tuple[int, int]): Screen position of the top left corner of the first cell.
+    - tile_size (int): Size of a cell in pixels.
+    """
+
+    def __init__(self, maze: Maze, origin = (MAZE_OFFSET, 2), tile_size: int = TILE_SIZE):
+        """
+        Initializes the renderer. Nothing is drawn until the first call to `render`.
+
+        Args:
+        - maze (Maze): The maze to draw.
+        - origin (Tuple[int, int]): Screen position of the top left corner of the first cell.
+        - tile_size (int): Size of a cell in pixels.
+        """
+
+        self.maze = maze
+        self.origin = origin
+        self.tile_size = tile_size
+
+        # Both layers have a margin for the walls of the border cells
+        size = (maze.cols * tile_size + 2 * WALL_OVERLAP, maze.rows * tile_size + 2 * WALL_OVERLAP)
+        self.state_layer = pygame.Surface(size)
+        self.wall_layer = pygame.Surface(size)
+        self.wall_layer.set_colorkey(pygame.Color(BACKGROUND_COLOR))
+
+        # The maze records its changed cells from now on, every cell is drawn by the first frame
+        maze.track_dirty()
+        self.markers = []
+        self.stack = []
+        self.overlay = {}
+
+    def cell_rect(self, index: int):
+        """
+        Returns the rectangle of a cell in layer coordinates.
+        """
+        x, y = self.maze.coords(index)
+        return pygame.Rect(x * self.tile_size + WALL_OVERLAP, y * self.tile_size + WALL_OVERLAP, self.tile_size, self.tile_size)
+
+    def cell_at(self, pos):
+        """
+        Returns the index of the cell under a screen position, or None outside of the maze.
+        """
+        x = (pos[0] - self.origin[0]) // self.tile_size
+        y = (pos[1] - self.origin[1]) // self.tile_size
+        if 0 <= x < self.maze.cols and 0 <= y < self.maze.rows:
+            return self.maze.index(x, y)
+        return None
+
+    def cell_color(self, index: int):
+        """
+        Returns the fill color of a cell, the same ones as `Cell.draw`.
+        """
+        maze = self.maze
+        if index not in maze.generated:
+            return BACKGROUND_COLOR
+        if index not in maze.visited:
+            return CELL_GENERATED_COLOR
+        if index not in maze.solution:
+            return CELL_VISITED_COLOR
+        return CELL_SOLUTION_COLOR
+
+    def draw_walls(self, index: int):
+        """
+        Draws the walls of a cell on the wall layer.
+        """
+        rect = self.cell_rect(index)
+        walls = self.maze.get_walls(index)
+        if walls & TOP:
+            pygame.draw.line(self.wall_layer, WALL_COLOR, rect.topleft, rect.topright, 5)
+        if walls & RIGHT:
+            pygame.draw.line(self.wall_layer, WALL_COLOR, rect.topright, rect.bottomright, 5)
+        if walls & BOTTOM:
+            pygame.draw.line(self.wall_layer, WALL_COLOR, rect.bottomright, rect.bottomleft, 5)
+        if walls & LEFT:
+            pygame.draw.line(self.wall_layer, WALL_COLOR, rect.bottomleft, rect.topleft, 5)
+
+    def surrounding_cells(self, index: int):
+        """
+        Returns the indices of a cell and its (up to 8) neighbors, whose walls may overlap it.
+        """
+        cols, rows = self.maze.cols, self.maze.rows
+        x, y = self.maze.coords(index)
+        return [nx + ny * cols for ny in range(max(y - 1, 0), min(y + 2, rows))
+                for nx in range(max(x - 1, 0), min(x + 2, cols))]
+
+    def redraw_layers(self):
+        """
+        Redraws both layers entirely.
+        """
+        self.state_layer.fill(pygame.Color(BACKGROUND_COLOR))
+        self.wall_layer.fill(pygame.Color(BACKGROUND_COLOR))
+        for index in range(self.maze.size):
+            color = self.cell_color(index)
+            if color != BACKGROUND_COLOR:
+                self.state_layer.fill(pygame.Color(color), self.cell_rect(index))
+            self.draw_walls(index)
+
+    def collect_changes(self, walls, states, markers, stack):
+        """
+        Updates the layers for what changed since the last frame.
+
+        Args:
+        - walls (Set[int]): The cells whose walls changed.
+        - states (Set[int]): The cells whose generated, visited or solution state changed.
+        - markers (List[int]): The new markers, None to keep them.
+        - stack (List[int]): The new generation stack, None to keep it.
+
+        Returns:
+        - dirty (Set[int]): The cells whose screen area has to be composed again.
+        """
+
+        dirty = set()
+
+        # Cells whose walls changed: redraw them and their neighbors on the wall layer
+        for index in walls:
+            area = self.cell_rect(index).inflate(2 * WALL_OVERLAP, 2 * WALL_OVERLAP)
+            self.wall_layer.set_clip(area)
+            self.wall_layer.fill(pygame.Color(BACKGROUND_COLOR), area)
+            for neighbor in self.surrounding_cells(index):
+                self.draw_walls(neighbor)
+            dirty.update(self.surrounding_cells(index))
+        self.wall_layer.set_clip(None)
+
+        # Cells whose generated, visited or solution state changed: refill them on the state layer
+        for index in states:
+            self.state_layer.fill(pygame.Color(self.cell_color(index)), self.cell_rect(index))
+        dirty.update(states)
+
+        # Cells whose overlay (current/destination markers, generation stack) changed
+        if markers is not None:
+            self.markers = list(markers)
+        if stack is not None:
+            self.stack = list(stack)
+        overlay = {index: STACK for index in self.stack}
+        overlay.update((index, MARKER) for index in self.markers)
+        dirty.update(index for index in self.overlay if index not in overlay)
+        dirty.update(index for index, kind in overlay.items() if self.overlay.get(index) != kind)
+        self.overlay = overlay
+
+        return dirty
+
+    def compose(self, sc: pygame.Surface, area: pygame.Rect, cells = None):
+        """
+        Copies a region of both layers and the overlays to the screen.
+
+        Args:
+        - sc (pygame.Surface): The screen surface.
+        - area (pygame.Rect): The region in layer coordinates.
+        - cells (List[int], optional): The cells overlapping the region, all of them when omitted.
+
+        Returns:
+        - rect (pygame.Rect): The region in screen coordinates.
+        """
+
+        screen_pos = (area.x + self.origin[0] - WALL_OVERLAP, area.y + self.origin[1] - WALL_OVERLAP)
+        sc.blit(self.state_layer, screen_pos, area)
+        sc.blit(self.wall_layer, screen_pos, area)
+        rect = pygame.Rect(screen_pos, area.size)
+
+        # Overlays are drawn on top of the walls, clipped to the composed region
+        sc.set_clip(rect)
+        for index in (self.overlay if cells is None else cells):
+            kind = self.overlay.get(index)
+            if kind is None:
+                continue
+            cell = self.cell_rect(index).move(self.origin[0] - WALL_OVERLAP, self.origin[1] - WALL_OVERLAP)
+            if not cell.colliderect(rect):
+                continue
+            if kind == MARKER:
+                pygame.draw.rect(sc, pygame.Color(START_END_CELL_COLOR), (cell.x, cell.y, self.tile_size - 2, self.tile_size - 2))
+            else:
+                pygame.draw.rect(sc, CELL_GENERATED_COLOR, (cell.x + 3, cell.y + 2, self.tile_size - 4, self.tile_size - 4), border_radius = 4)
+        sc.set_clip(None)
+        return rect
+
+    def render(self, sc: pygame.Surface, markers = None, stack = None, full: bool = False):
+        """
+        Draws what changed since the last frame on the screen.
+
+        Args:
+        - sc (pygame.Surface): The screen surface.
+        - markers (List[int], optional): Cells highlighted as current/destination cells. The previous
+          markers are kept when omitted.
+        - stack (List[int], optional): Cells of the generation stack. The previous stack is kept when omitted.
+        - full (bool): Redraw the whole maze, e.g. after the screen has been cleared.
+
+        Returns:
+        - rects (List[pygame.Rect]): The screen regions that changed, to pass to `pygame.display.update`.
+        """
+
+        everything, walls, states = self.maze.take_dirty()
+        if full or everything:
+            self.redraw_layers()
+            self.collect_changes((), (), markers, stack)
+            return [self.compose(sc, self.state_layer.get_rect())]
+
+        dirty = self.collect_changes(walls, states, markers, stack)
+        return [self.compose(sc, self.cell_rect(index).inflate(2 * WALL_OVERLAP, 2 * WALL_OVERLAP), self.surrounding_cells(index))
+                for index in dirty]
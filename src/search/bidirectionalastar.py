@@ -0,0 +1,39 @@
+import pygame
+from typing import List
+from cell import Cell
+from renderer import MazeRenderer
+from engine.instrument import SearchProfile
+from engine.cache import SolutionCache
+from engine.bidirectionalastar import find_path_bidirectional_A_star
+from utils import visualize_search
+
+def solve_maze_bidirectional_A_star(grid_cells: List[Cell], sc: pygame.Surface, renderer: MazeRenderer = None,
+                                   start: int = 0, destination: int = None, profile: SearchProfile = None,
+                                   cache: SolutionCache = None):
+    """
+    Solve the maze using bidirectional A*, which searches from both the start and destination cells
+    with Manhattan potentials until no better connection is possible, visualizing the search process
+    on the screen. A cell expanded by both sides is only marked and counted once.
+
+    The search itself is done by `find_path_bidirectional_A_star`; this function only marks and redraws the
+    expanded cells through the step callback and draws the solution path once it is found.
+
+    Args:
+    - grid_cells (List[Cell]): A list of all the cells in the maze.
+    - sc (pygame.Surface): The pygame screen surface used for drawing the maze and visualizing the search
+      process.
+    - renderer (MazeRenderer, optional): Incremental renderer of the maze behind grid_cells; only the changed
+      cells are redrawn with it. Every cell is redrawn on every step without it.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given;
+      the drawing of every step is counted in its step_time.
+    - cache (SolutionCache, optional): The solutions of the previous queries; a query already solved on the
+      same walls is shown at once instead of being searched again.
+
+    Returns:
+    - path (List[Cell]): the path from the start cell to the destination cell else None
+    - visited_cells_count (int): The total number of cells visited during the search.
+    """
+    return visualize_search(find_path_bidirectional_A_star, "Bidirectional A*", grid_cells, sc, "RUNNING: Bidirectional A Star", delay = 50, renderer = renderer,
+                            start = start, destination = destination, profile = profile, cache = cache)
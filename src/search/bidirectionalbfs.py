@@ -1,116 +1,38 @@
 import pygame
-from config import *
-from cell import Cell
 from typing import List
-from utils import draw_text_of_running_alg, reconstruct_bidirectional_path, draw_button
-
-def solve_maze_bidirectional_BFS(grid_cells: List[Cell], sc: pygame.Surface):
+from cell import Cell
+from renderer import MazeRenderer
+from engine.instrument import SearchProfile
+from engine.cache import SolutionCache
+from engine.bidirectionalbfs import find_path_bidirectional_BFS
+from utils import visualize_search
+
+def solve_maze_bidirectional_BFS(grid_cells: List[Cell], sc: pygame.Surface, renderer: MazeRenderer = None,
+                                 start: int = 0, destination: int = None, profile: SearchProfile = None,
+                                 cache: SolutionCache = None):
     """
-    Solve the maze using the bidirectional BFS search algorithm, which simultaneously searches 
-    from both the start and destination cells. If the searches meet, the path is reconstructed.
+    Solve the maze using the bidirectional BFS search algorithm, which simultaneously searches
+    from both the start and destination cells, visualizing the search process on the screen.
+
+    The search itself is done by `find_path_bidirectional_BFS`; this function only marks and redraws the
+    expanded cells through the step callback and draws the solution path once it is found.
 
     Args:
-    - grid_cells (List[Cell]): List of all grid cells in the maze.
-    - sc (pygame.Surface): The screen surface for drawing the maze.
+    - grid_cells (List[Cell]): A list of all the cells in the maze.
+    - sc (pygame.Surface): The pygame screen surface used for drawing the maze and visualizing the search
+      process.
+    - renderer (MazeRenderer, optional): Incremental renderer of the maze behind grid_cells; only the changed
+      cells are redrawn with it. Every cell is redrawn on every step without it.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given;
+      the drawing of every step is counted in its step_time.
+    - cache (SolutionCache, optional): The solutions of the previous queries; a query already solved on the
+      same walls is shown at once instead of being searched again.
 
     Returns:
-    - full_path (List[Cell]): The reconstructed path from the start to the destination once the 
-      searches meet (if no path is found, return None).
+    - path (List[Cell]): the path from the start cell to the destination cell else None
+    - visited_cells_count (int): The total number of cells visited during the search.
     """
-    
-    # Define the start and destination cells
-    start_cell = grid_cells[0]
-    destination_cell = grid_cells[-1]
-
-    # Two sets, two queues and two paent dicts to track the search from the start and the end and path visualization
-    start_queue = []
-    end_queue = []
-    start_visited = set()
-    end_visited = set()
-    start_parent = {}
-    end_parent = {}
-
-    # Counter to track number of visited cells
-    visited_cells_count = 0
-
-    # Initialize queues and visited sets for both ends
-    start_queue.append(start_cell)
-    start_visited.add(start_cell)
-    start_parent[start_cell] = None
-
-    end_queue.append(destination_cell)
-    end_visited.add(destination_cell)
-    end_parent[destination_cell] = None
-
-    # Main Bidirectional Search loop
-    while start_queue and end_queue:
-
-        # Process BFS from start side
-        if start_queue:
-            current_start_cell = start_queue.pop(0)
-            current_start_cell.visited = True
-            visited_cells_count += 1
-
-            # Delay for visualization purposes
-            pygame.time.delay(40)
-            pygame.display.flip()
- 
-            # Redraw the entire maze
-            for cell in grid_cells:
-                cell.draw(sc)
-            current_start_cell.draw(sc)
-
-            # Check neighbors and continue exploring
-            neighbors_start = current_start_cell.check_neighbors_for_search(grid_cells)
-            for neighbor in neighbors_start:
-                if neighbor not in start_visited:
-                    start_queue.append(neighbor)
-                    start_visited.add(neighbor)
-                    start_parent[neighbor] = current_start_cell
-
-                # Check if the search meets the end side
-                if neighbor in end_visited:
-                    full_path = reconstruct_bidirectional_path(sc, start_parent, end_parent, neighbor, start_cell, destination_cell)
-                    return full_path, visited_cells_count
-
-        # Process BFS from the end side and continue exploring
-        if end_queue:
-            current_end_cell = end_queue.pop(0)
-            current_end_cell.visited = True
-            visited_cells_count += 1
-
-            # Delay for visualization purposes
-            pygame.time.delay(60)
-            pygame.display.flip()
-
-            # Redraw the entire maze
-            for cell in grid_cells:
-                cell.draw(sc)
-            current_end_cell.draw(sc)
-
-            # Check neighbors
-            neighbors_end = current_end_cell.check_neighbors_for_search(grid_cells)
-            for neighbor in neighbors_end:
-                if neighbor not in end_visited:
-                    end_queue.append(neighbor)
-                    end_visited.add(neighbor)
-                    end_parent[neighbor] = current_end_cell
-
-                # Check if the search meets the start side
-                if neighbor in start_visited:
-                    full_path = reconstruct_bidirectional_path(sc, start_parent, end_parent, neighbor, start_cell, destination_cell)
-                    return full_path, visited_cells_count
-        
-        # Display the current state of the algorithm
-        draw_text_of_running_alg(sc, "RUNNING: DFS", FONT, 17, 20, 200, "#FFFFFF")
-        draw_text_of_running_alg(sc, "CELLS EXPLORED: " + str(visited_cells_count), FONT, 17, 20, 230, "#FFFFFF")
-
-        # Display buttons
-        draw_button(sc, "GENERATE MAZE", 20, 300, BUTTON_COLOR)
-        draw_button(sc, "BFS", 20, 400, BUTTON_COLOR)
-        draw_button(sc, "DFS", 20, 350, BUTTON_COLOR)
-        draw_button(sc, "BIDIRECTIONAL BFS", 20, 450, BUTTON_COLOR)
-        draw_button(sc, "A STAR", 20, 500, BUTTON_COLOR)
-        draw_button(sc, "GBFS", 20, 550, BUTTON_COLOR)
-    
-    return None, visited_cells_count
\ No newline at end of file
+    return visualize_search(find_path_bidirectional_BFS, "Bidirectional BFS", grid_cells, sc, "RUNNING: Bidirectional BFS", delay = 50, renderer = renderer,
+                            start = start, destination = destination, profile = profile, cache = cache)
@@ -1,87 +1,38 @@
 import pygame
-from cell import Cell
 from typing import List
-from config import *
-from utils import draw_text_of_running_alg, reconstruct_path, draw_button
-
-def solve_maze_DFS(grid_cells: List[Cell], sc: pygame.Surface):
+from cell import Cell
+from renderer import MazeRenderer
+from engine.instrument import SearchProfile
+from engine.cache import SolutionCache
+from engine.dfs import find_path_DFS
+from utils import visualize_search
+
+def solve_maze_DFS(grid_cells: List[Cell], sc: pygame.Surface, renderer: MazeRenderer = None,
+                   start: int = 0, destination: int = None, profile: SearchProfile = None,
+                   cache: SolutionCache = None):
     """
     Solve the maze using Depth-First Search (DFS), which explores as far as possible
-    along each branch before backtracking. DFS uses a stack to manage the traversal 
-    and explores deeper into the maze with each step.
+    along each branch before backtracking, visualizing the search process on the screen.
+
+    The search itself is done by `find_path_DFS`; this function only marks and redraws the
+    expanded cells through the step callback and draws the solution path once it is found.
 
     Args:
-    - grid_cells (list): A list of all cells in the maze, where each cell is an object 
-      with properties like coordinates and neighbors, and methods for drawing and searching.
-    - sc (pygame.Surface): The pygame screen surface used for drawing and visualizing 
-      the maze and DFS traversal process.
+    - grid_cells (List[Cell]): A list of all the cells in the maze.
+    - sc (pygame.Surface): The pygame screen surface used for drawing the maze and visualizing the search
+      process.
+    - renderer (MazeRenderer, optional): Incremental renderer of the maze behind grid_cells; only the changed
+      cells are redrawn with it. Every cell is redrawn on every step without it.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given;
+      the drawing of every step is counted in its step_time.
+    - cache (SolutionCache, optional): The solutions of the previous queries; a query already solved on the
+      same walls is shown at once instead of being searched again.
 
     Returns:
-    - path (list or None): A list of cells representing the solution path from the 
-      start to the destination if found, otherwise returns None.
+    - path (List[Cell]): the path from the start cell to the destination cell else None
     - visited_cells_count (int): The total number of cells visited during the search.
     """
-
-    # Define the start and destination cells
-    start_cell = grid_cells[0]
-    destination_cell = grid_cells[-1]
-
-    # Initialize needed structures for BFS and path reconstucting later
-    stack = []  
-    visited = set()  
-    parent = {}
-    stack.append(start_cell)
-    visited.add(start_cell)
-    parent[start_cell] = None
-
-    # Inintialize visited cell counter
-    visited_cells_count = 0
-
-    # Main DFS loop
-    while stack:
-        # Pop the top cell from the stack and mark it as visited
-        current_cell = stack.pop()
-        current_cell.visited = True
-        visited_cells_count += 1
-
-        # Delay for visualization purposes
-        pygame.time.delay(60) 
-        pygame.display.flip()
-
-        # Redraw the entire maze on each iteration to keep all cells visible
-        for cell in grid_cells:
-            cell.draw(sc)
-        
-        # Display the current state of the algorithm
-        draw_text_of_running_alg(sc, "RUNNING: DFS", FONT, 17, 20, 200, "#FFFFFF")
-        draw_text_of_running_alg(sc, "CELLS EXPLORED: " + str(visited_cells_count), FONT, 17, 20, 230, "#FFFFFF")
-
-        # Display buttons
-        draw_button(sc, "GENERATE MAZE", 20, 300, BUTTON_COLOR)
-        draw_button(sc, "BFS", 20, 400, BUTTON_COLOR)
-        draw_button(sc, "DFS", 20, 350, BUTTON_COLOR)
-        draw_button(sc, "BIDIRECTIONAL BFS", 20, 450, BUTTON_COLOR)
-        draw_button(sc, "A STAR", 20, 500, BUTTON_COLOR)
-        draw_button(sc, "GBFS", 20, 550, BUTTON_COLOR)
-
-        # Draw the visited cell
-        current_cell.draw(sc)
-
-        # Check if the current cell is the destination
-        if current_cell == destination_cell:
-            # If destination is reached, reconstruct and return the path
-            path = reconstruct_path(sc, parent, start_cell, destination_cell)
-            return path, visited_cells_count
-
-        # Check neighbors and explore deeper
-        neighbors = current_cell.check_neighbors_for_search(grid_cells)
-        for neighbor in neighbors:
-            if neighbor not in visited:
-                # Push the neighbor onto the stack
-                stack.append(neighbor)
-                # Mark the neighbor as visited
-                visited.add(neighbor)
-                # Set the current cell as the parent of the neighbor
-                parent[neighbor] = current_cell
-    
-    return None, visited_cells_count
+    return visualize_search(find_path_DFS, "DFS", grid_cells, sc, "RUNNING: DFS", delay = 60, renderer = renderer,
+                            start = start, destination = destination, profile = profile, cache = cache)
@@ -1,10 +1,17 @@
 import pygame
-from random import choice
+import random
+import time
+from array import array
+from functools import lru_cache
 from config import *
-from typing import List, Dict
+from typing import List
 from cell import Cell
+from renderer import MazeRenderer
+from engine.instrument import SearchProfile
+from engine.cache import SolutionCache
 
-def generate_maze(grid_cells: List[Cell], sc: pygame.Surface, current_cell: Cell, destination_cell: Cell, stack: list):
+def generate_maze(grid_cells: List[Cell], sc: pygame.Surface, current_cell: Cell, destination_cell: Cell, stack: list, rng: random.Random = None,
+                  profile: SearchProfile = None):
     """
     Generate the maze using recursive backtracking algorithm.
     
@@ -14,6 +21,12 @@ def generate_maze(grid_cells: List[Cell], sc: pygame.Surface, current_cell: Cell
     - current_cell (Cell): The current cell being processed.
     - destination_cell (Cell): The final destination cell in the maze.
     - stack (List[Cell]): Stack of visited cells.
+    - rng (random.Random, optional): Random generator used to pick the next cell, e.g. a seeded one
+      to generate the same maze again. The global random generator is used when omitted.
+    - profile (SearchProfile, optional): Accumulates counters and timings over the calls when given:
+      every call is an expanded cell, the stack is the frontier and drawing counts as step time.
+
+    When `sc` is None nothing is drawn, e.g. when the maze is drawn by a MazeRenderer.
 
     Returns:
     - current_cell (Cell): Updated current cell.
@@ -21,25 +34,39 @@ def generate_maze(grid_cells: List[Cell], sc: pygame.Surface, current_cell: Cell
     - maze_complete (bool): Boolean flag indicating whether the maze generation is complete.
     """
     
-    # Draw each cell in the grid
-    for cell in grid_cells:
-        cell.draw(sc)
-    
-    # Mark the current cell as generated and draw it
+    # Mark the current cell as generated
     current_cell.generated = True
-    current_cell.draw_current_cell()
-    destination_cell.draw_current_cell()
-    
-    # Visualize the stack (the path that is being carved out)
-    for i, cell in enumerate(stack):
-        pygame.draw.rect(sc, CELL_GENERATED_COLOR, (cell.x * TILE_SIZE + MAZE_OFFSET + 3, cell.y * TILE_SIZE + 4, TILE_SIZE - 4, TILE_SIZE - 4))
+    if profile is not None:
+        profile.nodes_expanded += 1
+        started = time.perf_counter()
+
+    if sc is not None:
+        # Draw each cell in the grid and the current cell
+        for cell in grid_cells:
+            cell.draw(sc)
+        current_cell.draw_current_cell(sc)
+        destination_cell.draw_current_cell(sc)
+
+        # Visualize the stack (the path that is being carved out)
+        for i, cell in enumerate(stack):
+            pygame.draw.rect(sc, CELL_GENERATED_COLOR, (cell.x * TILE_SIZE + MAZE_OFFSET + 3, cell.y * TILE_SIZE + 4, TILE_SIZE - 4, TILE_SIZE - 4))
+
+    if profile is not None:
+        profile.step_time += time.perf_counter() - started
+        started = time.perf_counter()
 
     # Check for available neighbors to continue generating the maze
     neighbors = current_cell.check_neighbors_for_maze_gen(grid_cells)
-    
+
+    if profile is not None:
+        profile.neighbor_time += time.perf_counter() - started
+        if neighbors:
+            profile.nodes_enqueued += 1
+            profile.peak_frontier = max(profile.peak_frontier, len(stack) + 1)
+
     if neighbors:
         # Randomly select a neighbor to continue the maze path and mark it as generated
-        next_cell = choice(neighbors)
+        next_cell = (rng or random).choice(neighbors)
         next_cell.generated = True
         # Push current cell to the stack for backtracking
         stack.append(current_cell)
@@ -68,12 +95,16 @@ def reset_maze(grid_cells: List[Cell]):
     - maze_complete: Boolean flag indicating the maze generation is not complete.
     - maze_generating: Boolean flag indicating maze generation is in progress.
     """
-    # Reset all cells to their initial state
-    for cell in grid_cells:
-        cell.generated = False
-        cell.visited = False
-        cell.is_solution = False
-        cell.walls = {"top": True, "right": True, "bottom": True, "left": True}
+    # Reset all cells to their initial state, at once when they are views of a packed maze
+    maze = backing_maze(grid_cells)
+    if maze is not None:
+        maze.reset()
+    else:
+        for cell in grid_cells:
+            cell.generated = False
+            cell.visited = False
+            cell.is_solution = False
+            cell.walls = {"top": True, "right": True, "bottom": True, "left": True}
 
     # Reset the data structures and flags
     stack = []
@@ -100,8 +131,8 @@ def draw_maze(grid_cells: List[Cell], sc: pygame.Surface, stack: list, current_c
         cell.draw(sc)  
 
     # Draw the current cell and the destination cell
-    current_cell.draw_current_cell()
-    destination_cell.draw_current_cell()
+    current_cell.draw_current_cell(sc)
+    destination_cell.draw_current_cell(sc)
     
     # Visualize the path (stack) as it gets carved through the maze
     for i, cell in enumerate(stack):
@@ -115,11 +146,24 @@ def reset_cells_visited_state(grid_cells: List[Cell]):
     - grid_cells (List[Cell]): List of all cells in the maze grid.
     """
     
-    # Reset the visited and solution state for each cell
+    # Reset the visited and solution state for each cell, at once when they are views of a packed maze
+    maze = backing_maze(grid_cells)
+    if maze is not None:
+        maze.reset_search_state()
+        return
     for cell in grid_cells:
         cell.visited = False
         cell.is_solution = False
 
+def backing_maze(grid_cells: List[Cell]):
+    """
+    Returns the packed maze whose cells are all in grid_cells, or None for plain Cell objects.
+    """
+    maze = getattr(grid_cells[0], "maze", None) if len(grid_cells) > 0 else None
+    if maze is not None and maze.size == len(grid_cells):
+        return maze
+    return None
+
 def remove_walls(current: Cell, next: Cell):
     """
     Remove walls between the current cell and the next cell to create a path.
@@ -153,109 +197,240 @@ def remove_walls(current: Cell, next: Cell):
         current.walls['bottom'] = False
         next.walls['top'] = False
 
-def reconstruct_path(sc: pygame.Surface, parent: Dict[Cell, Cell], start_cell: Cell, destination_cell: Cell):
+def make_search_visualizer(grid_cells: List[Cell], sc: pygame.Surface, running_txt: str, delay: int = 60, renderer: MazeRenderer = None):
     """
-    Reconstruct the path from the start cell to the destination cell using the parent dictionary.
+    Build the step callback that visualizes a headless search from the `engine` package.
 
-    This function backtracks from the destination cell to the start cell using the `parent` dictionary, 
-    which stores the predecessor of each cell. It marks the cells along the path as part of the solution 
-    and updates the visual representation of the maze in pygame as the path is being reconstructed.
+    Every call marks the expanded cell as visited, redraws the maze, the state of the algorithm and
+    the buttons, then waits for `delay` milliseconds so the search can be followed on screen.
+    With a renderer, only the changed cells and the cell counter are redrawn and updated on the screen.
 
     Args:
-    - sc (pygame.Surface): The pygame screen surface used to visualize the path.
-    - parent (Dict[Cell, Cell]): A dictionary where the keys are cells, and values are the parent cells from which 
-      they were reached. Used to backtrack and find the solution path.
-    - start_cell (Cell): The initial cell in the maze.
-    - destination_cell (Cell): The target cell in the maze.
+    - grid_cells (List[Cell]): List of all cells in the maze grid.
+    - sc (pygame.Surface): The pygame screen surface used for drawing.
+    - running_txt (str): The label of the running algorithm shown on the screen.
+    - delay (int): Delay in milliseconds after every expanded cell.
+    - renderer (MazeRenderer, optional): The incremental renderer of the maze behind grid_cells.
 
     Returns:
-    - path (List[Cell]): A list of cells representing the solution path from start to destination.
+    - on_step (Callable[[int], None]): Callback to pass as `on_step` to the search engine.
     """
 
-    # Initialize an empty list to store the path
-    path = []
-    # Start the backtracking from the destination cell
-    current_cell = destination_cell
-
-    # Backtrack from destination to start using the parent dictionary
-    while current_cell is not None:
-        # Mark the cell as part of the solution path
-        current_cell.is_solution = True
-        # Add the current cell to the path list
-        path.append(current_cell)
-        # Redraw the cell
-        current_cell.draw(sc)
+    # Counter to track number of visited cells
+    visited_cells_count = 0
+
+    def on_step(index: int):
+        nonlocal visited_cells_count
+        current_cell = grid_cells[index]
+        current_cell.visited = True
+        visited_cells_count += 1
+
+        if renderer is not None:
+            # Only push the changed cells and the counter to the screen
+            rects = renderer.render(sc)
+            rects.append(draw_text_of_running_alg(sc, running_txt, FONT, 17, 20, 200, "#FFFFFF"))
+            rects.append(draw_text_of_running_alg(sc, "CELLS EXPLORED: " + str(visited_cells_count), FONT, 17, 20, 230, "#FFFFFF"))
+            pygame.display.update(rects)
+            pygame.time.delay(delay)
+            return
+
+        # Delay for visualization purposes
+        pygame.time.delay(delay)
         pygame.display.flip()
-        # Move to the previous cell
-        current_cell = parent[current_cell]
-    
-    # Reverse the path since we built it from the destination to start
-    path.reverse()
-    return path
 
-def reconstruct_bidirectional_path(sc: pygame.Surface, start_parent: Dict[Cell, Cell], end_parent: Dict[Cell, Cell], meeting_cell: Cell, start_cell: Cell, destination_cell: Cell):
+        # Redraw the entire maze on each iteration to keep all cells visible
+        for cell in grid_cells:
+            cell.draw(sc)
+
+        # Display current state of the algorithm
+        draw_text_of_running_alg(sc, running_txt, FONT, 17, 20, 200, "#FFFFFF")
+        draw_text_of_running_alg(sc, "CELLS EXPLORED: " + str(visited_cells_count), FONT, 17, 20, 230, "#FFFFFF")
+
+        # Display buttons
+        draw_button(sc, "GENERATE MAZE", 20, 300, BUTTON_COLOR)
+        draw_button(sc, "BFS", 20, 400, BUTTON_COLOR)
+        draw_button(sc, "DFS", 20, 350, BUTTON_COLOR)
+        draw_button(sc, "BIDIRECTIONAL BFS", 20, 450, BUTTON_COLOR)
+        draw_button(sc, "A STAR", 20, 500, BUTTON_COLOR)
+        draw_button(sc, "GBFS", 20, 550, BUTTON_COLOR)
+        draw_button(sc, "BIDIRECTIONAL A STAR", 20, 600, BUTTON_COLOR)
+
+        # Draw the visited cell
+        current_cell.draw(sc)
+
+    return on_step
+
+def visualize_search(search, algorithm: str, grid_cells: List[Cell], sc: pygame.Surface, running_txt: str, delay: int = 60,
+                     renderer: MazeRenderer = None, start: int = 0, destination: int = None, profile: SearchProfile = None,
+                     cache: SolutionCache = None):
     """
-    Reconstruct the path once the bidirectional search has found a common cell.
-    Combines the path from the start to the meeting cell and the meeting cell to the destination.
+    Run a headless search from the `engine` package with the step callback of `make_search_visualizer`,
+    then draw the solution path.
+
+    With a cache, a query already solved on the same walls is not searched again: its expanded cells
+    are shown at once and its path is drawn. Otherwise the expanded cells are recorded and the result
+    is added to the cache.
 
     Args:
-    - sc (pygame.Surface): The screen surface for drawing the maze.
-    - start_parent (Dict[Cell, Cell]): Parent dictionary from the start search.
-    - end_parent (Dict[Cell, Cell]): Parent dictionary from the end search.
-    - meeting_cell (Cell): The cell where the two searches meet.
-    - start_cell (Cell): The starting cell.
-    - destination_cell (Cell): The destination cell.
+    - search (Callable): The headless solver, e.g. `find_path_BFS`.
+    - algorithm (str): The name of the algorithm, part of the cache key.
+    - grid_cells (List[Cell]): List of all cells in the maze grid.
+    - sc (pygame.Surface): The pygame screen surface used for drawing.
+    - running_txt (str): The label of the running algorithm shown on the screen.
+    - delay (int): Delay in milliseconds after every expanded cell.
+    - renderer (MazeRenderer, optional): The incremental renderer of the maze behind grid_cells.
+    - start (int): Index of the start cell, the first cell by default.
+    - destination (int, optional): Index of the destination cell, the last cell by default.
+    - profile (SearchProfile, optional): Collects counters and timings of the search when given.
+    - cache (SolutionCache, optional): The solutions of the previous queries.
 
     Returns:
-    - full_path (List[Cell]): The full path from the start to the destination through the meeting point.
+    - path (List[Cell]): the path from the start cell to the destination cell else None
+    - visited_cells_count (int): The total number of cells visited during the search.
     """
 
-    # Mark the meeting cell as part of the solution
-    meeting_cell.is_solution = True
-    meeting_cell.visited = True
-    meeting_cell.draw(sc)
-    pygame.display.flip()
-
-    # Reconstruct the path from the start to the meeting point
-    path_start = []
-    current_cell = meeting_cell
-    while current_cell is not None:
-        current_cell.is_solution = True
-        path_start.append(current_cell)
-        current_cell.draw(sc)
-        pygame.display.flip()
-        current_cell = start_parent[current_cell]
-
-    # Reconstruct the path from the meeting point to the destination
-    path_end = []
-    current_cell = end_parent[meeting_cell]
-    while current_cell is not None:
-        current_cell.is_solution = True
-        path_end.append(current_cell)
-        current_cell.draw(sc)
-        pygame.display.flip()
-        current_cell = end_parent[current_cell]
+    solution = cache.get(grid_cells, algorithm, start, destination) if cache is not None else None
+    if solution is None:
+        on_step = make_search_visualizer(grid_cells, sc, running_txt, delay = delay, renderer = renderer)
+        expanded = array("I")
+        if cache is not None:
+            visualize = on_step
+
+            def on_step(index: int):
+                expanded.append(index)
+                visualize(index)
+
+        path, stats = search(grid_cells, on_step = on_step, start = start, destination = destination, profile = profile)
+        if cache is not None:
+            cache.put(grid_cells, algorithm, start, destination, path, stats, expanded)
+    else:
+        path, stats, expanded = solution
+        # Show the cells the search expanded in a single frame
+        for index in expanded:
+            grid_cells[index].visited = True
+        if renderer is not None:
+            pygame.display.update(renderer.render(sc))
+        else:
+            for cell in grid_cells:
+                cell.draw(sc)
+            pygame.display.flip()
+
+    return draw_solution_path(sc, grid_cells, path, renderer = renderer), stats.visited_cells_count
+
+def draw_solution_path(sc: pygame.Surface, grid_cells: List[Cell], path: List[int], renderer: MazeRenderer = None):
+    """
+    Mark the cells of a solution path returned by the search engine and draw them one by one,
+    from the destination back to the start.
+
+    Args:
+    - sc (pygame.Surface): The pygame screen surface used to visualize the path.
+    - grid_cells (List[Cell]): List of all cells in the maze grid.
+    - path (List[int]): Indices of the cells from the start to the destination, or None.
+    - renderer (MazeRenderer, optional): The incremental renderer of the maze behind grid_cells.
+
+    Returns:
+    - path (List[Cell]): A list of cells representing the solution path from start to destination,
+      or None if there is no path.
+    """
+
+    if path is None:
+        return None
 
-    # Full path from start to meeting + meeting to destination
-    full_path = path_start[::-1] + path_end
-    return full_path
+    path_cells = [grid_cells[index] for index in path]
+    for cell in reversed(path_cells):
+        # Mark the cell as part of the solution path and redraw it
+        cell.visited = True
+        cell.is_solution = True
+        if renderer is not None:
+            pygame.display.update(renderer.render(sc))
+        else:
+            cell.draw(sc)
+            pygame.display.flip()
 
-def manhattan_distance(cell1: Cell, cell2: Cell):
+    return path_cells
+
+def mark_solution_path(grid_cells: List[Cell], path: List[int]):
     """
-    Heuristic function to calculate the Manhattan distance between two cells.
+    Mark the cells of a solution path returned by the search engine, without drawing them:
+    the renderer draws them with the next frame.
 
-    The Manhattan distance is the sum of the absolute differences between the x and y 
-    coordinates of the two cells. This heuristic is commonly used in grid-based pathfinding 
-    algorithms like A*.
+    Args:
+    - grid_cells (List[Cell]): List of all cells in the maze grid.
+    - path (List[int]): Indices of the cells from the start to the destination, or None.
+
+    Returns:
+    - path (List[Cell]): The cells of the path, or None if there is no path.
+    """
+
+    if path is None:
+        return None
+
+    path_cells = [grid_cells[index] for index in path]
+    for cell in path_cells:
+        cell.visited = True
+        cell.is_solution = True
+    return path_cells
+
+@lru_cache(maxsize = None)
+def get_font(name: str, size: int, bold: bool = True):
+    """
+    Returns a system font, loaded only the first time it is requested.
+
+    `pygame.font.SysFont` looks the font up on the file system on every call, so the fonts are
+    kept for the whole run instead.
 
     Args:
-    - cell1 (Cell): The first cell (starting cell).
-    - cell2 (Cell): The second cell (destination cell).
+    - name (str): The name of the font.
+    - size (int): The size of the font.
+    - bold (bool): Whether the font is bold.
 
     Returns:
-    - int: The Manhattan distance between the two cells.
+    - font (pygame.font.Font): The font.
     """
-    return abs(cell1.x - cell2.x) + abs(cell1.y - cell2.y)
+
+    return pygame.font.SysFont(name, size = size, bold = bold)
+
+@lru_cache(maxsize = 256)
+def render_text(text: str, font: str, size: int, color):
+    """
+    Returns the surface of a rendered text. The most recently used texts are kept, so labels that
+    do not change between frames are rendered only once.
+
+    Args:
+    - text (str): The text to render.
+    - font (str): The name of the font.
+    - size (int): The size of the font.
+    - color (tuple/str): The color of the text.
+
+    Returns:
+    - surface (pygame.Surface): The rendered text. It is shared, it must not be drawn on.
+    """
+
+    return get_font(font, size).render(text, True, color)
+
+@lru_cache(maxsize = 64)
+def render_button(text: str, color, width: int = 200, height: int = 40):
+    """
+    Returns the surface of a button, rendered only once per label and color.
+
+    Args:
+    - text (str): The label text of the button.
+    - color (tuple/str): The color of the button background.
+    - width (int): The width of the button.
+    - height (int): The height of the button.
+
+    Returns:
+    - surface (pygame.Surface): The button, transparent outside of its rounded corners.
+    """
+
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    # Draw the button with rounded corners
+    pygame.draw.rect(surface, color, surface.get_rect(), border_radius = 5)
+
+    # Center the text on the button
+    btn_surf = render_text(text, FONT, 19, "#FFFFFF")
+    surface.blit(btn_surf, ((width - btn_surf.get_width()) // 2, (height - btn_surf.get_height()) // 2))
+    return surface
 
 def draw_button(sc: pygame.Surface, text:str, x_offset: int, y_offset: int, color):
     """
@@ -272,18 +447,11 @@ def draw_button(sc: pygame.Surface, text:str, x_offset: int, y_offset: int, colo
     - pygame.Rect: The rectangle object representing the button for event handling.
     """
 
-    # Define the button font and size
-    btn_font = pygame.font.SysFont(FONT, size = 19, bold = True)
-    # Render the text to be displayed on the button
-    btn_surf = btn_font.render(text, True, "#FFFFFF")
     # Create a button rectangle with the given position and size
     btn = pygame.Rect(x_offset, y_offset, 200, 40)
 
-    # Draw the button with rounded corners
-    pygame.draw.rect(sc, color, btn, border_radius = 5)  
-
-    # Blit the text surface onto the screen, centered on the button
-    sc.blit(btn_surf, (btn.x + (btn.width - btn_surf.get_width()) // 2, btn.y + (btn.height - btn_surf.get_height()) // 2))
+    # The button is rendered again only when its label or color changes
+    sc.blit(render_button(text, color, btn.width, btn.height), btn)
 
     return btn
 
@@ -297,17 +465,21 @@ def draw_text_of_running_alg(sc: pygame.Surface, text:str, font: str, size: int,
     - x_offset (int): The x-coordinate offset for positioning the text.
     - y_offset (int): The y-coordinate offset for positioning the text.
     - color (tuple): RGB tuple representing the color of the text.
+
+    Returns:
+    - pygame.Rect: The area of the text, e.g. to pass to `pygame.display.update`.
     """
 
     text_area = pygame.Rect(x_offset, y_offset, 200, 30)  # Adjust width and height if needed
     # Clear the text area by filling it with the background color (e.g., black)
     sc.fill(BACKGROUND_COLOR, text_area)
 
-    # Set up font and render the text
-    font = pygame.font.SysFont(font, size = size, bold = True)
-    text_obj = font.render(text, True, color)
+    # Render the text, or reuse it if it did not change since the last frame
+    text_obj = render_text(text, font, size, color)
     # Set top-left as the position
     text_rect = text_obj.get_rect(topleft = (x_offset, y_offset))
     # Draw the text on the screen
     sc.blit(text_obj, text_rect)
 
+    return text_area
+
@@ -0,0 +1,351 @@
+import math
+import numpy as np
+import pygame
+from config import *
+from maze import Maze, TOP, RIGHT, BOTTOM, LEFT
+
+# Pixel codes of the bitmaps, indices of the palette
+EMPTY, GENERATED, VISITED, SOLUTION, WALL = range(5)
+
+# Below this cell size the walls can not be told apart, the cells are drawn without them
+BITMAP_WALLS_TILE = 2
+
+def make_palette():
+    """
+    Returns the RGB colors of the pixel codes as a NumPy array.
+    """
+    colors = (BACKGROUND_COLOR, CELL_GENERATED_COLOR, CELL_VISITED_COLOR, CELL_SOLUTION_COLOR, WALL_COLOR)
+    return np.array([tuple(pygame.Color(color))[:3] for color in colors], dtype = np.uint8)
+
+def cell_codes(maze: Maze, indices = None):
+    """
+    Returns the pixel code of cells from their generated, visited and solution states, the same
+    colors as `Cell.draw`.
+
+    Args:
+    - maze (Maze): The maze.
+    - indices (np.ndarray, optional): The cells, all of them in index order when omitted.
+
+    Returns:
+    - codes (np.ndarray): uint8 codes, EMPTY to SOLUTION.
+    """
+    if indices is None:
+        bits = [np.unpackbits(np.frombuffer(bit_set.bits, dtype = np.uint8), bitorder = "little")[:maze.size]
+                for bit_set in (maze.generated, maze.visited, maze.solution)]
+    else:
+        bits = [(np.frombuffer(bit_set.bits, dtype = np.uint8)[indices >> 3] >> (indices & 7).astype(np.uint8)) & 1
+                for bit_set in (maze.generated, maze.visited, maze.solution)]
+    generated, visited, solution = bits
+    return (generated * (1 + visited * (1 + solution))).astype(np.uint8)
+
+def build_bitmap(walls: np.ndarray, codes: np.ndarray):
+    """
+    Renders a maze to a bitmap of pixel codes with one pixel per cell, per wall and per corner:
+    cell (x, y) is pixel (2x + 1, 2y + 1) and the walls around it are the pixels next to it. An
+    open wall takes the code of the lower of its two cells, so a path stays connected.
+
+    Args:
+    - walls (np.ndarray): (rows, cols) wall bits, from `Maze.wall_grid`.
+    - codes (np.ndarray): (rows, cols) pixel codes of the cells, from `cell_codes`.
+
+    Returns:
+    - bitmap (np.ndarray): (2 * rows + 1, 2 * cols + 1) uint8 array of pixel codes.
+    """
+    rows, cols = codes.shape
+    bitmap = np.full((2 * rows + 1, 2 * cols + 1), WALL, dtype = np.uint8)
+    bitmap[1::2, 1::2] = codes
+
+    open_east = ((walls[:, :-1] & RIGHT) == 0) & ((walls[:, 1:] & LEFT) == 0)
+    bitmap[1::2, 2:-1:2] = np.where(open_east, np.minimum(codes[:, :-1], codes[:, 1:]), WALL)
+    open_south = ((walls[:-1] & BOTTOM) == 0) & ((walls[1:] & TOP) == 0)
+    bitmap[2:-1:2, 1::2] = np.where(open_south, np.minimum(codes[:-1], codes[1:]), WALL)
+
+    # Openings in the outer walls
+    bitmap[0, 1::2] = np.where(walls[0] & TOP, WALL, codes[0])
+    bitmap[-1, 1::2] = np.where(walls[-1] & BOTTOM, WALL, codes[-1])
+    bitmap[1::2, 0] = np.where(walls[:, 0] & LEFT, WALL, codes[:, 0])
+    bitmap[1::2, -1] = np.where(walls[:, -1] & RIGHT, WALL, codes[:, -1])
+    return bitmap
+
+class ViewportRenderer:
+    """
+    Renderer of mazes too large to fit on the screen at full size: the maze is shown through a
+    scrollable, zoomable viewport and only the visible cells are drawn.
+
+    The level of detail depends on the cell size on screen:
+    - from DETAIL_TILE_SIZE pixels, the cells are filled from a bitmap and their walls drawn as lines;
+    - from BITMAP_WALLS_TILE pixels, the view is sampled from a bitmap of the cells and walls rendered
+      with NumPy (`build_bitmap`) and blitted with `pygame.surfarray`, without drawing any line;
+    - below that, every pixel shows the most advanced state (e.g. solution) of the cells it covers.
+
+    The bitmaps are kept up to date incrementally from the changes recorded by the maze
+    (`Maze.track_dirty`), only the cells whose walls or state changed are rendered again, and the
+    view is only redrawn when the maze, the markers or the viewport changed. It has the same
+    `render` and `cell_at` methods as MazeRenderer.
+
+    Attributes:
+    - maze (Maze): The maze to draw.
+    - area (pygame.Rect): The region of the screen the maze is drawn in.
+    - tile (float): Size of a cell on the screen, in pixels.
+    - left, top (float): Position of the top left corner of the view, in cells.
+    """
+
+    def __init__(self, maze: Maze, area = pygame.Rect(MAZE_OFFSET, 2, WIDTH - MAZE_OFFSET - 3, HEIGHT - 4)):
+        """
+        Initializes the renderer, zoomed out to show the whole maze. Nothing is drawn until the first call to `render`.
+
+        Args:
+        - maze (Maze): The maze to draw.
+        - area (pygame.Rect): The region of the screen the maze is drawn in.
+        """
+
+        self.maze = maze
+        self.area = pygame.Rect(area)
+        self.view = pygame.Surface(self.area.size)
+        self.palette = make_palette()
+
+        self.min_tile = min(self.area.width / maze.cols, self.area.height / maze.rows)
+        self.max_tile = 2 * TILE_SIZE
+        self.fit()
+
+        # Walls, cell codes and bitmap of the maze, built on the first render
+        maze.track_dirty()
+        self.walls = None
+        self.codes = None
+        self.bitmap = None
+        self.markers = []
+        self.stack = []
+
+    def fit(self):
+        """
+        Zooms out to show the whole maze.
+        """
+        self.tile = self.min_tile
+        self.left = self.top = 0.0
+        self.clamp()
+
+    def clamp(self):
+        """
+        Keeps the maze in the view: a maze smaller than the view is centered, a larger one can not
+        be scrolled past its borders.
+        """
+        for name, cells, pixels in (("left", self.maze.cols, self.area.width), ("top", self.maze.rows, self.area.height)):
+            span = pixels / self.tile
+            low, high = sorted((0.0, cells - span))
+            position = (cells - span) / 2 if span >= cells else min(max(getattr(self, name), low), high)
+            setattr(self, name, position)
+        self.view_changed = True
+
+    def zoom(self, factor: float, pos = None):
+        """
+        Zooms in (factor > 1) or out, keeping the cell under a screen position in place.
+
+        Args:
+        - factor (float): The zoom factor.
+        - pos (Tuple[int, int], optional): The screen position, the center of the view by default.
+        """
+        px, py = (pos[0] - self.area.x, pos[1] - self.area.y) if pos is not None else (self.area.width / 2, self.area.height / 2)
+        x, y = self.left + px / self.tile, self.top + py / self.tile
+        self.tile = min(max(self.tile * factor, self.min_tile), self.max_tile)
+        self.left, self.top = x - px / self.tile, y - py / self.tile
+        self.clamp()
+
+    def scroll(self, dx: float, dy: float):
+        """
+        Scrolls the view by a number of pixels.
+        """
+        self.left += dx / self.tile
+        self.top += dy / self.tile
+        self.clamp()
+
+    def cell_at(self, pos):
+        """
+        Returns the index of the cell under a screen position, or None outside of the maze.
+        """
+        if not self.area.collidepoint(pos):
+            return None
+        x = math.floor(self.left + (pos[0] - self.area.x) / self.tile)
+        y = math.floor(self.top + (pos[1] - self.area.y) / self.tile)
+        if 0 <= x < self.maze.cols and 0 <= y < self.maze.rows:
+            return self.maze.index(x, y)
+        return None
+
+    def visible_range(self, start: float, pixels: int, cells: int):
+        """
+        Returns the first and the last + 1 visible cells along an axis.
+        """
+        return max(0, math.floor(start)), min(cells, math.ceil(start + pixels / self.tile))
+
+    def update_cells(self):
+        """
+        Brings the walls, cell codes and bitmap up to date with the changes recorded by the maze.
+
+        Returns:
+        - changed (bool): Whether anything changed since the last call.
+        """
+
+        maze = self.maze
+        everything, walls, states = maze.take_dirty()
+        if everything or self.bitmap is None:
+            self.walls = maze.wall_grid()
+            self.codes = cell_codes(maze).reshape(maze.rows, maze.cols)
+            self.bitmap = build_bitmap(self.walls, self.codes)
+            return True
+        if not walls and not states:
+            return False
+
+        if walls:
+            indices = np.fromiter(walls, dtype = np.intp, count = len(walls))
+            y, x = np.divmod(indices, maze.cols)
+            self.walls[y, x] = [maze.get_walls(index) for index in walls]
+        indices = np.fromiter(walls | states, dtype = np.intp, count = len(walls | states))
+        self.patch_cells(indices)
+        return True
+
+    def patch_cells(self, indices: np.ndarray):
+        """
+        Renders some cells again in the cell codes and the bitmap, with the walls around them, the
+        same way as `build_bitmap`.
+
+        Args:
+        - indices (np.ndarray): The cells, whose walls are already up to date in self.walls.
+        """
+
+        maze = self.maze
+        codes = cell_codes(maze, indices)
+        y, x = np.divmod(indices, maze.cols)
+        self.codes[y, x] = codes
+
+        bitmap = self.bitmap
+        bitmap[2 * y + 1, 2 * x + 1] = codes
+        cell_walls = self.walls[y, x]
+        for dy, dx, wall, opposite in ((-1, 0, TOP, BOTTOM), (0, 1, RIGHT, LEFT), (1, 0, BOTTOM, TOP), (0, -1, LEFT, RIGHT)):
+            ny, nx = y + dy, x + dx
+            inside = (ny >= 0) & (ny < maze.rows) & (nx >= 0) & (nx < maze.cols)
+            ny, nx = np.clip(ny, 0, maze.rows - 1), np.clip(nx, 0, maze.cols - 1)
+            # A wall is open when neither side has it, an outer wall when the cell does not have it
+            opened = ((cell_walls & wall) == 0) & (~inside | ((self.walls[ny, nx] & opposite) == 0))
+            values = np.where(inside, np.minimum(codes, self.codes[ny, nx]), codes)
+            bitmap[2 * y + 1 + dy, 2 * x + 1 + dx] = np.where(opened, values, WALL)
+
+    def sample_codes(self):
+        """
+        Returns the pixel codes of the view, sampled from the bitmap with walls or from the cell codes.
+        """
+
+        width, height = self.area.size
+        cols, rows = self.maze.cols, self.maze.rows
+        # Position of the center of every pixel of the view, in cells
+        cx = self.left + (np.arange(width) + 0.5) / self.tile
+        cy = self.top + (np.arange(height) + 0.5) / self.tile
+        inside_x = (cx >= 0) & (cx < cols)
+        inside_y = (cy >= 0) & (cy < rows)
+
+        if BITMAP_WALLS_TILE <= self.tile < DETAIL_TILE_SIZE:
+            # The walls take up to a pixel on both sides of a cell
+            wall_part = min(0.25, 1 / self.tile)
+
+            def bitmap_axis(position, cells):
+                cell = np.floor(position)
+                fraction = position - cell
+                pixel = 2 * cell + 1 + (fraction >= 1 - wall_part) - (fraction < wall_part)
+                return np.clip(pixel, 0, 2 * cells).astype(np.intp)
+
+            codes = self.bitmap[np.ix_(bitmap_axis(cy, rows), bitmap_axis(cx, cols))]
+        else:
+            # Pool the visible cells by blocks of about one pixel, keeping the highest code
+            block = max(1, math.ceil(1 / self.tile))
+            x0, x1 = self.visible_range(self.left, width, cols)
+            y0, y1 = self.visible_range(self.top, height, rows)
+            visible = self.codes[y0:y1, x0:x1]
+            if block > 1:
+                pooled_rows, pooled_cols = -(-visible.shape[0] // block), -(-visible.shape[1] // block)
+                padded = np.zeros((pooled_rows * block, pooled_cols * block), dtype = np.uint8)
+                padded[:visible.shape[0], :visible.shape[1]] = visible
+                visible = padded.reshape(pooled_rows, block, pooled_cols, block).max(axis = (1, 3))
+            ix = np.clip((cx - x0) // block, 0, visible.shape[1] - 1).astype(np.intp)
+            iy = np.clip((cy - y0) // block, 0, visible.shape[0] - 1).astype(np.intp)
+            codes = visible[np.ix_(iy, ix)]
+
+        codes[~inside_y, :] = EMPTY
+        codes[:, ~inside_x] = EMPTY
+        return codes
+
+    def draw_walls(self):
+        """
+        Draws the walls of the visible cells as lines on the view.
+        """
+
+        cols, rows = self.maze.cols, self.maze.rows
+        x0, x1 = self.visible_range(self.left, self.area.width, cols)
+        y0, y1 = self.visible_range(self.top, self.area.height, rows)
+        width = max(1, round(self.tile / 8))
+        tile = self.tile
+
+        for y, row in enumerate(self.walls[y0:y1, x0:x1].tolist(), y0):
+            top, bottom = (y - self.top) * tile, (y + 1 - self.top) * tile
+            for x, bits in enumerate(row, x0):
+                left, right = (x - self.left) * tile, (x + 1 - self.left) * tile
+                # The walls shared with the cell above and on the left are drawn once, by this cell
+                if bits & TOP:
+                    pygame.draw.line(self.view, WALL_COLOR, (left, top), (right, top), width)
+                if bits & LEFT:
+                    pygame.draw.line(self.view, WALL_COLOR, (left, top), (left, bottom), width)
+                if bits & RIGHT and (x == x1 - 1):
+                    pygame.draw.line(self.view, WALL_COLOR, (right, top), (right, bottom), width)
+                if bits & BOTTOM and (y == y1 - 1):
+                    pygame.draw.line(self.view, WALL_COLOR, (left, bottom), (right, bottom), width)
+
+    def draw_overlays(self, sc: pygame.Surface):
+        """
+        Draws the markers and, when zoomed in, the generation stack on the screen.
+        """
+
+        sc.set_clip(self.area)
+        tile = self.tile
+        if tile >= DETAIL_TILE_SIZE:
+            for index in self.stack:
+                x, y = self.maze.coords(index)
+                rect = (self.area.x + (x - self.left) * tile + 3, self.area.y + (y - self.top) * tile + 2, tile - 4, tile - 4)
+                pygame.draw.rect(sc, CELL_GENERATED_COLOR, rect, border_radius = 4)
+        # The markers stay visible at any zoom
+        size = max(tile - 2, 4)
+        for index in self.markers:
+            x, y = self.maze.coords(index)
+            rect = (self.area.x + (x - self.left) * tile, self.area.y + (y - self.top) * tile, size, size)
+            pygame.draw.rect(sc, pygame.Color(START_END_CELL_COLOR), rect)
+        sc.set_clip(None)
+
+    def render(self, sc: pygame.Surface, markers = None, stack = None, full: bool = False):
+        """
+        Draws the view on the screen if the maze, the overlays or the viewport changed since the last frame.
+
+        Args:
+        - sc (pygame.Surface): The screen surface.
+        - markers (List[int], optional): Cells highlighted as current/destination cells. The previous
+          markers are kept when omitted.
+        - stack (List[int], optional): Cells of the generation stack. The previous stack is kept when omitted.
+        - full (bool): Redraw the view even if nothing changed, e.g. after the screen has been cleared.
+
+        Returns:
+        - rects (List[pygame.Rect]): The screen regions that changed, to pass to `pygame.display.update`.
+        """
+
+        changed = self.update_cells() or full or self.view_changed
+        if markers is not None and list(markers) != self.markers:
+            self.markers = list(markers)
+            changed = True
+        if stack is not None and list(stack) != self.stack:
+            self.stack = list(stack)
+            changed = True
+        if not changed:
+            return []
+
+        pixels = self.palette[self.sample_codes()]
+        pygame.surfarray.blit_array(self.view, pixels.transpose(1, 0, 2))
+        if self.tile >= DETAIL_TILE_SIZE:
+            self.draw_walls()
+        sc.blit(self.view, self.area)
+        self.draw_overlays(sc)
+        self.view_changed = False
+        return [self.area]
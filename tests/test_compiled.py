@@ -0,0 +1,59 @@
+import random
+import pytest
+
+pytest.importorskip("numpy")
+
+from maze import Maze
+from generation.backtracker import generate_maze_bulk
+from generation.rows import generate_maze_rows
+from engine.registry import SOLVERS
+from engine.compiled import COMPILED_SOLVERS, check_equivalence
+
+def random_mazes():
+    """
+    Seeded mazes of every generator and shape, with and without loops, and with a walled-in cell.
+    """
+    mazes = []
+    for seed, (cols, rows) in enumerate([(1, 1), (1, 9), (9, 1), (16, 12), (37, 23)]):
+        for generator in ("backtracker", "eller", "sidewinder", "binary_tree"):
+            maze = Maze(cols, rows)
+            if generator == "backtracker":
+                generate_maze_bulk(maze, seed)
+            else:
+                generate_maze_rows(maze, generator, seed)
+            mazes.append(maze)
+
+            # The same maze with loops and an unreachable cell
+            rng = random.Random(seed)
+            looped = Maze(cols, rows, bytearray(maze.walls))
+            for _ in range(looped.size // 4):
+                index = rng.randrange(looped.size)
+                x, y = looped.coords(index)
+                if x < cols - 1:
+                    looped.remove_wall_between(index, index + 1)
+                if y < rows - 1 and rng.random() < 0.5:
+                    looped.remove_wall_between(index, index + cols)
+            if looped.size > 2:
+                looped.set_walls(looped.size // 2, 15)
+            mazes.append(looped)
+    return mazes
+
+MAZES = random_mazes()
+
+@pytest.mark.parametrize("name", list(COMPILED_SOLVERS))
+def test_kernel_matches_python_solver(name):
+    rng = random.Random(name)
+    compiled, python = COMPILED_SOLVERS[name], SOLVERS[name]
+    for maze in MAZES:
+        queries = [(0, maze.size - 1)] + [(rng.randrange(maze.size), rng.randrange(maze.size)) for _ in range(15)]
+        for start, destination in queries:
+            expected_steps, steps = [], []
+            expected, expected_stats = python(maze, expected_steps.append, start = start, destination = destination)
+            path, stats = compiled(maze, steps.append, start = start, destination = destination)
+            assert path == expected, (maze.cols, maze.rows, start, destination)
+            assert steps == expected_steps
+            assert stats.visited_cells_count == expected_stats.visited_cells_count
+            assert stats.solution_length == expected_stats.solution_length
+
+def test_check_equivalence_forced():
+    assert check_equivalence(MAZES, queries_per_maze = 5, force = True) == []